@@ -0,0 +1,105 @@
+"""Account deletion benchmark.
+
+Compares deleting a user whose tasks are loaded and removed by the ORM with
+the ON DELETE CASCADE path used by ``UserController.delete``.
+
+Usage (from ``backend/``): python -m benchmarks.bench_account_delete [tasks]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
+from sqlalchemy import event, insert, select
+from config import TestConfig
+from flaskr import create_app
+from flaskr.controllers.user_controller import UserController
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel, TaskStatus
+from flaskr.models.user_model import UserModel
+
+
+def populate(task_count):
+    db.session.execute(insert(TagModel).values(id=1, name="Work"))
+    db.session.execute(
+        insert(UserModel).values(
+            id=1, username="bench", email="bench@example.com", password="x"
+        )
+    )
+    now = datetime.now(timezone.utc)
+    db.session.execute(
+        insert(TaskModel),
+        [
+            {
+                "title": f"Task {i}",
+                "content": "Benchmark task",
+                "status": TaskStatus.PENDING,
+                "created_at": now,
+                "user_id": 1,
+                "tag_id": 1,
+            }
+            for i in range(task_count)
+        ],
+    )
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def delete_through_orm(app):
+    user = db.session.execute(select(UserModel).where(UserModel.id == 1)).scalar_one()
+    # Touching the collection reproduces the old cascade="all, delete-orphan"
+    # behaviour: every task is loaded and deleted by the unit of work.
+    user.tasks[:]
+    db.session.delete(user)
+    db.session.commit()
+
+
+def delete_through_controller(app):
+    with app.test_request_context(
+        headers={"Authorization": f"Bearer {create_access_token(identity='1')}"}
+    ):
+        verify_jwt_in_request()
+        UserController.delete()
+
+
+def run(name, task_count, delete):
+    with tempfile.TemporaryDirectory() as tmp:
+
+        class BenchConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tmp, "bench.db")
+
+        app = create_app(BenchConfig)
+
+        with app.app_context():
+            db.create_all()
+            populate(task_count)
+
+            statements = []
+
+            def count(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count)
+            started = time.perf_counter()
+            delete(app)
+            elapsed = time.perf_counter() - started
+            event.remove(db.engine, "before_cursor_execute", count)
+
+            remaining = db.session.query(TaskModel).count()
+            db.engine.dispose()
+
+    print(
+        f"{name:<12} tasks={task_count:<8} time={elapsed:8.3f}s "
+        f"statements={len(statements):<6} remaining={remaining}"
+    )
+
+
+if __name__ == "__main__":
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    run("orm", task_count, delete_through_orm)
+    run("cascade", task_count, delete_through_controller)
@@ -0,0 +1,198 @@
+"""HTTP load test of the user journey against a locally started server.
+
+Starts the app in its own process on an empty SQLite file. Then ``users``
+virtual users run the journey below concurrently, each on its own
+connections:
+
+sign-up, sign-in, then ``tasks`` times: create a task, list the tasks and
+update the newest one; finally delete every task.
+
+Throughput and p50/p95/p99 latency are reported per operation.
+
+Usage (from ``backend/``):
+python -m benchmarks.bench_http [--users N] [--tasks N]
+                                [--json results.json] [--baseline baseline.json]
+                                [--tolerance 0.1]
+
+Exits with status 1 when a figure is worse than the baseline by more than
+the tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import insert
+from config import TestConfig
+from benchmarks.loadgen import fetch, latency_summary
+from benchmarks.results import compare, print_comparison, read_results, write_results
+from benchmarks.server import HOST, running_server
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+
+OPERATIONS = ("sign_up", "sign_in", "create_task", "list_tasks", "update_task", "delete_task")
+PASSWORD = "bench-password"
+
+
+def populate(path):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+
+    app = create_app(BenchConfig)
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(TagModel).values(id=1, name="Work"))
+        db.session.commit()
+        db.engine.dispose()
+
+
+class Journey:
+    """Latencies, statuses and failures of every operation of a run."""
+
+    def __init__(self, port):
+        self.port = port
+        self.latencies = {operation: [] for operation in OPERATIONS}
+        self.statuses = {operation: {} for operation in OPERATIONS}
+        self.failures = {operation: 0 for operation in OPERATIONS}
+
+    async def call(self, operation, method, path, token=None, payload=None, expected=200):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        body = json.dumps(payload).encode() if payload is not None else None
+
+        started = time.perf_counter()
+        try:
+            status, content = await fetch(HOST, self.port, method, path, headers, body)
+        except OSError:
+            self.failures[operation] += 1
+            return None
+
+        self.latencies[operation].append(time.perf_counter() - started)
+        statuses = self.statuses[operation]
+        statuses[status] = statuses.get(status, 0) + 1
+
+        if status != expected:
+            self.failures[operation] += 1
+            return None
+
+        return json.loads(content) if content else {}
+
+    async def user(self, index, tasks):
+        email = f"bench{index}@example.com"
+
+        await self.call(
+            "sign_up", "POST", "/api/v1/users",
+            payload={"username": f"bench{index}", "email": email, "password": PASSWORD},
+            expected=201,
+        )
+        signed_in = await self.call(
+            "sign_in", "POST", "/api/v1/auth/sign-in",
+            payload={"email": email, "password": PASSWORD},
+        )
+        if signed_in is None:
+            return
+        token = signed_in["token"]
+
+        listed = []
+        for number in range(tasks):
+            await self.call(
+                "create_task", "POST", "/api/v1/tasks", token,
+                {"title": f"Task {number}", "content": "Benchmark", "status": "PENDING", "tagId": 1},
+                expected=201,
+            )
+            listed = await self.call("list_tasks", "GET", "/api/v1/tasks/user", token) or []
+            if listed:
+                await self.call(
+                    "update_task", "PUT", f"/api/v1/tasks/{listed[-1]['id']}", token,
+                    {"title": f"Task {number}", "content": "Updated", "status": "IN_PROGRESS"},
+                )
+
+        for task in listed:
+            await self.call(
+                "delete_task", "DELETE", f"/api/v1/tasks/{task['id']}", token, expected=204
+            )
+
+    def results(self, elapsed):
+        return {
+            operation: {
+                "requests": len(self.latencies[operation]),
+                "failures": self.failures[operation],
+                "statuses": self.statuses[operation],
+                **latency_summary(self.latencies[operation], elapsed),
+            }
+            for operation in OPERATIONS
+        }
+
+
+async def run_journeys(port, users, tasks):
+    journey = Journey(port)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(journey.user(index, tasks) for index in range(users)))
+    elapsed = time.perf_counter() - started
+
+    results = journey.results(elapsed)
+    requests = sum(stats["requests"] for stats in results.values())
+    results["total"] = {
+        "requests": requests,
+        "failures": sum(stats["failures"] for stats in results.values()),
+        "rps": requests / elapsed,
+    }
+
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=10, help="Tasks each user creates.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare with results written earlier.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        populate(path)
+
+        env = {
+            "APP_CONFIG": "production",
+            "DATABASE_URL": "sqlite:///" + path,
+            "JWT_SECRET_KEY": "bench-secret",
+            "SLOW_QUERY_LOG": os.path.join(tmp, "slow_queries.log"),
+        }
+        with running_server(env) as port:
+            results = asyncio.run(run_journeys(port, args.users, args.tasks))
+
+    print(f"users={args.users} tasks={args.tasks}")
+    for operation, stats in results.items():
+        if operation == "total":
+            continue
+        print(
+            f"{operation:<12} requests={stats['requests']:<6} failures={stats['failures']:<4} "
+            f"rps={stats['rps'] or 0:8.1f} p50={stats['p50_ms'] or 0:8.1f}ms "
+            f"p95={stats['p95_ms'] or 0:8.1f}ms p99={stats['p99_ms'] or 0:8.1f}ms"
+        )
+    total = results["total"]
+    print(f"total        requests={total['requests']} failures={total['failures']} rps={total['rps']:.1f}")
+
+    if args.json:
+        write_results(args.json, results, users=args.users, tasks=args.tasks)
+
+    if args.baseline:
+        rows = compare(results, read_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+
+        if any(row[-1] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,136 @@
+"""Micro-benchmarks of controllers, schemas, password hashing and JWTs.
+
+Each benchmark is timed call by call against a small in-memory database and
+reported as mean and percentiles in microseconds.
+
+Usage (from ``backend/``):
+python -m benchmarks.bench_micro [--iterations N] [--json results.json]
+                                 [--baseline baseline.json] [--tolerance 0.1]
+
+Exits with status 1 when a figure is worse than the baseline by more than
+the tolerance.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from flask_jwt_extended import create_access_token, decode_token, verify_jwt_in_request
+from sqlalchemy import insert
+from config import TestConfig
+from benchmarks.loadgen import percentile
+from benchmarks.results import compare, print_comparison, read_results, write_results
+from flaskr import create_app
+from flaskr.controllers.task_controller import TaskController
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+from flaskr.schemas.schema import TaskSchema, UserSchema
+from flaskr.utils import check_password, generate_password
+
+TASKS = 100
+PASSWORD = "bench-password"
+# Hashing is deliberately slow, so it gets fewer iterations
+SLOW = {"hashing.generate_password", "hashing.check_password"}
+
+
+def populate():
+    db.session.execute(insert(TagModel).values(id=1, name="Work"))
+    db.session.execute(
+        insert(UserModel).values(
+            id=1, username="bench", email="bench@example.com",
+            password=generate_password(PASSWORD),
+        )
+    )
+    db.session.execute(
+        insert(TaskModel),
+        [{"title": f"Task {i}", "content": "Benchmark", "user_id": 1, "tag_id": 1}
+         for i in range(TASKS)],
+    )
+    db.session.commit()
+
+
+def benchmarks():
+    password_hash = generate_password(PASSWORD)
+    token = create_access_token(identity="1")
+    rows = TaskController.get_all_on_user()
+    task_schema = TaskSchema(many=True)
+    user_schema = UserSchema()
+    user = {"username": "bench", "email": "bench@example.com", "password": PASSWORD}
+
+    return {
+        "controller.get_all_on_user": TaskController.get_all_on_user,
+        "schema.task_list_dump": lambda: task_schema.dump(rows),
+        "schema.user_load": lambda: user_schema.load(user),
+        "hashing.generate_password": lambda: generate_password(PASSWORD),
+        "hashing.check_password": lambda: check_password(password_hash, PASSWORD),
+        "jwt.create_access_token": lambda: create_access_token(identity="1"),
+        "jwt.decode_token": lambda: decode_token(token),
+    }
+
+
+def measure(run, iterations):
+    run()
+    timings = []
+
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+
+    return {
+        "iterations": iterations,
+        "ops": len(timings) / sum(timings),
+        "mean_us": statistics.mean(timings) * 1e6,
+        "p50_us": percentile(timings, 0.50) * 1e6,
+        "p95_us": percentile(timings, 0.95) * 1e6,
+        "p99_us": percentile(timings, 0.99) * 1e6,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare with results written earlier.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    app = create_app(TestConfig)
+    results = {}
+
+    with app.app_context():
+        db.create_all()
+        populate()
+        token = create_access_token(identity="1")
+
+    with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+        verify_jwt_in_request()
+
+        for name, run in benchmarks().items():
+            iterations = max(args.iterations // 200, 5) if name in SLOW else args.iterations
+            stats = results[name] = measure(run, iterations)
+            print(
+                f"{name:<28} mean={stats['mean_us']:10.1f}us p50={stats['p50_us']:10.1f}us "
+                f"p95={stats['p95_us']:10.1f}us p99={stats['p99_us']:10.1f}us"
+            )
+
+    if args.json:
+        write_results(args.json, results, iterations=args.iterations)
+
+    if args.baseline:
+        rows = compare(results, read_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+
+        if any(row[-1] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
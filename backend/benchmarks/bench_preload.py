@@ -0,0 +1,115 @@
+"""Unique memory of forked workers, with and without preload.py.
+
+Runs a small pre-fork master, ``benchmarks/prefork.py``, twice against the same SQLite file. The
+``lazy`` master forks first and each worker creates its own app, like
+gunicorn without ``--preload``. The ``preload`` master imports
+``preload.py`` and then forks, like ``gunicorn --preload preload:app``.
+
+Every worker serves the same requests through the test client. With all
+workers still alive, the master reads each worker's memory from
+``/proc/<pid>/smaps_rollup``, so this runs on Linux only:
+
+- USS is the memory only that worker uses, freed when it exits;
+- PSS counts each shared page as a fraction for every process sharing it.
+
+Usage (from ``backend/``):
+python -m benchmarks.bench_preload [--workers 4] [--requests 200] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from sqlalchemy import insert
+from config import TestConfig
+from benchmarks.results import write_results
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+
+MODES = ("lazy", "preload")
+TASKS = 100
+
+
+def populate(path):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+
+    app = create_app(BenchConfig)
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(TagModel).values(id=1, name="Work"))
+        db.session.execute(
+            insert(UserModel).values(id=1, username="bench", email="bench@example.com", password="-")
+        )
+        db.session.execute(
+            insert(TaskModel),
+            [{"title": f"Task {i}", "content": "Benchmark", "user_id": 1, "tag_id": 1}
+             for i in range(TASKS)],
+        )
+        db.session.commit()
+        db.engine.dispose()
+
+
+def run(mode, path, workers, requests):
+    env = {
+        **os.environ,
+        "APP_CONFIG": "production",
+        "DATABASE_URL": "sqlite:///" + path,
+        "JWT_SECRET_KEY": "bench-secret",
+        "SLOW_QUERY_LOG": os.path.join(os.path.dirname(path), "slow_queries.log"),
+    }
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.prefork", mode, str(workers), str(requests)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="Requests each worker serves.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        populate(path)
+
+        for mode in MODES:
+            measured = run(mode, path, args.workers, args.requests)
+            workers = measured["workers"]
+            results[mode] = {
+                "workers": args.workers,
+                "uss_mib_per_worker": sum(w["uss"] for w in workers) / len(workers) / 1024,
+                "pss_mib_per_worker": sum(w["pss"] for w in workers) / len(workers) / 1024,
+                "rss_mib_per_worker": sum(w["rss"] for w in workers) / len(workers) / 1024,
+                "pss_mib_total": (measured["master"]["pss"] + sum(w["pss"] for w in workers)) / 1024,
+            }
+
+    print(f"workers={args.workers} requests={args.requests}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<8} uss/worker={stats['uss_mib_per_worker']:6.1f}MiB "
+            f"pss/worker={stats['pss_mib_per_worker']:6.1f}MiB "
+            f"rss/worker={stats['rss_mib_per_worker']:6.1f}MiB "
+            f"pss total={stats['pss_mib_total']:6.1f}MiB"
+        )
+
+    if args.json:
+        write_results(args.json, results, workers=args.workers, requests=args.requests)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
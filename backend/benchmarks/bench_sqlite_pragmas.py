@@ -0,0 +1,129 @@
+"""Mixed read/write throughput on SQLite with and without ProductionConfig.
+
+Each thread loops for a fixed time, listing a random user's tasks and, on a
+share of iterations, inserting a task and committing.
+
+Usage (from ``backend/``):
+    python -m benchmarks.bench_sqlite_pragmas [threads] [seconds] [write_ratio]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from config import ProductionConfig, TestConfig
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel, TaskStatus
+from flaskr.models.user_model import UserModel
+
+USERS = 200
+TASKS = 100_000
+
+
+def populate():
+    db.session.execute(insert(TagModel).values(id=1, name="Work"))
+    db.session.execute(
+        insert(UserModel),
+        [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "password": "x"}
+            for i in range(1, USERS + 1)
+        ],
+    )
+    now = datetime.now(timezone.utc)
+    db.session.execute(
+        insert(TaskModel),
+        [
+            {
+                "title": f"Task {i}",
+                "content": "Benchmark task",
+                "status": TaskStatus.PENDING,
+                "created_at": now,
+                "user_id": i % USERS + 1,
+                "tag_id": 1,
+            }
+            for i in range(TASKS)
+        ],
+    )
+    db.session.commit()
+
+
+def worker(app, seconds, write_ratio, seed, totals):
+    rng = random.Random(seed)
+    reads = writes = errors = 0
+    deadline = time.perf_counter() + seconds
+
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, USERS)
+            try:
+                if rng.random() < write_ratio:
+                    db.session.add(
+                        TaskModel(title="New", content="Content", user_id=user_id, tag_id=1)
+                    )
+                    db.session.commit()
+                    writes += 1
+                else:
+                    db.session.execute(
+                        select(TaskModel.id, TaskModel.title).where(TaskModel.user_id == user_id)
+                    ).all()
+                    db.session.rollback()
+                    reads += 1
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+
+        db.session.remove()
+
+    with totals["lock"]:
+        totals["reads"] += reads
+        totals["writes"] += writes
+        totals["errors"] += errors
+
+
+def run(name, base_config, threads, seconds, write_ratio):
+    with tempfile.TemporaryDirectory() as tmp:
+
+        class BenchConfig(base_config):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tmp, "bench.db")
+            TESTING = True
+
+        app = create_app(BenchConfig)
+
+        with app.app_context():
+            db.create_all()
+            populate()
+
+        totals = {"reads": 0, "writes": 0, "errors": 0, "lock": threading.Lock()}
+        pool = [
+            threading.Thread(target=worker, args=(app, seconds, write_ratio, i, totals))
+            for i in range(threads)
+        ]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+
+        with app.app_context():
+            db.engine.dispose()
+
+    print(
+        f"{name:<10} threads={threads} reads/s={totals['reads'] / seconds:9.1f} "
+        f"writes/s={totals['writes'] / seconds:8.1f} errors={totals['errors']}"
+    )
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    write_ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+    run("default", TestConfig, threads, seconds, write_ratio)
+    run("production", ProductionConfig, threads, seconds, write_ratio)
@@ -0,0 +1,200 @@
+"""Cold start of the app: imports, create_app and time to first response.
+
+Every run starts fresh interpreters, so nothing is cached in memory:
+
+- ``python -X importtime -c "import flaskr"`` gives the import time of each
+  module, summarized by top-level package;
+- a probe process times ``import flaskr``, ``create_app`` and a first
+  request through the test client;
+- a server process is started and timed until it answers a first request.
+
+Usage (from ``backend/``):
+python -m benchmarks.bench_startup [--runs N] [--top N]
+                                   [--json results.json] [--baseline baseline.json]
+                                   [--tolerance 0.1]
+
+Exits with status 1 when a figure is worse than the baseline by more than
+the tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.loadgen import fetch, percentile
+from benchmarks.results import compare, print_comparison, read_results, write_results
+from benchmarks.server import HOST, free_port
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import flaskr
+imported = time.perf_counter()
+from config import TestConfig
+from flaskr.db import db
+app = flaskr.create_app(TestConfig)
+created = time.perf_counter()
+with app.app_context():
+    db.create_all()
+    prepared = time.perf_counter()
+    app.test_client().get("/api/v1/tags")
+answered = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "create_app": created - imported,
+    "first_request": answered - prepared,
+}))
+"""
+
+
+def import_times():
+    """Self and cumulative microseconds of every module ``import flaskr`` loads."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import flaskr"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    modules = []
+
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(own), int(cumulative), len(name) - len(name.lstrip())))
+
+    return modules
+
+
+def summarize_imports(modules, top):
+    """Total import time and the packages that took most of it, in ms."""
+    packages = {}
+    for name, own, _, _ in modules:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + own
+
+    # Top-level imports are the least indented ones
+    depth = min(indent for _, _, _, indent in modules)
+    total = sum(cumulative for _, _, cumulative, indent in modules if indent == depth)
+
+    return total / 1000, [
+        (package, own / 1000)
+        for package, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    ]
+
+
+def probe():
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    ).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+async def first_response(port):
+    while True:
+        try:
+            return await fetch(HOST, port, "GET", "/api/v1/tags")
+        except OSError:
+            await asyncio.sleep(0.005)
+
+
+def time_to_first_response(path):
+    """Seconds from starting a server process until it answers a request."""
+    port = free_port()
+    env = {
+        **os.environ,
+        "APP_CONFIG": "production",
+        "DATABASE_URL": "sqlite:///" + path,
+        "JWT_SECRET_KEY": "bench-secret",
+        "SLOW_QUERY_LOG": os.path.join(os.path.dirname(path), "slow_queries.log"),
+    }
+
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.server", str(port)], env=env)
+
+    try:
+        asyncio.run(asyncio.wait_for(first_response(port), 60))
+        return time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def populate(path):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + path
+
+    app = create_app(BenchConfig)
+
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+
+
+def summary(seconds):
+    seconds = sorted(seconds)
+
+    return {
+        "runs": len(seconds),
+        "p50_ms": percentile(seconds, 0.50) * 1000,
+        "p95_ms": percentile(seconds, 0.95) * 1000,
+        "min_ms": seconds[0] * 1000,
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="Packages to list by import time.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare with results written earlier.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    total_ms, packages = summarize_imports(import_times(), args.top)
+    print(f"import flaskr (-X importtime): {total_ms:.1f}ms")
+    for package, own_ms in packages:
+        print(f"  {package:<28} {own_ms:8.1f}ms")
+
+    timings = {"import": [], "create_app": [], "first_request": [], "time_to_first_response": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        populate(path)
+
+        for _ in range(args.runs):
+            for phase, seconds in probe().items():
+                timings[phase].append(seconds)
+            timings["time_to_first_response"].append(time_to_first_response(path))
+
+    results = {phase: summary(seconds) for phase, seconds in timings.items()}
+    print(f"runs={args.runs}")
+    for phase, stats in results.items():
+        print(
+            f"{phase:<24} p50={stats['p50_ms']:8.1f}ms p95={stats['p95_ms']:8.1f}ms "
+            f"min={stats['min_ms']:8.1f}ms"
+        )
+    results["imports"] = {"total_ms": total_ms, "packages_ms": dict(packages)}
+
+    if args.json:
+        write_results(args.json, results, runs=args.runs)
+
+    if args.baseline:
+        rows = compare(results, read_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+
+        if any(row[-1] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,114 @@
+"""Per-query Python overhead of the hot controller queries.
+
+Runs the task list and sign-in lookups against a tiny in-memory database so
+the time is dominated by SQLAlchemy rather than SQLite, building the
+statement three ways:
+
+- inline:   ``select()`` rebuilt on every call (cache key computed each time)
+- lambda:   ``lambda_stmt`` (cache key taken from the lambda's code object)
+- prebuilt: module-level statement with ``bindparam`` (cache key memoized)
+
+Usage (from ``backend/``): python -m benchmarks.bench_statements [iterations]
+"""
+
+import statistics
+import sys
+import time
+
+from sqlalchemy import insert, lambda_stmt, select
+from config import TestConfig
+from flaskr import create_app
+from flaskr.controllers.auth_controller import USER_BY_EMAIL
+from flaskr.controllers.task_controller import TASKS_OF_USER
+from flaskr.db import db, statement_cache_stats
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel, TaskStatus
+from flaskr.models.user_model import UserModel
+
+TASK_COLUMNS = (
+    TaskModel.id,
+    TaskModel.title,
+    TaskModel.content,
+    TaskModel.status,
+    TaskModel.created_at,
+    TaskModel.tag_id,
+)
+
+
+def populate():
+    db.session.execute(insert(TagModel).values(id=1, name="Work"))
+    db.session.execute(
+        insert(UserModel).values(id=1, username="bench", email="bench@example.com", password="x")
+    )
+    db.session.execute(
+        insert(TaskModel),
+        [
+            {"title": f"Task {i}", "content": "Benchmark", "status": TaskStatus.PENDING,
+             "user_id": 1, "tag_id": 1}
+            for i in range(10)
+        ],
+    )
+    db.session.commit()
+
+
+TASK_LIST = {
+    "inline": lambda user_id: db.session.execute(
+        select(*TASK_COLUMNS).where(TaskModel.user_id == user_id)
+    ).all(),
+    "lambda": lambda user_id: db.session.execute(
+        lambda_stmt(lambda: select(*TASK_COLUMNS).where(TaskModel.user_id == user_id))
+    ).all(),
+    "prebuilt": lambda user_id: db.session.execute(
+        TASKS_OF_USER, {"user_id": user_id}
+    ).all(),
+}
+
+SIGN_IN = {
+    "inline": lambda email: db.session.execute(
+        select(UserModel).where(UserModel.email == email)
+    ).scalar_one_or_none(),
+    "lambda": lambda email: db.session.execute(
+        lambda_stmt(lambda: select(UserModel).where(UserModel.email == email))
+    ).scalar_one_or_none(),
+    "prebuilt": lambda email: db.session.execute(
+        USER_BY_EMAIL, {"email": email}
+    ).scalar_one_or_none(),
+}
+
+
+def measure(run, argument, iterations):
+    run(argument)
+    timings = []
+
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run(argument)
+        timings.append(time.perf_counter() - started)
+        # Keep the identity map from turning the lookup into a no-op
+        db.session.expunge_all()
+
+    return timings
+
+
+def report(name, timings):
+    print(
+        f"{name:<26} mean={statistics.mean(timings) * 1e6:8.1f}us "
+        f"p50={statistics.median(timings) * 1e6:8.1f}us"
+    )
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+    app = create_app(TestConfig)
+
+    with app.test_request_context():
+        db.create_all()
+        populate()
+
+        for variant, run in TASK_LIST.items():
+            report(f"get_all_on_user/{variant}", measure(run, 1, iterations))
+        for variant, run in SIGN_IN.items():
+            report(f"sign-in lookup/{variant}", measure(run, "bench@example.com", iterations))
+
+        print(statement_cache_stats()[0])
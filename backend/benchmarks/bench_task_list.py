@@ -0,0 +1,154 @@
+"""Task list benchmark.
+
+Compares the previous ``GET /tasks/user`` query, which joined ``tags`` to
+read ``tag_name``, with the current tasks-only query whose ``tagName`` is
+filled in from the in-memory tag map during serialization.
+
+Usage (from ``backend/``): python -m benchmarks.bench_task_list [tasks] [users]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, text
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel, TaskStatus
+from flaskr.models.user_model import UserModel
+from flaskr.schemas.schema import TaskSchema
+
+TAGS = 20
+CHUNK = 50_000
+
+
+def populate(task_count, user_count):
+    db.session.execute(
+        insert(TagModel), [{"id": i, "name": f"Tag {i}"} for i in range(1, TAGS + 1)]
+    )
+    db.session.execute(
+        insert(UserModel),
+        [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "password": "x"}
+            for i in range(1, user_count + 1)
+        ],
+    )
+
+    now = datetime.now(timezone.utc)
+    rng = random.Random(0)
+    for start in range(0, task_count, CHUNK):
+        db.session.execute(
+            insert(TaskModel),
+            [
+                {
+                    "title": f"Task {i}",
+                    "content": "Benchmark task",
+                    "status": TaskStatus.PENDING,
+                    "created_at": now,
+                    "user_id": rng.randint(1, user_count),
+                    "tag_id": rng.randint(1, TAGS),
+                }
+                for i in range(start, min(start + CHUNK, task_count))
+            ],
+        )
+    db.session.commit()
+
+
+def joined_query(user_id):
+    return (
+        select(
+            TaskModel.id,
+            TaskModel.title,
+            TaskModel.content,
+            TaskModel.status,
+            TaskModel.created_at,
+            TagModel.name.label("tag_name"),
+        )
+        .where(TaskModel.user_id == user_id)
+        .join(TagModel, TaskModel.tag_id == TagModel.id)
+    )
+
+
+def tasks_only_query(user_id):
+    return select(
+        TaskModel.id,
+        TaskModel.title,
+        TaskModel.content,
+        TaskModel.status,
+        TaskModel.created_at,
+        TaskModel.tag_id,
+    ).where(TaskModel.user_id == user_id)
+
+
+class JoinedTaskSchema(TaskSchema):
+    """Schema as it was before the tag map: tag_name read from the row."""
+
+    from marshmallow import fields
+
+    tag_name = fields.Str(dump_only=True, data_key="tagName")
+
+
+def explain(query):
+    compiled = query.compile(db.engine, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+
+    return "\n".join(f"    {row[-1]}" for row in rows)
+
+
+def measure(app, query, schema, user_ids):
+    timings = []
+
+    for user_id in user_ids:
+        with app.test_request_context():
+            started = time.perf_counter()
+            schema.dump(db.session.execute(query(user_id)).all())
+            timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+
+    print(
+        f"{name:<12} mean={statistics.mean(timings) * 1000:8.2f}ms "
+        f"p50={statistics.median(timings) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    user_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        class BenchConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(tmp, "bench.db")
+
+        app = create_app(BenchConfig)
+
+        with app.app_context():
+            db.create_all()
+            populate(task_count, user_count)
+
+            print("EXPLAIN QUERY PLAN (join):")
+            print(explain(joined_query(1)))
+            print("EXPLAIN QUERY PLAN (tasks only):")
+            print(explain(tasks_only_query(1)))
+
+            user_ids = random.Random(1).sample(range(1, user_count + 1), 50)
+            # Warm the page cache and the tag map before timing
+            measure(app, tasks_only_query, TaskSchema(many=True), user_ids[:2])
+
+            print(f"tasks={task_count} users={user_count} samples={len(user_ids)}")
+            report("join", measure(app, joined_query, JoinedTaskSchema(many=True), user_ids))
+            report("tag map", measure(app, tasks_only_query, TaskSchema(many=True), user_ids))
+
+            db.engine.dispose()
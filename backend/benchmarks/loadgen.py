@@ -0,0 +1,84 @@
+"""Minimal concurrent HTTP/1.1 load generator on asyncio streams.
+
+Each request uses its own connection (``Connection: close``) so
+``concurrency`` is the number of sockets open against the server at once.
+"""
+
+import asyncio
+import statistics
+import time
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def latency_summary(latencies, elapsed):
+    """Throughput and latency percentiles in milliseconds of one operation."""
+    latencies = sorted(latencies)
+
+    return {
+        "rps": len(latencies) / elapsed if elapsed else None,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else None,
+        "p50_ms": percentile(latencies, 0.50) * 1000 if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+    }
+
+
+async def fetch(host, port, method, path, headers=None, body=None):
+    """Send one request and return its status code and body."""
+    reader, writer = await asyncio.open_connection(host, port)
+
+    try:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+        await writer.drain()
+
+        response = await reader.read()
+        head, _, content = response.partition(b"\r\n\r\n")
+
+        return int(head.split(b" ", 2)[1]), content
+    finally:
+        writer.close()
+
+
+async def run_load(
+    host, port, path, method="GET", headers=None, body=None, concurrency=100, total=1000
+):
+    """Send ``total`` requests with at most ``concurrency`` in flight."""
+    latencies, statuses, errors = [], {}, 0
+    pending = iter(range(total))
+
+    async def user():
+        nonlocal errors
+
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                status, _ = await fetch(host, port, method, path, headers, body)
+            except OSError:
+                errors += 1
+                continue
+
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "statuses": statuses,
+        **latency_summary(latencies, elapsed),
+    }
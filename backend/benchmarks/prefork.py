@@ -0,0 +1,89 @@
+"""Minimal pre-fork master for benchmarks/bench_preload.py.
+
+Imports nothing of the app at module level, so that without preload the
+workers load everything after the fork, as gunicorn workers do.
+
+Usage (from ``backend/``, with the app's environment set):
+python -m benchmarks.prefork lazy|preload WORKERS REQUESTS
+"""
+
+import json
+import os
+import sys
+
+
+def memory_kib(pid):
+    """Rss, Pss and USS in KiB of process ``pid``."""
+    values = {}
+
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                values[name] = int(rest.split()[0])
+
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def serve(app, requests):
+    from flask_jwt_extended import create_access_token
+
+    if app is None:
+        from flaskr import create_app
+
+        app = create_app()
+
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+    client = app.test_client()
+
+    client.get("/openapi.json")
+    for _ in range(requests):
+        client.get("/api/v1/tasks/user", headers=headers)
+        client.get("/api/v1/tags")
+
+
+def master(mode, workers, requests):
+    """Fork ``workers``, measure them once they all served, print JSON."""
+    app = None
+    if mode == "preload":
+        from preload import app
+
+    ready_read, ready_write = os.pipe()
+    done_read, done_write = os.pipe()
+    pids = []
+
+    for _ in range(workers):
+        pid = os.fork()
+
+        if pid == 0:
+            os.close(ready_read)
+            os.close(done_write)
+            serve(app, requests)
+            os.write(ready_write, b".")
+            # Stay alive until the master has measured every worker
+            os.read(done_read, 1)
+            os._exit(0)
+
+        pids.append(pid)
+
+    os.close(ready_write)
+    os.close(done_read)
+    for _ in pids:
+        os.read(ready_read, 1)
+
+    measured = {"master": memory_kib(os.getpid()), "workers": [memory_kib(pid) for pid in pids]}
+
+    os.close(done_write)
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+    print(json.dumps(measured))
+
+
+if __name__ == "__main__":
+    master(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
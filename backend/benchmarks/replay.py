@@ -0,0 +1,308 @@
+"""Replay captured traffic against a local instance.
+
+Reads a file written with TRAFFIC_CAPTURE on (see ``flaskr/traffic.py``) and
+re-issues its requests ``--speed`` times faster than they were recorded.
+
+Each user pseudonym is played by one local user, ``seed<n>`` as created by
+``flask seed --users N``, and keeps its own order: a request waits for the
+user's earlier requests that had finished when it started in the capture,
+and overlaps the ones that had not. Requests without a user (sign-in,
+sign-up) are sent on their own schedule.
+
+Ids are not captured, so requests on a task use one of the local user's
+tasks, and bodies are synthesized at the captured size. Requests that
+cannot be filled in (another user's tag, deleting the account) are skipped
+and counted.
+
+Usage (from ``backend/``):
+python -m benchmarks.replay traffic.jsonl [--port 5000] [--speed 1]
+                            [--users 1000] [--first-user 1] [--password password]
+                            [--json results.json] [--baseline baseline.json]
+                            [--tolerance 0.1]
+
+Exits with status 1 when a figure is worse than the baseline by more than
+the tolerance.
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import re
+import sys
+import time
+import uuid
+
+from benchmarks.loadgen import fetch, latency_summary, percentile
+from benchmarks.results import compare, print_comparison, read_results, write_results
+from benchmarks.server import HOST
+from flaskr.traffic import read_traces
+
+PARAMETER = re.compile(r"<(?:\w+:)?(\w+)>")
+SKIPPED = {("DELETE", "/api/v1/users/account")}
+
+
+class LocalUser:
+    """A seeded user standing in for one pseudonym, and its task ids."""
+
+    def __init__(self, number):
+        self.number = number
+        self.email = f"seed{number}@example.com"
+        self.token = None
+        self.user_id = None
+        self.tasks = []
+
+
+def task_ids(content):
+    return [task["id"] for task in json.loads(content) if not task.get("archived")]
+
+
+def task_body(trace, status):
+    body = {"title": "Replayed task", "content": "", "status": status, "tagId": 1}
+    padding = trace["in"] - len(json.dumps(body))
+    body["content"] = "x" * max(padding, 1)
+
+    return body
+
+
+class Replay:
+    """Sends the traces and keeps latencies, statuses and skips per route."""
+
+    def __init__(self, port, traces, speed, password):
+        self.port = port
+        self.traces = traces
+        self.speed = speed
+        self.password = password
+        self.origin = traces[0]["ts"] if traces else 0
+        self.clock = None
+        self.lags = []
+        self.routes = {}
+        # Anonymous sign-ins take turns with the local users
+        self.sign_in_users = None
+
+    def route(self, trace):
+        key = f"{trace['m']} {trace['r']}"
+
+        if key not in self.routes:
+            self.routes[key] = {"latencies": [], "statuses": {}, "failures": 0, "skipped": 0}
+
+        return self.routes[key]
+
+    async def sign_in(self, user):
+        status, content = await fetch(
+            HOST, self.port, "POST", "/api/v1/auth/sign-in",
+            body=json.dumps({"email": user.email, "password": self.password}).encode(),
+        )
+        if status != 200:
+            raise RuntimeError(f"Cannot sign in as {user.email}, run flask seed first")
+
+        user.token = json.loads(content)["token"]
+        claims = user.token.split(".")[1]
+        user.user_id = json.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))["sub"]
+
+        status, content = await fetch(
+            HOST, self.port, "GET", "/api/v1/tasks/user",
+            {"Authorization": f"Bearer {user.token}"},
+        )
+        user.tasks = task_ids(content) if status == 200 else []
+
+    def request(self, trace, user):
+        """Path and body to send for ``trace``, or None when it cannot be filled in."""
+        method, route = trace["m"], trace["r"]
+
+        if route is None or (method, route) in SKIPPED:
+            return None
+
+        values = {}
+        for name in PARAMETER.findall(route):
+            if name == "task_id" and user and user.tasks:
+                values[name] = user.tasks.pop() if method == "DELETE" else user.tasks[-1]
+            elif name == "user_id" and user:
+                values[name] = user.user_id
+            else:
+                return None
+
+        path = PARAMETER.sub(lambda match: str(values[match.group(1)]), route)
+        query = "&".join(f"{name}={value}" for name, value in trace["q"].items() if value is not None)
+        if query:
+            path += "?" + query
+
+        if (method, route) == ("POST", "/api/v1/auth/sign-in"):
+            signing_in = user or next(self.sign_in_users)
+            body = {"email": signing_in.email, "password": self.password}
+        elif (method, route) == ("POST", "/api/v1/users"):
+            name = "r" + uuid.uuid4().hex[:12]
+            body = {"username": name, "email": f"{name}@example.com", "password": self.password}
+        elif (method, route) == ("POST", "/api/v1/tags"):
+            body = {"name": "r" + uuid.uuid4().hex[:12]}
+        elif (method, route) == ("POST", "/api/v1/tasks"):
+            body = task_body(trace, "PENDING")
+        elif (method, route) == ("PUT", "/api/v1/tasks/<task_id>"):
+            body = task_body(trace, "IN_PROGRESS")
+        elif trace["in"]:
+            return None
+        else:
+            body = None
+
+        return path, json.dumps(body).encode() if body is not None else None
+
+    async def send(self, trace, user):
+        stats = self.route(trace)
+        filled = self.request(trace, user)
+
+        if filled is None:
+            stats["skipped"] += 1
+            return
+
+        path, body = filled
+        headers = {"Authorization": f"Bearer {user.token}"} if user else {}
+
+        started = time.perf_counter()
+        try:
+            status, content = await fetch(HOST, self.port, trace["m"], path, headers, body)
+        except OSError:
+            stats["failures"] += 1
+            return
+
+        stats["latencies"].append(time.perf_counter() - started)
+        stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+
+        # Creating a task returns no id, so listings keep the ids current
+        if user and status == 200 and (trace["m"], trace["r"]) == ("GET", "/api/v1/tasks/user"):
+            user.tasks = task_ids(content)
+
+    async def wait_until(self, trace):
+        loop = asyncio.get_running_loop()
+        scheduled = self.clock + (trace["ts"] - self.origin) / self.speed
+
+        await asyncio.sleep(max(0, scheduled - loop.time()))
+        self.lags.append(loop.time() - scheduled)
+
+    async def play_user(self, traces, user):
+        in_flight = []
+
+        for trace in traces:
+            await self.wait_until(trace)
+
+            # Requests that had finished when this one started come first
+            finished = [task for ended, task in in_flight if ended <= trace["ts"]]
+            if finished:
+                await asyncio.gather(*finished)
+            in_flight = [(ended, task) for ended, task in in_flight if not task.done()]
+
+            in_flight.append(
+                (trace["ts"] + trace["ms"] / 1000, asyncio.create_task(self.send(trace, user)))
+            )
+
+        await asyncio.gather(*(task for _, task in in_flight))
+
+    async def play_anonymous(self, trace):
+        await self.wait_until(trace)
+        await self.send(trace, None)
+
+    async def run(self, users, first_user):
+        by_pseudonym = {}
+        for trace in self.traces:
+            if trace["u"] is not None:
+                by_pseudonym.setdefault(trace["u"], []).append(trace)
+
+        local_users = [LocalUser(first_user + index) for index in range(users)]
+        players = {
+            pseudonym: local_users[index % users] for index, pseudonym in enumerate(by_pseudonym)
+        }
+        self.sign_in_users = itertools.cycle(local_users)
+
+        # Setup, outside the replayed schedule
+        semaphore = asyncio.Semaphore(32)
+
+        async def sign_in(user):
+            async with semaphore:
+                await self.sign_in(user)
+
+        await asyncio.gather(*(sign_in(user) for user in set(players.values())))
+
+        self.clock = asyncio.get_running_loop().time()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(self.play_user(traces, players[pseudonym]) for pseudonym, traces in by_pseudonym.items()),
+            *(self.play_anonymous(trace) for trace in self.traces if trace["u"] is None),
+        )
+
+        return time.perf_counter() - started
+
+    def results(self, elapsed):
+        results = {
+            route: {
+                "requests": len(stats["latencies"]),
+                "failures": stats["failures"],
+                "skipped": stats["skipped"],
+                "statuses": stats["statuses"],
+                **latency_summary(stats["latencies"], elapsed),
+            }
+            for route, stats in sorted(self.routes.items())
+        }
+        lags = sorted(self.lags)
+        requests = sum(stats["requests"] for stats in results.values())
+        results["total"] = {
+            "requests": requests,
+            "failures": sum(stats["failures"] for stats in results.values()),
+            "skipped": sum(stats["skipped"] for stats in results.values()),
+            "rps": requests / elapsed if elapsed else None,
+            # How late requests went out; large values mean the replay could
+            # not keep up with --speed
+            "lag_p95_ms": percentile(lags, 0.95) * 1000 if lags else None,
+            "lag_max_ms": lags[-1] * 1000 if lags else None,
+        }
+
+        return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", help="File written with TRAFFIC_CAPTURE on.")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--speed", type=float, default=1.0, help="2 replays twice as fast.")
+    parser.add_argument("--users", type=int, default=1000, help="Seeded users to play with.")
+    parser.add_argument("--first-user", type=int, default=1, help="n of the first seed<n> user.")
+    parser.add_argument("--password", default="password", help="Password of the seeded users.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Compare with results written earlier.")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.port, read_traces(args.capture), args.speed, args.password)
+    elapsed = asyncio.run(replay.run(args.users, args.first_user))
+    results = replay.results(elapsed)
+
+    print(f"traces={len(replay.traces)} speed={args.speed}x elapsed={elapsed:.1f}s")
+    for route, stats in results.items():
+        if route == "total":
+            continue
+        print(
+            f"{route:<40} requests={stats['requests']:<6} failures={stats['failures']:<4} "
+            f"skipped={stats['skipped']:<4} p50={stats['p50_ms'] or 0:8.1f}ms "
+            f"p95={stats['p95_ms'] or 0:8.1f}ms p99={stats['p99_ms'] or 0:8.1f}ms"
+        )
+    total = results["total"]
+    print(
+        f"total requests={total['requests']} failures={total['failures']} "
+        f"skipped={total['skipped']} rps={total['rps'] or 0:.1f} "
+        f"lag p95={total['lag_p95_ms'] or 0:.1f}ms max={total['lag_max_ms'] or 0:.1f}ms"
+    )
+
+    if args.json:
+        write_results(args.json, results, capture=args.capture, speed=args.speed)
+
+    if args.baseline:
+        rows = compare(results, read_results(args.baseline), args.tolerance)
+        print_comparison(rows)
+
+        if any(row[-1] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
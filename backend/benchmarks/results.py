@@ -0,0 +1,84 @@
+"""Benchmark results as JSON and their comparison with a stored baseline.
+
+A results file maps benchmark names to their figures. Only the median,
+the 95th percentile (lower is better) and throughput (higher is better) are
+compared; means and 99th percentiles move too much between runs to gate on.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p50_us", "p95_us")
+HIGHER_IS_BETTER = ("rps", "ops")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, benchmarks, **settings):
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "meta": {
+                    "recorded_at": datetime.now(timezone.utc).isoformat(),
+                    "commit": git_commit(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    **settings,
+                },
+                "benchmarks": benchmarks,
+            },
+            file,
+            indent=2,
+        )
+
+
+def read_results(path):
+    with open(path) as file:
+        return json.load(file)["benchmarks"]
+
+
+def compare(benchmarks, baseline, tolerance):
+    """Rows of ``(name, figure, baseline, current, change, regressed)``.
+
+    ``change`` is relative to the baseline and positive when the current run
+    is worse; a figure regressed when it got worse by more than ``tolerance``.
+    """
+    rows = []
+
+    for name, figures in benchmarks.items():
+        for figure, current in figures.items():
+            before = baseline.get(name, {}).get(figure)
+
+            if not isinstance(current, (int, float)) or not isinstance(before, (int, float)):
+                continue
+            if before == 0:
+                continue
+
+            if figure in LOWER_IS_BETTER:
+                change = (current - before) / before
+            elif figure in HIGHER_IS_BETTER:
+                change = (before - current) / before
+            else:
+                continue
+
+            rows.append((name, figure, before, current, change, change > tolerance))
+
+    return rows
+
+
+def print_comparison(rows):
+    for name, figure, before, current, change, regressed in rows:
+        flag = "REGRESSED" if regressed else ""
+        print(
+            f"{name:<28} {figure:<8} {before:12.2f} -> {current:12.2f} "
+            f"{(current - before) / before * 100:+7.1f}% {flag}"
+        )
@@ -0,0 +1,59 @@
+"""Run the app in a separate process for HTTP benchmarks."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+HOST = "127.0.0.1"
+
+
+def serve(port):
+    import logging
+    from werkzeug.serving import ThreadedWSGIServer, make_server
+    from flaskr import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    # Default listen backlog is 128, which would refuse most connections
+    ThreadedWSGIServer.request_queue_size = 2048
+    make_server(HOST, port, create_app(), threaded=True).serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port):
+    for _ in range(100):
+        try:
+            socket.create_connection((HOST, port)).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+@contextmanager
+def running_server(env):
+    """Start ``serve()`` with ``env`` added to the environment, yield its port."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.server", str(port)],
+        env={**os.environ, **env},
+    )
+
+    try:
+        wait_for(port)
+        yield port
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]))
@@ -10,20 +10,117 @@ load_dotenv(os.path.join(basedir, ".env"))
 class Config(object):
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=4)
+    ADMIN_USER_IDS = [
+        int(user_id) for user_id in os.getenv("ADMIN_USER_IDS", "").split(",") if user_id
+    ]
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Applied to every new SQLite connection. SQLite ships with foreign keys
+    # disabled; ON DELETE CASCADE relies on them.
+    SQLITE_PRAGMAS = {"foreign_keys": "ON"}
+    # Optional read replica, used for SELECTs made by GET requests
+    REPLICA_BIND = "replica"
+    REPLICA_PIN_SECONDS = 5
+    # Optional task shards: tasks live in the "tasks_<n>" binds, users and
+    # tags stay on the primary
+    TASK_SHARD_URLS = [url for url in os.getenv("TASK_SHARD_URLS", "").split(",") if url]
+    TASK_SHARDS = len(TASK_SHARD_URLS)
+    SQLALCHEMY_BINDS = {
+        **(
+            {"replica": os.getenv("REPLICA_DATABASE_URL")}
+            if os.getenv("REPLICA_DATABASE_URL")
+            else {}
+        ),
+        **{f"tasks_{index}": url for index, url in enumerate(TASK_SHARD_URLS)},
+    }
     API_TITLE = "Rest API"
     API_VERSION = "v1"
     OPENAPI_VERSION = "3.0.2"
     OPENAPI_URL_PREFIX = "/"
     OPENAPI_SWAGGER_UI_PATH = "/docs"
     OPENAPI_SWAGGER_UI_URL = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
+    # Spec written at build time with `flask openapi write`, see flaskr/openapi.py
+    OPENAPI_SPEC_FILE = os.getenv("OPENAPI_SPEC_FILE")
+    JOBS_CONCURRENCY = 4
+    JOBS_POLL_INTERVAL = 1.0
+    JOBS_MAX_ATTEMPTS = 5
+    JOBS_BACKOFF_BASE = 2
+    JOBS_BACKOFF_MAX = 300
+    JOBS_LEASE_SECONDS = 600
+    ACCOUNT_DELETION_IN_BACKGROUND = False
+    TASKS_ARCHIVE_AFTER_DAYS = 30
+    TASKS_ARCHIVE_BATCH_SIZE = 1000
+    SERVER_TIMING = True
+    SQL_REPEATED_STATEMENT_THRESHOLD = 10
+    # Statements slower than this are logged with their plan, None disables it
+    SLOW_QUERY_SECONDS = None
+    SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", os.path.join(basedir, "logs", "slow_queries.log"))
+    SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS = 5
+    METRICS = True
+    # Shared by the worker processes of one server, see flaskr/metrics.py
+    METRICS_DIR = os.getenv("METRICS_DIR")
+    METRICS_FLUSH_SECONDS = 1.0
+    # Scrapers send it as a bearer token; without it only localhost may scrape
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    PROFILING = os.getenv("PROFILING", "").lower() in ("1", "true")
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+    PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(basedir, "profiles"))
+    TRACEMALLOC = os.getenv("TRACEMALLOC", "").lower() in ("1", "true")
+    TRACEMALLOC_FRAMES = 1
+    TRACEMALLOC_SNAPSHOT_EVERY = 10
+    TRACEMALLOC_TOP = 10
+    # Anonymized request traces for benchmarks/replay.py, see flaskr/traffic.py
+    TRAFFIC_CAPTURE = os.getenv("TRAFFIC_CAPTURE", "").lower() in ("1", "true")
+    TRAFFIC_CAPTURE_FILE = os.getenv(
+        "TRAFFIC_CAPTURE_FILE", os.path.join(basedir, "logs", "traffic.jsonl")
+    )
+    # Keys the user pseudonyms, defaults to JWT_SECRET_KEY
+    TRAFFIC_CAPTURE_KEY = os.getenv("TRAFFIC_CAPTURE_KEY")
+    TAGS_CACHE_TTL = 60
+    TAGS_CACHE_MAX_AGE = 60
+    TAGS_PAGE_SIZE = 50
+    TAGS_TOP_K = 5
+    CORS_EXPOSE_HEADERS = ["X-Next-Cursor"]
 
 
 class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(basedir, "data.db")
 
 
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        "DATABASE_URL", "sqlite:///" + os.path.join(basedir, "data.db")
+    )
+    SQLITE_PRAGMAS = {
+        # Readers no longer block the writer and vice versa
+        "journal_mode": "WAL",
+        # Safe with WAL; only fsyncs at checkpoints
+        "synchronous": "NORMAL",
+        # Negative values are KiB: 64 MiB page cache per connection
+        "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-64000"),
+        "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+        # Wait for the write lock instead of failing with "database is locked"
+        "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+    }
+    SLOW_QUERY_SECONDS = 0.1
+
+
 class TestConfig(Config):
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     TESTING = True
     JWT_SECRET_KEY = "test-secret-key"
+
+
+def get_config():
+    """Config class selected by the APP_CONFIG environment variable."""
+    configs = {"development": DevelopmentConfig, "production": ProductionConfig}
+    name = os.getenv("APP_CONFIG", "development")
+
+    if name not in configs:
+        raise RuntimeError(
+            f"Unknown APP_CONFIG {name!r}, expected one of: {', '.join(configs)}"
+        )
+
+    return configs[name]
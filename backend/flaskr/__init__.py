@@ -1,33 +1,64 @@
 import flaskr.models
 
 from flask import Flask
-from config import DevelopmentConfig
+from werkzeug.utils import import_string
+from config import get_config
+from flaskr.cli import COMMANDS, LazyAppGroup
 from flaskr.extensions import migrate, api, cors, jwt
-from flaskr.db import db
+from flaskr.db import db, init_db
+from flaskr.instrumentation import init_instrumentation
+from flaskr.openapi import init_openapi
+from flaskr.sharding import init_sharding
+from flaskr.tag_catalogue import tag_catalogue
 
 from flaskr.routes.auth_route import bp as auth_route
 from flaskr.routes.user_route import bp as user_route
 from flaskr.routes.tag_route import bp as tag_route
 from flaskr.routes.task_route import bp as task_route
+from flaskr.routes.job_route import bp as job_route
+from flaskr.routes.stats_route import bp as stats_route
+
+# Imported only when their flag is on
+OPTIONAL_EXTENSIONS = {
+    "METRICS": "flaskr.metrics:init_metrics",
+    "PROFILING": "flaskr.profiling:init_profiling",
+    "TRACEMALLOC": "flaskr.memory:init_memory_tracing",
+    "TRAFFIC_CAPTURE": "flaskr.traffic:init_traffic_capture",
+}
 
 
 def create_app(test_config=None):
     app = Flask(__name__)
+    app.cli = LazyAppGroup(app.name)
 
     if test_config is None:
-        app.config.from_object(DevelopmentConfig)
+        app.config.from_object(get_config())
     else:
         app.config.from_object(test_config)
 
-    db.init_app(app)
+    init_db(app)
+    init_sharding(app)
+    init_instrumentation(app)
+
+    for flag, init_extension in OPTIONAL_EXTENSIONS.items():
+        if app.config[flag]:
+            import_string(init_extension)(app)
+
     migrate.init_app(app, db)
     api.init_app(app)
+    init_openapi(app)
     cors.init_app(app)
     jwt.init_app(app)
+    tag_catalogue.init_app(app)
 
     api.register_blueprint(auth_route, url_prefix="/api/v1")
     api.register_blueprint(user_route, url_prefix="/api/v1")
     api.register_blueprint(tag_route, url_prefix="/api/v1")
     api.register_blueprint(task_route, url_prefix="/api/v1")
+    api.register_blueprint(job_route, url_prefix="/api/v1")
+    api.register_blueprint(stats_route, url_prefix="/api/v1")
+
+    for name, command in COMMANDS.items():
+        app.cli.add_lazy_command(name, command)
 
     return app
@@ -0,0 +1,39 @@
+from flask.cli import AppGroup
+from werkzeug.utils import import_string
+
+# Imported when the command is run or listed: servers never need them
+COMMANDS = {
+    "worker": "flaskr.commands.worker_command:worker_command",
+    "tags": "flaskr.commands.tags_command:tags_command",
+    "replica": "flaskr.commands.replica_command:replica_command",
+    "shards": "flaskr.commands.shards_command:shards_command",
+    "tasks": "flaskr.commands.tasks_command:tasks_command",
+    "profiles": "flaskr.commands.profiles_command:profiles_command",
+    "seed": "flaskr.commands.seed_command:seed_command",
+}
+
+
+class LazyAppGroup(AppGroup):
+    """``app.cli`` whose commands are loaded the first time they are looked up.
+
+    ``add_lazy_command`` takes a ``module:attribute`` import path or a
+    function returning the command.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = {}
+
+    def add_lazy_command(self, name, loader):
+        self.lazy_commands[name] = loader
+
+    def list_commands(self, ctx):
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx, name):
+        if name not in self.commands and name in self.lazy_commands:
+            loader = self.lazy_commands[name]
+            command = import_string(loader) if isinstance(loader, str) else loader()
+            self.add_command(command, name)
+
+        return super().get_command(ctx, name)
@@ -0,0 +1,47 @@
+import os
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flaskr.profiling import list_profiles, render_profile
+
+profiles_command = AppGroup("profiles", help="Inspect saved request profiles.")
+
+
+@profiles_command.command("list")
+@click.option("--endpoint", help="Only profiles of this endpoint, e.g. tasks.TasksOnUser.")
+@click.option("--limit", default=20, show_default=True)
+def list_command(endpoint, limit):
+    """List saved profiles, newest first."""
+    profiles = [
+        profile for profile in list_profiles(current_app.config["PROFILE_DIR"])
+        if endpoint is None or profile["endpoint"] == endpoint
+    ]
+
+    if not profiles:
+        click.echo("No profiles saved")
+        return
+
+    for profile in profiles[:limit]:
+        click.echo(
+            f"{profile['recorded_at']:%Y-%m-%d %H:%M:%S}  {profile['method']:<6} "
+            f"{profile['endpoint']:<28} {profile['elapsed_ms']:9.1f}ms  {profile['name']}"
+        )
+
+
+@profiles_command.command("show")
+@click.argument("name")
+@click.option(
+    "--sort",
+    type=click.Choice(["cumulative", "tottime", "calls"]),
+    default="cumulative",
+    show_default=True,
+)
+@click.option("--limit", default=20, show_default=True, help="Functions to show.")
+def show_command(name, sort, limit):
+    """Render the hot spots of the profile NAME."""
+    path = os.path.join(current_app.config["PROFILE_DIR"], os.path.basename(name))
+
+    if not os.path.exists(path):
+        raise click.ClickException(f"No profile named {name}")
+
+    click.echo(render_profile(path, sort, limit))
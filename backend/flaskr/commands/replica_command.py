@@ -0,0 +1,24 @@
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from flaskr.db import db, sync_replica
+
+replica_command = AppGroup("replica", help="Manage the local SQLite read replica.")
+
+
+@replica_command.command("sync")
+@click.option("--interval", type=float, help="Keep syncing every INTERVAL seconds.")
+def sync_command(interval):
+    """Copy the primary database onto the replica."""
+    if current_app.config["REPLICA_BIND"] not in db.engines:
+        raise click.ClickException("No replica configured in SQLALCHEMY_BINDS")
+
+    while True:
+        sync_replica()
+        click.echo("Replica synced")
+
+        if interval is None:
+            break
+
+        time.sleep(interval)
@@ -0,0 +1,47 @@
+import random
+import click
+from flaskr.seeding import seed_tags, seed_tasks, seed_until, seed_users
+
+
+@click.command("seed")
+@click.option("--users", type=int, default=0, help="Users to create, named seed<id>.")
+@click.option("--tasks", type=int, default=0, help="Tasks spread over the new users.")
+@click.option("--extra-tags", type=int, default=0, help="Numbered tags besides the default ones.")
+@click.option("--password", default="password", help="Password of every new user.")
+@click.option("--days", type=int, default=365, help="How far back created_at goes.")
+@click.option("--seed", "seed_value", type=int, default=42, help="Same seed, same rows.")
+@click.option("--batch-size", type=int, default=100_000, help="Rows per transaction.")
+def seed_command(users, tasks, extra_tags, password, days, seed_value, batch_size):
+    """Insert the default tags, then optional synthetic users and tasks.
+
+    Missing tags are added on every run, so it is safe to run again.
+    """
+    if tasks and not users:
+        raise click.UsageError("--tasks needs --users, tasks go to the users created.")
+
+    click.echo(f"Inserted {seed_tags(extra_tags)} tags")
+
+    if not users:
+        return
+
+    user_ids = seed_users(
+        users,
+        password,
+        batch_size,
+        lambda done, total: click.echo(f"\rInserted {done}/{total} users", nl=False),
+    )
+    click.echo()
+
+    if not tasks:
+        return
+
+    seed_tasks(
+        tasks,
+        user_ids,
+        random.Random(seed_value),
+        seed_until(),
+        days,
+        batch_size,
+        lambda done, total: click.echo(f"\rInserted {done}/{total} tasks", nl=False),
+    )
+    click.echo()
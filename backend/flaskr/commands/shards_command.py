@@ -0,0 +1,81 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select
+from flaskr.sharding import (
+    TASKS,
+    create_shards,
+    move_user_tasks,
+    rebalance,
+    shard_engine,
+)
+
+shards_command = AppGroup("shards", help="Manage the task shards.")
+
+
+def require_shards():
+    if not current_app.config["TASK_SHARDS"]:
+        raise click.ClickException("No task shards configured in TASK_SHARD_URLS")
+
+
+def progress_reporter(label):
+    def report(done, total):
+        click.echo(f"\r{label}: {done}/{total} tasks", nl=done >= total)
+
+    return report
+
+
+@shards_command.command("init")
+def init_command():
+    """Create the tasks table on every shard and move existing tasks there."""
+    require_shards()
+
+    moved = create_shards()
+    click.echo(f"Initialized {current_app.config['TASK_SHARDS']} shards")
+    click.echo(f"Moved {moved} tasks off the primary")
+
+
+@shards_command.command("status")
+def status_command():
+    """Show how many tasks each shard holds."""
+    require_shards()
+
+    for index in range(current_app.config["TASK_SHARDS"]):
+        with shard_engine(index).connect() as connection:
+            count = connection.execute(
+                select(func.count()).select_from(TASKS)
+            ).scalar_one()
+
+        click.echo(f"Shard {index}: {count} tasks")
+
+
+@shards_command.command("move")
+@click.argument("user_id", type=int)
+@click.argument("shard", type=int)
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+def move_command(user_id, shard, batch_size):
+    """Move the tasks of USER_ID to SHARD while the app keeps serving."""
+    require_shards()
+
+    try:
+        moved = move_user_tasks(
+            user_id, shard, batch_size, progress_reporter(f"User {user_id}")
+        )
+    except ValueError as err:
+        raise click.ClickException(str(err))
+
+    click.echo(f"Moved {moved} tasks of user {user_id} to shard {shard}")
+
+
+@shards_command.command("rebalance")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+def rebalance_command(batch_size):
+    """Move every user back to their home shard, e.g. after adding a shard."""
+    require_shards()
+
+    users = 0
+    for user_id, source, target, moved in rebalance(batch_size):
+        click.echo(f"User {user_id}: {moved} tasks from shard {source} to {target}")
+        users += 1
+
+    click.echo(f"Rebalanced {users} users")
@@ -0,0 +1,38 @@
+import click
+from flask import current_app
+from flask_migrate.cli import db as db_command
+from flaskr.slow_queries import read_slow_queries, summarize_slow_queries
+
+
+@db_command.command("slowlog")
+@click.option("--limit", default=10, show_default=True, help="Fingerprints to show.")
+@click.option(
+    "--sort",
+    type=click.Choice(["total", "max", "mean", "count"]),
+    default="total",
+    show_default=True,
+)
+def slowlog_command(limit, sort):
+    """Summarize the slow query log by statement fingerprint."""
+    key = "count" if sort == "count" else f"{sort}_ms"
+    summary = sorted(
+        summarize_slow_queries(read_slow_queries(current_app.config["SLOW_QUERY_LOG"])),
+        key=lambda stats: stats[key],
+        reverse=True,
+    )
+
+    if not summary:
+        click.echo("No slow queries logged")
+        return
+
+    for stats in summary[:limit]:
+        click.echo(
+            f"{stats['fingerprint']}  count={stats['count']} total={stats['total_ms']:.1f}ms "
+            f"mean={stats['mean_ms']:.1f}ms max={stats['max_ms']:.1f}ms"
+        )
+        click.echo(f"  {stats['sql']}")
+        if stats["endpoints"]:
+            click.echo(f"  endpoints: {', '.join(stats['endpoints'])}")
+        for line in stats["plan"] or ():
+            click.echo(f"  plan: {line}")
+        click.echo()
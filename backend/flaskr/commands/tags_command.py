@@ -0,0 +1,86 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select
+from werkzeug.exceptions import HTTPException
+from flaskr.controllers.tag_controller import TagController
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+
+tags_command = AppGroup("tags", help="Reorganize tags across all users.")
+
+
+def resolve(name):
+    tag_id = db.session.execute(
+        select(TagModel.id).where(TagModel.name == name)
+    ).scalar_one_or_none()
+
+    if tag_id is None:
+        raise click.ClickException(f"Tag not found: {name}")
+
+    return tag_id
+
+
+def run(operation, *args, **kwargs):
+    try:
+        return operation(*args, **kwargs)
+    except HTTPException as err:
+        raise click.ClickException(err.data["message"])
+
+
+def progress_reporter(label):
+    def report(done, total):
+        click.echo(f"\r{label}: {done}/{total} tasks", nl=done >= total)
+
+    return report
+
+
+@tags_command.command("merge")
+@click.argument("source")
+@click.argument("target")
+@click.option("--batch-size", type=int, help="Move tasks in id ranges and report progress.")
+def merge_command(source, target, batch_size):
+    """Move every task tagged SOURCE to TARGET and delete SOURCE."""
+    run(
+        TagController.merge,
+        resolve(source),
+        resolve(target),
+        batch_size,
+        progress_reporter(f"Merging {source} into {target}") if batch_size else None,
+    )
+    click.echo(f"Merged {source} into {target}")
+
+
+@tags_command.command("rename")
+@click.argument("name")
+@click.argument("new_name")
+def rename_command(name, new_name):
+    """Rename tag NAME to NEW_NAME."""
+    run(TagController.rename, {"name": new_name}, resolve(name))
+    click.echo(f"Renamed {name} to {new_name}")
+
+
+@tags_command.command("delete")
+@click.argument("name")
+@click.option("--reassign-to", help="Tag that receives the deleted tag's tasks.")
+@click.option("--batch-size", type=int, help="Move tasks in id ranges and report progress.")
+def delete_command(name, reassign_to, batch_size):
+    """Delete tag NAME, moving its tasks to --reassign-to if given."""
+    if reassign_to is None:
+        run(TagController.delete, resolve(name))
+    else:
+        run(
+            TagController.merge,
+            resolve(name),
+            resolve(reassign_to),
+            batch_size,
+            progress_reporter(f"Moving {name} to {reassign_to}") if batch_size else None,
+        )
+    click.echo(f"Deleted {name}")
+
+
+@tags_command.command("recount")
+@click.option("--user", "user_ids", type=int, multiple=True, help="Only recount this user's tags.")
+def recount_command(user_ids):
+    """Rebuild the per-user tag usage counts from the tasks."""
+    rows = run(TagController.recount_usage, list(user_ids) or None)
+    click.echo(f"Recounted {rows} tag usage rows")
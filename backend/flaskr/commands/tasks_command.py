@@ -0,0 +1,30 @@
+import click
+from flask.cli import AppGroup
+from flaskr.controllers.task_controller import TaskController
+from flaskr.db import db
+from flaskr.jobs import enqueue
+
+tasks_command = AppGroup("tasks", help="Maintain the tasks tables.")
+
+
+@tasks_command.command("archive")
+@click.option("--older-than-days", type=int, help="Defaults to TASKS_ARCHIVE_AFTER_DAYS.")
+@click.option("--batch-size", type=int, help="Defaults to TASKS_ARCHIVE_BATCH_SIZE.")
+@click.option("--enqueue", "in_background", is_flag=True, help="Queue it for the worker instead.")
+def archive_command(older_than_days, batch_size, in_background):
+    """Move old COMPLETED tasks to tasks_archive in batches."""
+    if in_background:
+        queued = enqueue(
+            "archive_tasks",
+            {"older_than_days": older_than_days, "batch_size": batch_size},
+        )
+        db.session.commit()
+        click.echo(f"Queued job {queued.id}")
+        return
+
+    archived = TaskController.archive(
+        older_than_days,
+        batch_size,
+        lambda done: click.echo(f"\rArchived {done} tasks", nl=False),
+    )
+    click.echo(f"\rArchived {archived} tasks")
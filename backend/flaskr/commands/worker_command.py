@@ -0,0 +1,39 @@
+import signal
+import threading
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from flaskr.jobs import Worker
+
+
+@click.command("worker")
+@click.option("--concurrency", type=int, help="Number of worker threads.")
+@click.option("--poll-interval", type=float, help="Seconds to wait when idle.")
+@with_appcontext
+def worker_command(concurrency, poll_interval):
+    """Run queued background jobs until SIGTERM or SIGINT.
+
+    Jobs already running are finished before the worker exits, so none is
+    left holding its lease.
+    """
+    worker = Worker(current_app._get_current_object(), concurrency, poll_interval)
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        stopping.set()
+
+    previous = {
+        signum: signal.signal(signum, request_stop)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+
+    try:
+        worker.start()
+        click.echo(f"Job worker running with {worker.concurrency} threads")
+        stopping.wait()
+
+        click.echo("Stopping job worker")
+        worker.stop()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
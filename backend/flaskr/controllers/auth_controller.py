@@ -1,18 +1,20 @@
 from flask_jwt_extended import create_access_token
 from flask_smorest import abort
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import SQLAlchemyError
 from flaskr.db import db
 from flaskr.models.user_model import UserModel
 from flaskr.utils import check_password
 
+USER_BY_EMAIL = select(UserModel).where(UserModel.email == bindparam("email"))
+
 
 class AuthController:
     @staticmethod
     def sign_in(data):
         try:
             user_registered = db.session.execute(
-                select(UserModel).where(UserModel.email == data["email"])
+                USER_BY_EMAIL, {"email": data["email"]}
             ).scalar_one_or_none()
 
             if (
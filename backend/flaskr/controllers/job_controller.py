@@ -0,0 +1,40 @@
+from flask_jwt_extended import get_jwt_identity
+from flask_smorest import abort
+from sqlalchemy import select
+from sqlalchemy.exc import NoResultFound, SQLAlchemyError
+from flaskr.db import db
+from flaskr.models.job_model import JobModel
+
+
+class JobController:
+    @staticmethod
+    def get_all_on_user():
+        try:
+            user_id = get_jwt_identity()
+
+            return (
+                db.session.execute(
+                    select(JobModel)
+                    .where(JobModel.user_id == user_id)
+                    .order_by(JobModel.id.desc())
+                )
+                .scalars()
+                .all()
+            )
+        except SQLAlchemyError:
+            abort(500, message="Internal server error while fetching jobs on user")
+
+    @staticmethod
+    def get_by_id(job_id):
+        try:
+            user_id = get_jwt_identity()
+
+            return db.session.execute(
+                select(JobModel).where(
+                    JobModel.id == job_id, JobModel.user_id == user_id
+                )
+            ).scalar_one()
+        except NoResultFound:
+            abort(404, message="Job not found")
+        except SQLAlchemyError:
+            abort(500, message="Internal server error while fetching job")
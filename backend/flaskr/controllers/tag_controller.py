@@ -1,32 +1,384 @@
+import base64
+import binascii
+from collections import Counter
+from flask import current_app
+from flask_jwt_extended import get_jwt_identity
 from flask_smorest import abort
-from sqlalchemy import select
-from sqlalchemy.exc import SQLAlchemyError
-from flaskr.db import db
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, NoResultFound, SQLAlchemyError
+from sqlalchemy.orm import aliased
+from flaskr.db import ON_CONFLICT_INSERTS, db, insert_unique
+from flaskr.jobs import job
 from flaskr.models.tag_model import TagModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_archive_model import TaskArchiveModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+from flaskr.schemas.schema import TagSchema
+from flaskr.sharding import commit_with_intent, each_task_shard, write_intent
+from flaskr.tag_catalogue import tag_catalogue
+
+# Sorts after any character a tag name continues a prefix with
+MAX_CHARACTER = chr(0x10FFFF)
+
+TOP_TAGS_OF_USER = (
+    select(TagUsageModel.tag_id, TagUsageModel.uses)
+    .where(TagUsageModel.user_id == bindparam("user_id"), TagUsageModel.uses > 0)
+    .order_by(TagUsageModel.uses.desc(), TagUsageModel.tag_id.desc())
+    .limit(bindparam("k"))
+)
 
 
 class TagController:
     @staticmethod
-    def get_all():
+    def get_all(prefix=None, limit=None, cursor=None):
         try:
-            return db.session.execute(select(TagModel).limit(15)).scalars().all()
+            limit = limit or current_app.config["TAGS_PAGE_SIZE"]
+            name_key = func.lower(TagModel.name)
+
+            # Ordered by ix_tags_name_lower so every page is an index range
+            query = select(TagModel).order_by(name_key, TagModel.name).limit(limit)
+
+            # Values go through the same lower() as the column: SQLite's
+            # only folds ASCII, Python's folds every script
+            if prefix:
+                prefix_key = func.lower(bindparam("prefix", prefix))
+                query = query.where(
+                    name_key >= prefix_key,
+                    name_key < prefix_key.concat(MAX_CHARACTER),
+                )
+
+            if cursor:
+                after = TagController.decode_cursor(cursor)
+                after_key = func.lower(bindparam("after", after))
+                query = query.where(
+                    name_key >= after_key,
+                    or_(name_key > after_key, TagModel.name > after),
+                )
+
+            return db.session.execute(query).scalars().all()
         except SQLAlchemyError:
             abort(500, message="Internal server error while fetching tags")
 
     @staticmethod
-    def create(data):
+    def get_top_on_user(k=None):
         try:
-            tag_registered = db.session.execute(
-                select(TagModel).where(TagModel.name == data["name"])
-            ).scalar_one_or_none()
+            user_id = get_jwt_identity()
 
-            if tag_registered:
-                abort(409, message="Tag already registered")
+            return db.session.execute(
+                TOP_TAGS_OF_USER,
+                {"user_id": user_id, "k": k or current_app.config["TAGS_TOP_K"]},
+            ).all()
+        except SQLAlchemyError:
+            abort(500, message="Internal server error while fetching top tags")
+
+    @staticmethod
+    def count_usage(user_id, tag_id, delta):
+        """Adjust a user's usage count of a tag inside the caller's transaction."""
+        add_uses = (
+            update(TagUsageModel)
+            .where(TagUsageModel.user_id == user_id, TagUsageModel.tag_id == tag_id)
+            .values(uses=TagUsageModel.uses + delta)
+        )
+
+        dialect = db.session.get_bind(TagUsageModel.__mapper__).dialect
+        on_conflict_insert = ON_CONFLICT_INSERTS.get(dialect.name)
 
-            new_tag = TagModel(**data)
+        # Removing a use always finds the row its task created
+        if delta < 0:
+            db.session.execute(add_uses)
+        elif on_conflict_insert is not None:
+            db.session.execute(
+                on_conflict_insert(TagUsageModel)
+                .values(user_id=user_id, tag_id=tag_id, uses=delta)
+                .on_conflict_do_update(
+                    index_elements=["user_id", "tag_id"],
+                    set_={"uses": TagUsageModel.uses + delta},
+                )
+            )
+        elif db.session.execute(add_uses).rowcount == 0:
+            db.session.execute(
+                insert(TagUsageModel).values(user_id=user_id, tag_id=tag_id, uses=delta)
+            )
+
+    @staticmethod
+    def get_catalogue():
+        return tag_catalogue.snapshot(
+            lambda: TagSchema(many=True).dump(TagController.get_all())
+        )
+
+    @staticmethod
+    def next_cursor(names, limit=None):
+        # A full page means there may be more; the last page can come back empty
+        if not names or len(names) < (limit or current_app.config["TAGS_PAGE_SIZE"]):
+            return None
+
+        return base64.urlsafe_b64encode(names[-1].encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            return base64.b64decode(cursor, altchars=b"-_", validate=True).decode()
+        except (binascii.Error, UnicodeDecodeError):
+            abort(400, message="Invalid cursor")
+
+    @staticmethod
+    def create(data):
+        try:
+            if insert_unique(TagModel, data) is None:
+                db.session.rollback()
+                abort(409, message="Tag already registered")
 
-            db.session.add(new_tag)
             db.session.commit()
+            tag_catalogue.bump()
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, message="Tag already registered")
         except SQLAlchemyError:
             db.session.rollback()
             abort(500, message="Internal server error while creating tag")
+
+    @staticmethod
+    def rename(data, tag_id):
+        try:
+            result = db.session.execute(
+                update(TagModel).where(TagModel.id == tag_id).values(name=data["name"])
+            )
+
+            if result.rowcount == 0:
+                raise NoResultFound()
+
+            db.session.commit()
+            tag_catalogue.bump()
+        except NoResultFound:
+            db.session.rollback()
+            abort(404, message="Tag not found")
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, message="Tag already registered")
+        except SQLAlchemyError:
+            db.session.rollback()
+            abort(500, message="Internal server error while renaming tag")
+
+    @staticmethod
+    def merge(source_id, target_id, batch_size=None, progress=None):
+        """Move every task of ``source_id`` to ``target_id`` and drop the source.
+
+        Runs as set-based statements in one transaction, so no task is loaded
+        into the session; with shards, a ``merge_tags`` job finishes a merge
+        that was only committed on some databases. With ``batch_size`` the task UPDATE is split into id ranges and
+        ``progress(done, total)`` is called after each of them.
+        """
+        try:
+            if source_id == target_id:
+                abort(400, message="Cannot merge a tag into itself")
+
+            found = db.session.execute(
+                select(func.count())
+                .select_from(TagModel)
+                .where(TagModel.id.in_([source_id, target_id]))
+            ).scalar_one()
+
+            if found != 2:
+                raise NoResultFound()
+
+            intent = write_intent(
+                "merge_tags", {"source_id": source_id, "target_id": target_id}
+            )
+            TagController.finish_merge(source_id, target_id, batch_size, progress)
+            commit_with_intent(intent)
+            tag_catalogue.bump()
+        except NoResultFound:
+            db.session.rollback()
+            abort(404, message="Tag not found")
+        except SQLAlchemyError:
+            db.session.rollback()
+            abort(500, message="Internal server error while merging tags")
+
+    @staticmethod
+    @job("merge_tags")
+    def finish_merge(source_id, target_id, batch_size=None, progress=None):
+        # Safe to run again: every statement is a no-op once it was committed
+        TagController.reassign_tasks(source_id, target_id, batch_size, progress)
+        TagController.merge_usage(source_id, target_id)
+        db.session.execute(delete(TagModel).where(TagModel.id == source_id))
+
+    @staticmethod
+    def delete(tag_id, reassign_to=None):
+        if reassign_to is not None:
+            return TagController.merge(tag_id, reassign_to)
+
+        try:
+            # The foreign key below cannot see tasks on a shard
+            if current_app.config["TASK_SHARDS"] and TagController.is_used(tag_id):
+                abort(409, message="Tag is still used by tasks")
+
+            db.session.execute(
+                delete(TagUsageModel).where(TagUsageModel.tag_id == tag_id)
+            )
+            # Fails on the tasks foreign key while the tag is still in use
+            result = db.session.execute(delete(TagModel).where(TagModel.id == tag_id))
+
+            if result.rowcount == 0:
+                raise NoResultFound()
+
+            db.session.commit()
+            tag_catalogue.bump()
+        except NoResultFound:
+            db.session.rollback()
+            abort(404, message="Tag not found")
+        except IntegrityError:
+            db.session.rollback()
+            abort(409, message="Tag is still used by tasks")
+        except SQLAlchemyError:
+            db.session.rollback()
+            abort(500, message="Internal server error while deleting tag")
+
+    @staticmethod
+    def is_used(tag_id):
+        # Exhausted rather than short-circuited so the shard override is reset
+        found = [
+            db.session.execute(
+                select(model.id).where(model.tag_id == tag_id).limit(1)
+            ).first()
+            for _ in each_task_shard()
+            for model in (TaskModel, TaskArchiveModel)
+        ]
+
+        return any(found)
+
+    @staticmethod
+    def reassign_tasks(source_id, target_id, batch_size=None, progress=None):
+        for _ in each_task_shard():
+            for model in (TaskModel, TaskArchiveModel):
+                TagController.reassign_shard_tasks(
+                    model, source_id, target_id, batch_size, progress
+                )
+
+    @staticmethod
+    def reassign_shard_tasks(
+        model, source_id, target_id, batch_size=None, progress=None
+    ):
+        move = (
+            update(model)
+            .where(model.tag_id == source_id)
+            .values(tag_id=target_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        if batch_size is None:
+            db.session.execute(move)
+            return
+
+        low, high, total = db.session.execute(
+            select(func.min(model.id), func.max(model.id), func.count()).where(
+                model.tag_id == source_id
+            )
+        ).one()
+
+        done = 0
+        for start in range(low or 0, (high or -1) + 1, batch_size):
+            result = db.session.execute(
+                move.where(model.id >= start, model.id < start + batch_size)
+            )
+            done += result.rowcount
+
+            if progress is not None:
+                progress(done, total)
+
+    @staticmethod
+    def merge_usage(source_id, target_id):
+        source = aliased(TagUsageModel)
+        source_users = select(source.user_id).where(source.tag_id == source_id)
+        target_users = select(source.user_id).where(source.tag_id == target_id)
+
+        # Users with both tags: fold the source count into the target row
+        db.session.execute(
+            update(TagUsageModel)
+            .where(
+                TagUsageModel.tag_id == target_id,
+                TagUsageModel.user_id.in_(source_users),
+            )
+            .values(
+                uses=TagUsageModel.uses
+                + select(source.uses)
+                .where(
+                    source.user_id == TagUsageModel.user_id,
+                    source.tag_id == source_id,
+                )
+                .scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Users with only the source tag: the row changes tag
+        db.session.execute(
+            update(TagUsageModel)
+            .where(
+                TagUsageModel.tag_id == source_id,
+                TagUsageModel.user_id.not_in(target_users),
+            )
+            .values(tag_id=target_id)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            delete(TagUsageModel)
+            .where(TagUsageModel.tag_id == source_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    @job("recount_tag_usage")
+    def recount_usage(user_ids=None, batch_size=500):
+        """Rebuild ``tag_usage`` from the tasks of ``user_ids``, or of every user.
+
+        Run as a job when a task write was only committed on one of the task
+        shard and the primary. Only the shard each user points at is counted, so
+        rows an interrupted move left elsewhere are ignored. Returns the
+        number of rows written.
+        """
+        try:
+            users = select(UserModel.id, UserModel.task_shard)
+            if user_ids is not None:
+                users = users.where(UserModel.id.in_(user_ids))
+
+            shard_of = dict(db.session.execute(users).all())
+            tag_ids = set(db.session.execute(select(TagModel.id)).scalars())
+            counts = Counter()
+
+            for index in each_task_shard():
+                owners = [
+                    user_id
+                    for user_id, shard in shard_of.items()
+                    if index is None or shard == index
+                ]
+
+                for start in range(0, len(owners), batch_size):
+                    for model in (TaskModel, TaskArchiveModel):
+                        grouped = db.session.execute(
+                            select(model.user_id, model.tag_id, func.count())
+                            .where(model.user_id.in_(owners[start:start + batch_size]))
+                            .group_by(model.user_id, model.tag_id)
+                        )
+
+                        for user_id, tag_id, uses in grouped:
+                            counts[user_id, tag_id] += uses
+
+            stale = delete(TagUsageModel)
+            if user_ids is not None:
+                stale = stale.where(TagUsageModel.user_id.in_(user_ids))
+            db.session.execute(stale)
+
+            rows = [
+                {"user_id": user_id, "tag_id": tag_id, "uses": uses}
+                for (user_id, tag_id), uses in counts.items()
+                if tag_id in tag_ids
+            ]
+            for start in range(0, len(rows), batch_size):
+                db.session.execute(insert(TagUsageModel), rows[start:start + batch_size])
+
+            db.session.commit()
+
+            return len(rows)
+        except SQLAlchemyError:
+            db.session.rollback()
+            abort(500, message="Internal server error while recounting tag usage")
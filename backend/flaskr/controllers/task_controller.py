@@ -1,47 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from flask import current_app
 from flask_jwt_extended import get_jwt_identity
 from flask_smorest import abort
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, insert, literal, select, union_all
 from sqlalchemy.exc import NoResultFound, SQLAlchemyError
+from flaskr.controllers.tag_controller import TagController
 from flaskr.db import db
-from flaskr.models.tag_model import TagModel
-from flaskr.models.task_model import TaskModel
+from flaskr.jobs import job
+from flaskr.models.task_archive_model import TaskArchiveModel
+from flaskr.models.task_model import ACTIVE_TASKS, TaskModel, TaskStatus
+from flaskr.sharding import commit_with_intent, each_task_shard, write_intent
+
+# Hot queries are built once: executing them only binds parameters, and the
+# memoized cache key finds the compiled SQL without walking the statement.
+# tagName is filled in from the tag catalogue during serialization.
+TASKS_OF_USER = select(
+    TaskModel.id,
+    TaskModel.title,
+    TaskModel.content,
+    TaskModel.status,
+    TaskModel.created_at,
+    TaskModel.tag_id,
+).where(TaskModel.user_id == bindparam("user_id"))
+TASKS_WITH_ARCHIVE_OF_USER = union_all(
+    TASKS_OF_USER.add_columns(literal(False).label("archived")),
+    select(
+        TaskArchiveModel.id,
+        TaskArchiveModel.title,
+        TaskArchiveModel.content,
+        TaskArchiveModel.status,
+        TaskArchiveModel.created_at,
+        TaskArchiveModel.tag_id,
+        literal(True).label("archived"),
+    ).where(TaskArchiveModel.user_id == bindparam("user_id")),
+)
+# Repeats the WHERE term of ix_tasks_active_user_id and sorts in its order,
+# so the partial index answers the query without visiting completed tasks
+ACTIVE_TASKS_OF_USER = TASKS_OF_USER.where(ACTIVE_TASKS).order_by(TaskModel.created_at)
+TASK_BY_ID = select(TaskModel).where(TaskModel.id == bindparam("task_id"))
+ARCHIVED_TASK_OWNER = select(TaskArchiveModel.user_id).where(
+    TaskArchiveModel.id == bindparam("task_id")
+)
+# Archived tasks keep their id: clients may hold it, and it must not point
+# at another live task when listed with include_archived
+ARCHIVED_COLUMNS = ["id", "title", "content", "status", "created_at", "user_id", "tag_id"]
+
+
+def tasks_of_user_query(include_archived=False, active=False):
+    # Archived tasks are all completed, so active wins over include_archived
+    if active:
+        return ACTIVE_TASKS_OF_USER
+
+    return TASKS_WITH_ARCHIVE_OF_USER if include_archived else TASKS_OF_USER
 
 
 class TaskController:
     @staticmethod
-    def get_all_on_user():
+    def get_all_on_user(include_archived=False, active=False):
         try:
             user_id = get_jwt_identity()
+            query = tasks_of_user_query(include_archived, active)
 
-            return (
-                db.session.query(
-                    TaskModel.id,
-                    TaskModel.title,
-                    TaskModel.content,
-                    TaskModel.status,
-                    TaskModel.created_at,
-                    TagModel.name.label("tag_name"),
-                )
-                .where(TaskModel.user_id == user_id)
-                .join(TagModel, TaskModel.tag_id == TagModel.id)
-                .all()
-            )
+            return db.session.execute(query, {"user_id": user_id}).all()
         except SQLAlchemyError:
             abort(500, message="Internal server error while fetching tasks on user")
 
     @staticmethod
     def create(data):
         try:
-            user_id = get_jwt_identity()
-
-            print(data)
+            user_id = int(get_jwt_identity())
 
             create_data = {"user_id": user_id, **data}
+            intent = write_intent("recount_tag_usage", {"user_ids": [user_id]})
 
             new_task = TaskModel(**create_data)
 
             db.session.add(new_task)
-            db.session.commit()
+            TagController.count_usage(user_id, create_data["tag_id"], 1)
+            commit_with_intent(intent)
         except SQLAlchemyError:
             db.session.rollback()
             abort(500, message="Internal server error while creating task")
@@ -49,10 +85,8 @@ class TaskController:
     @staticmethod
     def update(data, task_id):
         try:
-            user_id = get_jwt_identity()
-            task = db.session.execute(
-                select(TaskModel).where(TaskModel.id == task_id)
-            ).scalar_one()
+            user_id = int(get_jwt_identity())
+            task = db.session.execute(TASK_BY_ID, {"task_id": task_id}).scalar_one()
 
             # Verify task ownership
             if task.user_id != user_id:
@@ -65,7 +99,7 @@ class TaskController:
             db.session.add(task)
             db.session.commit()
         except NoResultFound:
-            abort(404, message="Task not found")
+            TaskController.abort_missing(task_id, user_id, "update")
         except SQLAlchemyError:
             db.session.rollback()
             abort(500, message="Internal server error while updating task")
@@ -73,19 +107,96 @@ class TaskController:
     @staticmethod
     def delete(task_id):
         try:
-            user_id = get_jwt_identity()
-            task = db.session.execute(
-                select(TaskModel).where(TaskModel.id == task_id)
-            ).scalar_one()
+            user_id = int(get_jwt_identity())
+            task = db.session.execute(TASK_BY_ID, {"task_id": task_id}).scalar_one()
 
             # Verify task ownership
             if task.user_id != user_id:
                 abort(403, message="You don't have permission to delete this task")
 
+            tag_id = task.tag_id
+            intent = write_intent("recount_tag_usage", {"user_ids": [user_id]})
             db.session.delete(task)
-            db.session.commit()
+            TagController.count_usage(user_id, tag_id, -1)
+            commit_with_intent(intent)
         except NoResultFound:
-            abort(404, message="Task not found")
+            TaskController.abort_missing(task_id, user_id, "delete")
         except SQLAlchemyError:
             db.session.rollback()
             abort(500, message="Internal server error while deleting task")
+
+    @staticmethod
+    def abort_missing(task_id, user_id, action):
+        # Listed with include_archived, archived tasks are read-only
+        owner = db.session.execute(
+            ARCHIVED_TASK_OWNER, {"task_id": task_id}
+        ).scalar_one_or_none()
+
+        if owner is None:
+            abort(404, message="Task not found")
+        if owner != user_id:
+            abort(403, message=f"You don't have permission to {action} this task")
+
+        abort(409, message="Task is archived and can no longer be changed")
+
+    @staticmethod
+    @job("archive_tasks")
+    def archive(older_than_days=None, batch_size=None, progress=None):
+        """Move COMPLETED tasks created more than ``older_than_days`` ago to
+        ``tasks_archive``.
+
+        Each batch is committed on its own so the hot table is never locked
+        for long. Returns the number of tasks archived.
+        """
+        config = current_app.config
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(
+            days=older_than_days or config["TASKS_ARCHIVE_AFTER_DAYS"]
+        )
+        batch_size = batch_size or config["TASKS_ARCHIVE_BATCH_SIZE"]
+        archived = 0
+
+        for _ in each_task_shard():
+            last_id = 0
+
+            while True:
+                ids = (
+                    db.session.execute(
+                        select(TaskModel.id)
+                        .where(
+                            TaskModel.status == TaskStatus.COMPLETED,
+                            TaskModel.created_at < cutoff,
+                            TaskModel.id > last_id,
+                        )
+                        .order_by(TaskModel.id)
+                        .limit(batch_size)
+                    )
+                    .scalars()
+                    .all()
+                )
+
+                if not ids:
+                    break
+
+                db.session.execute(
+                    insert(TaskArchiveModel).from_select(
+                        [*ARCHIVED_COLUMNS, "archived_at"],
+                        select(
+                            *(getattr(TaskModel, name) for name in ARCHIVED_COLUMNS),
+                            literal(now),
+                        ).where(TaskModel.id.in_(ids)),
+                    )
+                )
+                db.session.execute(
+                    delete(TaskModel)
+                    .where(TaskModel.id.in_(ids))
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+
+                archived, last_id = archived + len(ids), ids[-1]
+
+                if progress is not None:
+                    progress(archived)
+
+        return archived
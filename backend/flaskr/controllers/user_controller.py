@@ -1,11 +1,24 @@
+from flask import current_app
 from flask_jwt_extended import get_jwt_identity
 from flask_smorest import abort
-from sqlalchemy import select
-from sqlalchemy.exc import NoResultFound, SQLAlchemyError
-from flaskr.db import db
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.exc import IntegrityError, NoResultFound, SQLAlchemyError
+from flaskr.db import db, insert_unique
+from flaskr.jobs import enqueue, job
+from flaskr.models.task_archive_model import TaskArchiveModel
+from flaskr.models.task_model import TaskModel
 from flaskr.models.user_model import UserModel
+from flaskr.sharding import (
+    commit_with_intent,
+    pin_home_shard,
+    task_shard,
+    user_shard,
+    write_intent,
+)
 from flaskr.utils import generate_password
 
+USER_BY_ID = select(UserModel).where(UserModel.id == bindparam("user_id"))
+
 
 class UserController:
     @staticmethod
@@ -18,9 +31,7 @@ class UserController:
     @staticmethod
     def get_by_id(user_id):
         try:
-            return db.session.execute(
-                select(UserModel).where(UserModel.id == user_id)
-            ).scalar_one()
+            return db.session.execute(USER_BY_ID, {"user_id": user_id}).scalar_one()
         except NoResultFound:
             abort(404, message="User not found")
         except SQLAlchemyError:
@@ -29,42 +40,94 @@ class UserController:
     @staticmethod
     def create(data):
         try:
-            user_registered = db.session.execute(
-                select(UserModel).where(
-                    (UserModel.username == data["username"])
-                    | (UserModel.email == data["email"])
-                )
-            ).scalar_one_or_none()
+            values = {**data, "password": generate_password(data["password"])}
 
-            if user_registered:
-                if user_registered.username == data["username"]:
-                    abort(409, message="Username already registered")
-                if user_registered.email == data["email"]:
-                    abort(409, message="Email already registered")
+            user_id = insert_unique(UserModel, values)
 
-            new_user = UserModel(**data)
+            if user_id is None:
+                db.session.rollback()
+                UserController.abort_conflict(data)
 
-            new_user.password = generate_password(data["password"])
+            if current_app.config["TASK_SHARDS"]:
+                pin_home_shard(user_id)
 
-            db.session.add(new_user)
             db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            UserController.abort_conflict(data)
         except SQLAlchemyError:
             db.session.rollback()
             abort(500, message="Internal server error while creating user")
 
+    @staticmethod
+    def abort_conflict(data):
+        # Only reached after the unique indexes rejected an insert, so the
+        # lookup stays off the sign-up hot path.
+        users_registered = (
+            db.session.execute(
+                select(UserModel).where(
+                    (UserModel.username == data["username"])
+                    | (UserModel.email == data["email"])
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+        if any(user.username == data["username"] for user in users_registered):
+            abort(409, message="Username already registered")
+        if any(user.email == data["email"] for user in users_registered):
+            abort(409, message="Email already registered")
+
+        abort(500, message="Internal server error while creating user")
+
     @staticmethod
     def delete():
         try:
-            user_id = get_jwt_identity()
+            user_id = int(get_jwt_identity())
 
-            user = db.session.execute(
-                select(UserModel).where(UserModel.id == user_id)
-            ).scalar_one()
+            if current_app.config["ACCOUNT_DELETION_IN_BACKGROUND"]:
+                deletion = enqueue("delete_user", {"user_id": user_id}, user_id=user_id)
+                db.session.commit()
 
-            db.session.delete(user)
-            db.session.commit()
+                return deletion
+
+            intent = write_intent("delete_user", {"user_id": user_id})
+
+            if UserController.remove(user_id) == 0:
+                raise NoResultFound()
+
+            commit_with_intent(intent)
         except NoResultFound:
+            db.session.rollback()
             abort(404, message="User not found")
         except SQLAlchemyError:
             db.session.rollback()
             abort(500, message="Internal server error while deleting user")
+
+    @staticmethod
+    @job("delete_user")
+    def remove(user_id):
+        # Tasks are removed by the ON DELETE CASCADE foreign key, which
+        # cannot reach a shard
+        if current_app.config["TASK_SHARDS"]:
+            found = db.session.execute(
+                select(UserModel.id).where(UserModel.id == user_id)
+            ).first()
+            # Run again after the user row was deleted, its shard is unknown
+            shards = (
+                [user_shard(user_id)[0]]
+                if found
+                else range(current_app.config["TASK_SHARDS"])
+            )
+
+            for index in shards:
+                with task_shard(index):
+                    for model in (TaskModel, TaskArchiveModel):
+                        db.session.execute(
+                            delete(model).where(model.user_id == user_id)
+                        )
+
+        result = db.session.execute(delete(UserModel).where(UserModel.id == user_id))
+
+        return result.rowcount
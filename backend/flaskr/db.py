@@ -1,5 +1,13 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import MetaData
+from flask_sqlalchemy.session import Session
+from sqlalchemy import CompoundSelect, MetaData, Select, event, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -15,4 +23,189 @@ class Base(DeclarativeBase):
     )
 
 
-db = SQLAlchemy(model_class=Base)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(Session):
+    """Sends SELECTs issued while serving safe requests to the read replica.
+
+    Everything else, including reads made while handling a write, goes to
+    the primary. A client that just wrote is pinned to the primary for
+    ``REPLICA_PIN_SECONDS`` so it reads its own writes despite replica lag.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            for route in bind_routers:
+                engine = route(mapper, clause)
+
+                if engine is not None:
+                    return engine
+
+        if (
+            bind is None
+            and isinstance(clause, (Select, CompoundSelect))
+            and read_from_replica()
+        ):
+            return self._db.engines[current_app.config["REPLICA_BIND"]]
+
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
+
+# Callables ``(mapper, clause) -> engine | None`` consulted before the replica
+bind_routers = []
+
+
+def read_from_replica():
+    return (
+        has_request_context()
+        and request.method in SAFE_METHODS
+        and current_app.config["REPLICA_BIND"] in db.engines
+        and not g.get("read_primary", False)
+        and not is_pinned(pin_key())
+    )
+
+
+@contextmanager
+def read_primary():
+    """Read from the primary even during a safe request."""
+    previous = g.get("read_primary", False)
+    g.read_primary = True
+
+    try:
+        yield
+    finally:
+        g.read_primary = previous
+
+
+def pin_key():
+    try:
+        user_id = get_jwt_identity()
+    except RuntimeError:
+        user_id = None
+
+    return f"user:{user_id}" if user_id else f"addr:{request.remote_addr}"
+
+
+def is_pinned(key):
+    pinned_until = current_app.extensions["replica_pins"].get(key)
+
+    return pinned_until is not None and pinned_until > time.monotonic()
+
+
+def pin_after_write(response):
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        pins = current_app.extensions["replica_pins"]
+        now = time.monotonic()
+
+        if len(pins) > 10000:
+            for key, pinned_until in list(pins.items()):
+                if pinned_until <= now:
+                    pins.pop(key, None)
+
+        pins[pin_key()] = now + current_app.config["REPLICA_PIN_SECONDS"]
+
+    return response
+
+
+def init_db(app):
+    db.init_app(app)
+
+    if app.config["REPLICA_BIND"] in app.config.get("SQLALCHEMY_BINDS", {}):
+        app.extensions["replica_pins"] = {}
+        app.after_request(pin_after_write)
+
+        # The replica mirrors the primary's tables and has no models of its
+        # own, so keep create_all/drop_all from targeting it.
+        db.metadatas.pop(app.config["REPLICA_BIND"], None)
+
+    pragmas = app.config["SQLITE_PRAGMAS"]
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", set_sqlite_pragmas)
+
+        count_statement_cache_use(app)
+
+
+def count_statement_cache_use(app):
+    stats = app.extensions["statement_cache"] = {}
+
+    for key, engine in db.engines.items():
+        uses = stats[key] = Counter()
+
+        def count(conn, cursor, statement, parameters, context, executemany, uses=uses):
+            uses[context.cache_hit] += 1
+
+        event.listen(engine, "after_cursor_execute", count)
+
+
+def statement_cache_stats():
+    """Compiled statement cache size and hits per bind, for this process."""
+    stats = []
+
+    for key, uses in current_app.extensions["statement_cache"].items():
+        cache = db.engines[key]._compiled_cache
+        hits, misses = uses[CACHE_HIT], uses[CACHE_MISS]
+
+        stats.append(
+            {
+                "bind": key or "primary",
+                "size": len(cache) if cache is not None else 0,
+                "capacity": cache.capacity if cache is not None else 0,
+                "hits": hits,
+                "misses": misses,
+                "uncached": sum(uses.values()) - hits - misses,
+                "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            }
+        )
+
+    return stats
+
+
+ON_CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def insert_unique(model, values):
+    """Insert a row in a single statement and return its primary key.
+
+    Returns ``None`` when a unique index rejected the row. Backends without
+    ``ON CONFLICT`` support raise ``IntegrityError`` instead.
+    """
+    dialect = db.session.get_bind(model.__mapper__).dialect
+    on_conflict_insert = ON_CONFLICT_INSERTS.get(dialect.name)
+
+    if on_conflict_insert is None or not dialect.insert_returning:
+        result = db.session.execute(insert(model).values(**values))
+        return result.inserted_primary_key[0]
+
+    return db.session.execute(
+        on_conflict_insert(model)
+        .values(**values)
+        .on_conflict_do_nothing()
+        .returning(model.id)
+    ).scalar_one_or_none()
+
+
+def sync_replica():
+    """Copy the primary SQLite database onto the replica with the backup API.
+
+    Stands in for real replication when developing with two SQLite files.
+    """
+    primary = db.engines[None].raw_connection()
+    replica = db.engines[current_app.config["REPLICA_BIND"]].raw_connection()
+
+    try:
+        primary.driver_connection.backup(replica.driver_connection)
+    finally:
+        replica.close()
+        primary.close()
@@ -1,7 +1,50 @@
-from flask_migrate import Migrate
-from flask_smorest import Api
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+from flask_smorest import Api
+
+
+class Migrate:
+    """Flask-Migrate, imported the first time a migration or ``flask db`` runs.
+
+    Flask-Migrate imports Alembic, the slowest import of the app, which
+    servers never need. Until it is used, ``app.extensions["migrate"]`` is a
+    stand-in that loads it and ``flask db`` is a lazy command.
+    """
+
+    def init_app(self, app, db):
+        pending = PendingMigrate(app, db)
+        app.extensions["migrate"] = pending
+
+        def db_command():
+            pending.load()
+            from flask_migrate.cli import db as db_command
+
+            return db_command
+
+        app.cli.add_lazy_command("db", db_command)
+
+
+class PendingMigrate:
+    """Stands in for Flask-Migrate's ``app.extensions["migrate"]``."""
+
+    def __init__(self, app, db):
+        self.app = app
+        self.db = db
+
+    def load(self):
+        if self.app.extensions["migrate"] is self:
+            from flask_migrate import Migrate as FlaskMigrate
+            # Adds itself to Flask-Migrate's group as `flask db slowlog`
+            import flaskr.commands.slowlog_command
+
+            # Replaces this stand-in and adds the real `flask db` group
+            FlaskMigrate(self.app, self.db)
+
+        return self.app.extensions["migrate"]
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
 
 migrate = Migrate()
 api = Api()
@@ -0,0 +1,142 @@
+import functools
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from flask_smorest import Blueprint as BaseBlueprint
+from sqlalchemy import event
+from flaskr.db import db
+from flaskr.slow_queries import init_slow_query_log, log_slow_query
+
+
+class QueryStats:
+    """Statements run, time spent in the database and how often each ran."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.statements = Counter()
+
+    def add(self, statement, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold):
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count > threshold
+        ]
+
+
+class Blueprint(BaseBlueprint):
+    """``flask_smorest.Blueprint`` that times dumping the response schema.
+
+    The view's return marks the start of serialization and the response
+    built by flask-smorest marks its end.
+    """
+
+    def response(self, *args, **kwargs):
+        decorator = super().response(*args, **kwargs)
+
+        def timed(func):
+            @functools.wraps(func)
+            def view(*view_args, **view_kwargs):
+                result = func(*view_args, **view_kwargs)
+                g.serialize_started = time.perf_counter()
+                return result
+
+            wrapper = decorator(view)
+
+            @functools.wraps(wrapper)
+            def serialized(*view_args, **view_kwargs):
+                response = wrapper(*view_args, **view_kwargs)
+                started = g.pop("serialize_started", None)
+
+                if started is not None and "query_stats" in g:
+                    g.query_stats.serialize_seconds += time.perf_counter() - started
+
+                return response
+
+            return serialized
+
+        return timed
+
+
+def init_instrumentation(app):
+    app.extensions["query_captures"] = []
+
+    if app.config["SLOW_QUERY_SECONDS"] is not None:
+        init_slow_query_log(app)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(app, engine)
+
+    app.before_request(start_request_stats)
+    app.after_request(report_request_stats)
+
+
+def instrument_engine(app, engine):
+    captures = app.extensions["query_captures"]
+    slow_query_log = app.extensions.get("slow_query_log")
+    slow_query_seconds = app.config["SLOW_QUERY_SECONDS"]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+
+        if has_request_context() and "query_stats" in g:
+            g.query_stats.add(statement, elapsed)
+        for stats in captures:
+            stats.add(statement, elapsed)
+
+        if slow_query_log is not None and elapsed >= slow_query_seconds:
+            log_slow_query(slow_query_log, conn, statement, parameters, executemany, elapsed)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def start_request_stats():
+    g.query_stats = QueryStats()
+
+
+def report_request_stats(response):
+    stats = g.pop("query_stats", None)
+
+    if stats is None:
+        return response
+
+    threshold = current_app.config["SQL_REPEATED_STATEMENT_THRESHOLD"]
+    for statement, count in stats.repeated(threshold):
+        current_app.logger.warning(
+            "%s %s ran the same statement %d times, possible N+1: %s",
+            request.method, request.path, count, " ".join(statement.split()),
+        )
+
+    if current_app.config["SERVER_TIMING"]:
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+            f"serialize;dur={stats.serialize_seconds * 1000:.2f}",
+        )
+
+    return response
+
+
+@contextmanager
+def capture_queries():
+    """Record every statement run on the app's engines inside the block."""
+    stats = QueryStats()
+    captures = current_app.extensions["query_captures"]
+    captures.append(stats)
+
+    try:
+        yield stats
+    finally:
+        captures.remove(stats)
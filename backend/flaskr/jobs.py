@@ -0,0 +1,190 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import or_, select, update
+from flaskr.db import db
+from flaskr.models.job_model import JobModel, JobStatus
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def job(name):
+    """Register the decorated function as the handler for jobs called ``name``."""
+
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload, user_id=None):
+    """Add a job to the session; it becomes visible once the caller commits."""
+    if name not in HANDLERS:
+        raise KeyError(f"Unknown job: {name}")
+
+    new_job = JobModel(
+        name=name,
+        payload=payload,
+        user_id=user_id,
+        max_attempts=current_app.config["JOBS_MAX_ATTEMPTS"],
+    )
+
+    db.session.add(new_job)
+    db.session.flush()
+
+    return new_job
+
+
+def backoff(attempts):
+    config = current_app.config
+    delay = config["JOBS_BACKOFF_BASE"] * 2 ** (attempts - 1)
+
+    return timedelta(seconds=min(delay, config["JOBS_BACKOFF_MAX"]))
+
+
+def claim_next():
+    """Lease the next due job to this worker, or return None when idle.
+
+    A RUNNING job whose lease expired belongs to a worker that died and is
+    claimed again, or marked FAILED once it used up its attempts, so a job
+    that kills its worker is not retried forever. The conditional UPDATE
+    keeps two workers from taking the same job without relying on row locks.
+    """
+    now = datetime.now(timezone.utc)
+
+    while True:
+        candidate = db.session.execute(
+            select(
+                JobModel.id,
+                JobModel.status,
+                JobModel.run_at,
+                JobModel.attempts,
+                JobModel.max_attempts,
+            )
+            .where(
+                or_(
+                    JobModel.status == JobStatus.PENDING,
+                    JobModel.status == JobStatus.RUNNING,
+                ),
+                JobModel.run_at <= now,
+            )
+            .order_by(JobModel.run_at)
+            .limit(1)
+        ).first()
+
+        if candidate is None:
+            db.session.rollback()
+            return None
+
+        unchanged = update(JobModel).where(
+            JobModel.id == candidate.id,
+            JobModel.status == candidate.status,
+            JobModel.run_at == candidate.run_at,
+        )
+        exhausted = (
+            candidate.status == JobStatus.RUNNING
+            and candidate.attempts >= candidate.max_attempts
+        )
+
+        if exhausted:
+            db.session.execute(
+                unchanged.values(
+                    status=JobStatus.FAILED,
+                    finished_at=now,
+                    last_error=f"Lease expired after {candidate.attempts} attempts",
+                ).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            logger.error("Job %s failed: its worker died on every attempt", candidate.id)
+            continue
+
+        result = db.session.execute(
+            unchanged.values(
+                status=JobStatus.RUNNING,
+                attempts=JobModel.attempts + 1,
+                run_at=now
+                + timedelta(seconds=current_app.config["JOBS_LEASE_SECONDS"]),
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        if result.rowcount == 1:
+            return db.session.get(JobModel, candidate.id)
+
+
+def run_next():
+    """Run one due job. Returns False when there was nothing to do."""
+    claimed = claim_next()
+
+    if claimed is None:
+        return False
+
+    job_id, name, payload = claimed.id, claimed.name, claimed.payload
+
+    try:
+        HANDLERS[name](**payload)
+        db.session.commit()
+    except Exception as err:
+        db.session.rollback()
+        logger.exception("Job %s (%s) failed", job_id, name)
+
+        failed = db.session.get(JobModel, job_id)
+        failed.last_error = repr(err)[:500]
+
+        if failed.attempts >= failed.max_attempts:
+            failed.status = JobStatus.FAILED
+            failed.finished_at = datetime.now(timezone.utc)
+        else:
+            failed.status = JobStatus.PENDING
+            failed.run_at = datetime.now(timezone.utc) + backoff(failed.attempts)
+
+        db.session.commit()
+        return True
+
+    finished = db.session.get(JobModel, job_id)
+    finished.status = JobStatus.SUCCEEDED
+    finished.finished_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+    return True
+
+
+class Worker:
+    """Pool of threads that poll the ``jobs`` table and run due jobs."""
+
+    def __init__(self, app, concurrency=None, poll_interval=None):
+        self.app = app
+        self.concurrency = concurrency or app.config["JOBS_CONCURRENCY"]
+        self.poll_interval = poll_interval or app.config["JOBS_POLL_INTERVAL"]
+        self.stopping = threading.Event()
+        self.threads = []
+
+    def start(self):
+        for i in range(self.concurrency):
+            thread = threading.Thread(
+                target=self.loop, name=f"job-worker-{i}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.stopping.set()
+
+        for thread in self.threads:
+            thread.join()
+
+    def loop(self):
+        while not self.stopping.is_set():
+            try:
+                with self.app.app_context():
+                    ran = run_next()
+            except Exception:
+                logger.exception("Job worker iteration failed")
+                ran = False
+
+            if not ran:
+                self.stopping.wait(self.poll_interval)
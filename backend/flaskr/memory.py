@@ -0,0 +1,161 @@
+"""Opt-in tracemalloc accounting of the memory each endpoint allocates.
+
+tracemalloc counts allocations of every thread, so with concurrent requests
+a request's figures include its neighbours'; run it on one worker thread
+when the numbers need to be exact.
+"""
+
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from flask import current_app, g, request
+
+# Frames of the tracer itself and of lazily imported modules
+IGNORED_FILES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class Allocations:
+    """Net and peak bytes allocated while measuring, relative to the start."""
+
+    def __init__(self):
+        self.net_bytes = 0
+        self.peak_bytes = 0
+
+
+class EndpointMemory:
+    def __init__(self):
+        self.requests = 0
+        self.net_bytes = 0
+        self.peak_bytes = 0
+        self.max_peak_bytes = 0
+        # Source line -> [bytes, allocations] left behind by sampled requests
+        self.lines = {}
+
+
+class MemoryStats:
+    def __init__(self, snapshot_every):
+        self.snapshot_every = snapshot_every
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, allocations, line_stats):
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, EndpointMemory())
+            stats.requests += 1
+            stats.net_bytes += allocations.net_bytes
+            stats.peak_bytes += allocations.peak_bytes
+            stats.max_peak_bytes = max(stats.max_peak_bytes, allocations.peak_bytes)
+
+            for stat in line_stats:
+                frame = stat.traceback[0]
+                line = stats.lines.setdefault(f"{frame.filename}:{frame.lineno}", [0, 0])
+                line[0] += stat.size_diff
+                line[1] += stat.count_diff
+
+    def should_snapshot(self, endpoint):
+        stats = self.endpoints.get(endpoint)
+
+        return (stats.requests if stats else 0) % self.snapshot_every == 0
+
+    def report(self, top):
+        with self.lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "requests": stats.requests,
+                    "net_bytes_mean": stats.net_bytes // stats.requests,
+                    "peak_bytes_mean": stats.peak_bytes // stats.requests,
+                    "peak_bytes_max": stats.max_peak_bytes,
+                    "top_lines": [
+                        {"line": line, "size_bytes": size, "count": count}
+                        for line, (size, count) in sorted(
+                            stats.lines.items(), key=lambda item: item[1][0], reverse=True
+                        )[:top]
+                    ],
+                }
+                for endpoint, stats in sorted(
+                    self.endpoints.items(), key=lambda item: item[1].peak_bytes, reverse=True
+                )
+            ]
+
+
+def init_memory_tracing(app):
+    if not app.config["TRACEMALLOC"]:
+        return
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(app.config["TRACEMALLOC_FRAMES"])
+
+    app.extensions["memory"] = MemoryStats(app.config["TRACEMALLOC_SNAPSHOT_EVERY"])
+    app.before_request(start_tracing_request)
+    app.after_request(record_request_memory)
+
+
+def start_tracing_request():
+    stats = current_app.extensions["memory"]
+    endpoint = request.endpoint or "unmatched"
+
+    # Snapshots walk every live allocation, so only some requests take them
+    snapshot = tracemalloc.take_snapshot() if stats.should_snapshot(endpoint) else None
+    tracemalloc.reset_peak()
+    g.memory_trace = (tracemalloc.get_traced_memory()[0], snapshot)
+
+
+def record_request_memory(response):
+    trace = g.pop("memory_trace", None)
+
+    if trace is None:
+        return response
+
+    started_at, snapshot = trace
+    current, peak = tracemalloc.get_traced_memory()
+    allocations = Allocations()
+    allocations.net_bytes = current - started_at
+    allocations.peak_bytes = peak - started_at
+
+    line_stats = []
+    if snapshot is not None:
+        line_stats = [
+            stat
+            for stat in tracemalloc.take_snapshot()
+            .filter_traces(IGNORED_FILES)
+            .compare_to(snapshot.filter_traces(IGNORED_FILES), "lineno")
+            if stat.size_diff > 0
+        ]
+
+    current_app.extensions["memory"].record(
+        request.endpoint or "unmatched", allocations, line_stats
+    )
+
+    return response
+
+
+def memory_stats():
+    """Per endpoint allocation figures and top lines, largest peaks first."""
+    return current_app.extensions["memory"].report(current_app.config["TRACEMALLOC_TOP"])
+
+
+@contextmanager
+def measure_allocations():
+    """Net and peak bytes allocated inside the block."""
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    allocations = Allocations()
+    tracemalloc.reset_peak()
+    started_at = tracemalloc.get_traced_memory()[0]
+
+    try:
+        yield allocations
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        allocations.net_bytes = current - started_at
+        allocations.peak_bytes = peak - started_at
+
+        if started_tracing:
+            tracemalloc.stop()
@@ -0,0 +1,462 @@
+"""Prometheus text metrics kept in process, without a client library.
+
+Every thread writes to its own dict of series, so recording a request never
+takes a lock; a scrape sums the dicts of all threads. With ``METRICS_DIR``
+set, each worker process also snapshots its totals to a file there every
+``METRICS_FLUSH_SECONDS`` and a scrape of any worker adds up the files of
+all of them.
+"""
+
+import atexit
+import gc
+import hmac
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from flask import Response, abort, current_app, g, request
+from flaskr.db import db
+
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class Metric:
+    """Series keyed by a tuple of label values, sharded per thread."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = []
+        # Totals of threads that have exited, so per-request threads do not
+        # leave a dict behind each
+        self._retired = {}
+
+    def _values(self, labels):
+        """Slow path of recording: first use of a series or of a thread."""
+        series = getattr(self._local, "series", None)
+
+        if series is None:
+            series = self._local.series = {}
+
+            with self._lock:
+                for thread, values in list(self._threads):
+                    if not thread.is_alive():
+                        self._threads.remove((thread, values))
+                        self.merge(self._retired, values)
+                self._threads.append((threading.current_thread(), series))
+
+        values = series[labels] = self._new_values()
+        return values
+
+    @staticmethod
+    def merge(into, series):
+        for labels, values in list(series.items()):
+            current = into.get(labels)
+            if current is None:
+                into[labels] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    current[index] += value
+
+    def collect(self):
+        """Sum of every thread's series: ``{labels: values}``."""
+        with self._lock:
+            total = {labels: list(values) for labels, values in self._retired.items()}
+            for _, series in self._threads:
+                self.merge(total, series)
+
+        return total
+
+    def reset_after_fork(self):
+        # Another thread may have held the lock when the process forked
+        self._lock = threading.Lock()
+        self._retired.clear()
+        for _, series in self._threads:
+            series.clear()
+
+
+class Sum(Metric):
+    """Counter or gauge made of per-thread deltas."""
+
+    def __init__(self, name, documentation, labels, kind="counter"):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+
+    def _new_values(self):
+        return [0]
+
+    def inc(self, labels, amount=1):
+        try:
+            values = self._local.series[labels]
+        except (AttributeError, KeyError):
+            values = self._values(labels)
+
+        values[0] += amount
+
+
+class Histogram(Metric):
+    """Per-bucket counts (not cumulative until exposition) and their sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels, buckets):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def _new_values(self):
+        # One count per bucket, one for +Inf, then the sum of observations
+        return [0] * (len(self.buckets) + 2)
+
+    def observe(self, labels, value):
+        try:
+            values = self._local.series[labels]
+        except (AttributeError, KeyError):
+            values = self._values(labels)
+
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+
+class Registry:
+    def __init__(self):
+        self.requests = Histogram(
+            "http_request_duration_seconds",
+            "Request latency by endpoint, method and status.",
+            ("endpoint", "method", "status"),
+            LATENCY_BUCKETS,
+        )
+        self.in_flight = Sum(
+            "http_requests_in_flight", "Requests being served.", (), kind="gauge"
+        )
+        self.pool_waits = Histogram(
+            "db_pool_checkout_seconds",
+            "Time spent getting a connection from the pool, by bind.",
+            ("bind",),
+            POOL_WAIT_BUCKETS,
+        )
+        self.metrics = (self.requests, self.in_flight, self.pool_waits)
+        self.files = None
+
+    def snapshot(self):
+        return {
+            metric.name: [[list(labels), values] for labels, values in metric.collect().items()]
+            for metric in self.metrics
+        }
+
+    def reset_after_fork(self):
+        for metric in self.metrics:
+            metric.reset_after_fork()
+
+
+def init_metrics(app):
+    if not app.config["METRICS"]:
+        return
+
+    registry = app.extensions["metrics"] = Registry()
+
+    def start_timer():
+        registry.in_flight.inc((), 1)
+        g.metrics_started = time.perf_counter()
+
+    def observe_request(response):
+        started = g.pop("metrics_started", None)
+
+        if started is not None:
+            registry.requests.observe(
+                (request.endpoint or "unmatched", request.method, str(response.status_code)),
+                time.perf_counter() - started,
+            )
+
+        return response
+
+    def end_request(error=None):
+        registry.in_flight.inc((), -1)
+
+    app.before_request(start_timer)
+    app.after_request(observe_request)
+    app.teardown_request(end_request)
+
+    with app.app_context():
+        for key, engine in db.engines.items():
+            time_pool_checkouts(registry, key or "primary", engine)
+
+    app.add_url_rule("/metrics", "metrics", lambda: metrics_response(app))
+
+    if app.config["METRICS_DIR"]:
+        MetricsFiles(app.config["METRICS_DIR"], registry, app.config["METRICS_FLUSH_SECONDS"])
+
+
+def check_metrics_access():
+    """Serve ``/metrics`` to scrapers sending ``Authorization: Bearer``
+    METRICS_TOKEN, or only to this host while no token is set."""
+    token = current_app.config["METRICS_TOKEN"]
+
+    if not token:
+        if request.remote_addr not in LOOPBACK_ADDRESSES:
+            abort(403)
+        return
+
+    scheme, _, sent = request.headers.get("Authorization", "").partition(" ")
+
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token, sent):
+        abort(403)
+
+
+def time_pool_checkouts(registry, bind, engine):
+    """Give ``engine``'s pool a subclass of its class whose ``connect`` is timed.
+
+    Pools have no event before a checkout starts waiting. ``dispose()``
+    recreates the pool with the same class, so the new pool is timed too.
+    """
+    pool_class = type(engine.pool)
+
+    def connect(pool):
+        started = time.perf_counter()
+        connection = pool_class.connect(pool)
+        registry.pool_waits.observe((bind,), time.perf_counter() - started)
+        return connection
+
+    engine.pool.__class__ = type(
+        f"Timed{pool_class.__name__}", (pool_class,), {"connect": connect}
+    )
+
+
+class MetricsFiles:
+    """File-backed aggregation for multi-process servers.
+
+    Each process owns ``<pid>-<start>.json`` in ``directory``, so a worker
+    that gets the pid of an exited one starts a file of its own. Files of
+    exited workers are kept so counters never go backwards; empty the
+    directory when the server restarts.
+    """
+
+    def __init__(self, directory, registry, interval):
+        self.directory = directory
+        self.registry = registry
+        self.interval = interval
+        registry.files = self
+        os.makedirs(directory, exist_ok=True)
+
+        self.start()
+        LIVE_FILES.add(self)
+        atexit.register(self.flush)
+
+    def start(self):
+        self.started = process_start()
+        # Off Linux the start time of other processes is unknown, but the
+        # file name must still differ from the last owner of the pid
+        self.name = f"{os.getpid()}-{self.started or time.time_ns()}.json"
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="metrics-flush", daemon=True)
+        self.thread.start()
+
+    def after_fork(self):
+        # Threads do not survive a fork; what the parent counted stays in
+        # the parent's file
+        self.registry.reset_after_fork()
+        self.start()
+
+    def run(self):
+        while True:
+            self.flush()
+
+            if self.stopped.wait(self.interval):
+                return
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        LIVE_FILES.discard(self)
+        atexit.unregister(self.flush)
+
+    def flush(self):
+        path = os.path.join(self.directory, self.name)
+        snapshot = {
+            "pid": os.getpid(),
+            "started": self.started,
+            "metrics": self.registry.snapshot(),
+            "process": process_stats(),
+        }
+
+        with open(path + ".tmp", "w") as file:
+            json.dump(snapshot, file)
+        os.replace(path + ".tmp", path)
+
+    def others(self):
+        """Snapshots of every other process that wrote one."""
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name == self.name:
+                continue
+
+            try:
+                with open(os.path.join(self.directory, name)) as file:
+                    yield json.load(file)
+            except (OSError, ValueError):
+                continue
+
+
+# Every app created in this process shares one at-fork hook
+LIVE_FILES = weakref.WeakSet()
+
+
+def restart_after_fork():
+    for files in list(LIVE_FILES):
+        files.after_fork()
+
+
+os.register_at_fork(after_in_child=restart_after_fork)
+
+
+def process_start(pid="self"):
+    """Start time of a process in clock ticks since boot, or None off Linux."""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            # The command name may hold spaces, the fields after it do not
+            return int(stat.read().rsplit(")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def is_alive(pid, started=None):
+    """Whether the process that wrote a snapshot still runs.
+
+    A pid the worker had may since belong to another process: one of
+    another user cannot be signalled, and one of the same user started at
+    another time.
+    """
+    try:
+        os.kill(pid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+
+    return started is None or process_start(pid) == started
+
+
+def process_stats():
+    """RSS and garbage collector counters of this process."""
+    stats = {"gc": gc.get_stats(), "gc_pending": list(gc.get_count())}
+
+    try:
+        with open("/proc/self/statm") as statm:
+            stats["rss_bytes"] = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        try:
+            import resource
+        except ImportError:
+            return stats
+
+        # Peak rather than current RSS, in KiB on Linux and bytes on macOS
+        stats["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return stats
+
+
+def label_set(names, values, **extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for _, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def render_metric(metric, series):
+    lines = [f"# HELP {metric.name} {metric.documentation}", f"# TYPE {metric.name} {metric.kind}"]
+
+    for labels, values in sorted(series.items()):
+        if metric.kind != "histogram":
+            lines.append(f"{metric.name}{label_set(metric.labels, labels)} {values[0]}")
+            continue
+
+        cumulative = 0
+        for bound, count in zip(metric.buckets + ("+Inf",), values):
+            cumulative += count
+            bucket_labels = label_set(metric.labels, labels, le=bound)
+            lines.append(f"{metric.name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{metric.name}_sum{label_set(metric.labels, labels)} {values[-1]}")
+        lines.append(f"{metric.name}_count{label_set(metric.labels, labels)} {cumulative}")
+
+    return lines
+
+
+def render_process(processes):
+    lines = [
+        "# HELP process_resident_memory_bytes Resident set size by process.",
+        "# TYPE process_resident_memory_bytes gauge",
+    ]
+    lines += [
+        f'process_resident_memory_bytes{{pid="{pid}"}} {stats["rss_bytes"]}'
+        for pid, stats in processes if "rss_bytes" in stats
+    ]
+    lines += [
+        "# HELP python_gc_collections_total Collections by process and generation.",
+        "# TYPE python_gc_collections_total counter",
+    ]
+    for pid, stats in processes:
+        lines += [
+            f'python_gc_collections_total{{pid="{pid}",generation="{generation}"}} '
+            f'{generation_stats["collections"]}'
+            for generation, generation_stats in enumerate(stats["gc"])
+        ]
+    lines += [
+        "# HELP python_gc_objects_collected_total Objects collected by process and generation.",
+        "# TYPE python_gc_objects_collected_total counter",
+    ]
+    for pid, stats in processes:
+        lines += [
+            f'python_gc_objects_collected_total{{pid="{pid}",generation="{generation}"}} '
+            f'{generation_stats["collected"]}'
+            for generation, generation_stats in enumerate(stats["gc"])
+        ]
+    lines += [
+        "# HELP python_gc_objects_pending Allocations since the last collection by generation.",
+        "# TYPE python_gc_objects_pending gauge",
+    ]
+    for pid, stats in processes:
+        lines += [
+            f'python_gc_objects_pending{{pid="{pid}",generation="{generation}"}} {count}'
+            for generation, count in enumerate(stats["gc_pending"])
+        ]
+
+    return lines
+
+
+def metrics_response(app):
+    check_metrics_access()
+    registry = app.extensions["metrics"]
+    series = {metric.name: metric.collect() for metric in registry.metrics}
+    processes = [(os.getpid(), process_stats())]
+
+    for snapshot in registry.files.others() if registry.files else ():
+        alive = is_alive(snapshot["pid"], snapshot.get("started"))
+        if alive:
+            processes.append((snapshot["pid"], snapshot["process"]))
+
+        for metric in registry.metrics:
+            # Gauges of exited workers no longer describe anything
+            if metric.kind == "gauge" and not alive:
+                continue
+
+            metric.merge(
+                series[metric.name],
+                {tuple(labels): values for labels, values in snapshot["metrics"][metric.name]},
+            )
+
+    lines = []
+    for metric in registry.metrics:
+        lines += render_metric(metric, series[metric.name])
+    lines += render_process(processes)
+
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
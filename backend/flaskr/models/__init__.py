@@ -1,3 +1,6 @@
 from flaskr.models.user_model import UserModel
 from flaskr.models.tag_model import TagModel
 from flaskr.models.task_model import TaskModel
+from flaskr.models.job_model import JobModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_archive_model import TaskArchiveModel
@@ -0,0 +1,38 @@
+from enum import Enum
+from sqlalchemy import JSON, Index, String, Enum as SaEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from flaskr.db import db
+from datetime import datetime, timezone
+
+
+class JobStatus(Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+class JobModel(db.Model):
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[JobStatus] = mapped_column(
+        SaEnum(JobStatus), nullable=False, default=JobStatus.PENDING
+    )
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String(500))
+    # Earliest time the job may run; while RUNNING it is the lease expiry
+    run_at: Mapped[datetime] = mapped_column(
+        nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc)
+    )
+    finished_at: Mapped[datetime | None]
+
+    # Not a foreign key: jobs such as account deletion outlive their user
+    user_id: Mapped[int | None] = mapped_column(index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from flaskr.db import db
 
@@ -14,3 +14,7 @@ class TagModel(db.Model):
     tasks = relationship(
         "TaskModel", back_populates="tag", cascade="all, delete-orphan"
     )
+
+
+# Case-insensitive typeahead and keyset pagination for GET /tags
+Index("ix_tags_name_lower", func.lower(TagModel.name), TagModel.name)
@@ -0,0 +1,19 @@
+from sqlalchemy import ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from flaskr.db import db
+
+
+class TagUsageModel(db.Model):
+    """Number of tasks each user has filed under each tag."""
+
+    __tablename__ = "tag_usage"
+    # Top-k reads walk this index backwards without sorting
+    __table_args__ = (
+        Index("ix_tag_usage_user_id_uses", "user_id", "uses", "tag_id"),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id"), primary_key=True)
+    uses: Mapped[int] = mapped_column(nullable=False, default=0)
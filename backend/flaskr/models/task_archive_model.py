@@ -0,0 +1,29 @@
+from sqlalchemy import ForeignKey, Index, String, Enum as SaEnum
+from sqlalchemy.orm import Mapped, mapped_column
+from flaskr.db import db
+from flaskr.models.task_model import TaskStatus
+from datetime import datetime, timezone
+
+
+class TaskArchiveModel(db.Model):
+    """Completed tasks moved out of ``tasks`` by ``TaskController.archive``."""
+
+    __tablename__ = "tasks_archive"
+    # Only ever read per user, so one index serves the archive
+    __table_args__ = (Index("ix_tasks_archive_user_id", "user_id", "created_at"),)
+
+    # The id the task had in ``tasks``
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(40), nullable=False)
+    content: Mapped[str] = mapped_column(String(600), nullable=False)
+    status: Mapped[TaskStatus] = mapped_column(SaEnum(TaskStatus), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+
+    # Not enforced on task shards either, see TaskModel.user_id
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    tag_id: Mapped[int] = mapped_column(ForeignKey("tags.id"), nullable=False)
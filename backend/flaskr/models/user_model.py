@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import String, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from flaskr.db import db
 
@@ -14,7 +14,15 @@ class UserModel(db.Model):
         String(120), nullable=False, unique=True, index=True
     )
     password: Mapped[str] = mapped_column(String(300), nullable=False)
+    # Task shard holding this user's tasks, see flaskr.sharding
+    task_shard: Mapped[int | None] = mapped_column(nullable=True)
+    tasks_moving: Mapped[bool] = mapped_column(
+        nullable=False, default=False, server_default=false()
+    )
 
     tasks = relationship(
-        "TaskModel", back_populates="user", cascade="all, delete-orphan"
+        "TaskModel",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
@@ -0,0 +1,24 @@
+import os
+from flask import send_file
+
+# Registered by flask-smorest's documentation blueprint
+OPENAPI_JSON_ENDPOINT = "api-docs.openapi_json"
+
+
+def init_openapi(app):
+    """Serve OPENAPI_SPEC_FILE at ``/openapi.json`` when it exists.
+
+    The file is written at build time with ``flask openapi write``, so
+    workers send it as is instead of serializing the spec for every request.
+    """
+    path = app.config["OPENAPI_SPEC_FILE"]
+
+    if not path or not os.path.isfile(path):
+        return
+
+    path = os.path.abspath(path)
+
+    def openapi_json():
+        return send_file(path, mimetype="application/json")
+
+    app.view_functions[OPENAPI_JSON_ENDPOINT] = openapi_json
@@ -0,0 +1,86 @@
+"""Load the app once in the parent of a pre-fork server, then fork workers.
+
+Workers share the parent's memory pages until they write to them. CPython
+writes to an object whenever it changes the reference count, and the
+garbage collector writes to every tracked object. Freezing moves the
+parent's objects out of the collector's reach, so their pages stay
+shared. The connection pools of the parent cannot be shared, so every
+worker starts its own after the fork.
+"""
+
+import gc
+import os
+from marshmallow import Schema, fields
+from sqlalchemy.orm import configure_mappers
+from flaskr.db import db
+
+
+def preload(app):
+    """Warm ``app`` up and get it ready to be forked.
+
+    Call it last in the parent, with ``gc`` disabled since the start so
+    freed objects leave no holes in the pages to share.
+    """
+    warm_up(app)
+    prepare_fork(app)
+
+
+def warm_up(app):
+    """Build in the parent what each worker would build on its first requests."""
+    configure_mappers()
+    app.url_map.update()
+
+    for schema in route_schemas(app):
+        warm_schema(schema)
+
+
+def route_schemas(app):
+    """Schema instances the views dump and load with."""
+    for view in app.view_functions.values():
+        view_class = getattr(view, "view_class", None)
+        functions = (
+            [getattr(view_class, method.lower()) for method in view_class.methods]
+            if view_class
+            else [view]
+        )
+
+        for function in functions:
+            doc = getattr(function, "_apidoc", {})
+            responses = doc.get("response", {}).get("responses", {}).values()
+            parameters = doc.get("arguments", {}).get("parameters", [])
+
+            for entry in [*parameters, *(item for items in responses for item in items)]:
+                if isinstance(entry.get("schema"), Schema):
+                    yield entry["schema"]
+
+
+def warm_schema(schema):
+    # Nested schemas are instantiated on first use
+    for field in schema.fields.values():
+        while isinstance(field, fields.List):
+            field = field.inner
+
+        if isinstance(field, fields.Nested):
+            warm_schema(field.schema)
+
+
+def prepare_fork(app):
+    """Close what the workers cannot share and freeze the parent's objects.
+
+    ``gc`` is enabled again afterwards, in the parent and so in the workers.
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    for engine in engines:
+        engine.dispose()
+
+    def after_fork_in_child():
+        # Forget any connection the parent opened since, without closing it
+        for engine in engines:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=after_fork_in_child)
+    gc.freeze()
+    # Frozen objects are never scanned, so collecting again keeps them shared
+    gc.enable()
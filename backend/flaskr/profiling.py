@@ -0,0 +1,130 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import time
+from datetime import datetime, timezone
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+
+
+def init_profiling(app):
+    """Profile single requests on demand when PROFILING is on.
+
+    A request is profiled when it sends ``X-Profile: 1`` or ``?profile=1``
+    and comes from an admin: either its JWT belongs to ADMIN_USER_IDS or it
+    sends ``X-Profile-Token`` matching PROFILING_TOKEN, for routes such as
+    sign-in that have no JWT. cProfile only sees the thread that enabled it,
+    which is where every view runs, password hashing included.
+    """
+    if not app.config["PROFILING"]:
+        return
+
+    os.makedirs(app.config["PROFILE_DIR"], exist_ok=True)
+    app.before_request(start_profile)
+    app.after_request(save_profile)
+    app.teardown_request(stop_profile)
+
+
+def profile_requested():
+    return request.headers.get(PROFILE_HEADER) == "1" or request.args.get("profile") == "1"
+
+
+def is_profiling_admin():
+    token = current_app.config["PROFILING_TOKEN"]
+    sent = request.headers.get(PROFILE_TOKEN_HEADER)
+
+    if token and sent and hmac.compare_digest(token, sent):
+        return True
+
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        return False
+
+    return user_id is not None and int(user_id) in current_app.config["ADMIN_USER_IDS"]
+
+
+def start_profile():
+    if not profile_requested() or not is_profiling_admin():
+        return
+
+    profiler = cProfile.Profile()
+
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already active in this thread
+        return
+
+    g.profile = (profiler, time.perf_counter())
+
+
+def stop_profile(error=None):
+    # after_request is skipped when a view raises an unhandled error, and
+    # cProfile would keep profiling this thread's next requests
+    profile = g.pop("profile", None)
+
+    if profile is not None:
+        profile[0].disable()
+
+
+def save_profile(response):
+    profile = g.pop("profile", None)
+
+    if profile is None:
+        return response
+
+    profiler, started = profile
+    profiler.disable()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    name = profile_name(request.method, request.endpoint or "unmatched", elapsed_ms)
+    profiler.dump_stats(os.path.join(current_app.config["PROFILE_DIR"], name))
+    response.headers["X-Profile-File"] = name
+
+    return response
+
+
+def profile_name(method, endpoint, elapsed_ms):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+
+    # Endpoints are dotted identifiers, so "-" separates the fields safely
+    return f"{stamp}-{method}-{endpoint}-{elapsed_ms:.1f}ms.prof"
+
+
+def list_profiles(directory):
+    """Saved profiles, newest first, with the fields of their file names."""
+    profiles = []
+
+    for name in os.listdir(directory) if os.path.isdir(directory) else ():
+        if not name.endswith(".prof"):
+            continue
+
+        stamp, method, rest = name.split("-", 2)
+        endpoint, elapsed = rest.rsplit("-", 1)
+        profiles.append(
+            {
+                "name": name,
+                "recorded_at": datetime.strptime(stamp, "%Y%m%dT%H%M%S.%f"),
+                "method": method,
+                "endpoint": endpoint,
+                "elapsed_ms": float(elapsed.removesuffix("ms.prof")),
+            }
+        )
+
+    return sorted(profiles, key=lambda profile: profile["recorded_at"], reverse=True)
+
+
+def render_profile(path, sort="cumulative", limit=20):
+    """Top ``limit`` functions of a saved profile as pstats prints them."""
+    stream = io.StringIO()
+    stats = pstats.Stats(path, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+
+    return stream.getvalue()
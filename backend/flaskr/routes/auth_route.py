@@ -1,4 +1,4 @@
-from flask_smorest import Blueprint
+from flaskr.instrumentation import Blueprint
 from flask.views import MethodView
 from flaskr.controllers.auth_controller import AuthController
 from flaskr.schemas.schema import SignInSchema
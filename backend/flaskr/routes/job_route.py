@@ -0,0 +1,25 @@
+from flask_jwt_extended import jwt_required
+from flaskr.instrumentation import Blueprint
+from flask.views import MethodView
+from flaskr.controllers.job_controller import JobController
+from flaskr.schemas.schema import JobSchema
+
+bp = Blueprint("jobs", __name__)
+
+
+@bp.route("/jobs")
+class Jobs(MethodView):
+    @jwt_required()
+    @bp.response(200, JobSchema(many=True))
+    def get(self):
+        """Protected route (JWT Required)"""
+        return JobController.get_all_on_user()
+
+
+@bp.route("/jobs/<job_id>")
+class JobById(MethodView):
+    @jwt_required()
+    @bp.response(200, JobSchema)
+    def get(self, job_id):
+        """Protected route (JWT Required)"""
+        return JobController.get_by_id(job_id)
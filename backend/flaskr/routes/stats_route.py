@@ -0,0 +1,39 @@
+from flask import current_app
+from flaskr.instrumentation import Blueprint
+from flask.views import MethodView
+from flask_smorest import abort
+from flaskr.db import statement_cache_stats
+from flaskr.schemas.schema import MemoryStatsSchema, StatementCacheSchema
+from flaskr.utils import admin_required
+
+bp = Blueprint("stats", __name__)
+
+
+@bp.route("/stats/statement-cache")
+class StatementCache(MethodView):
+    @admin_required()
+    @bp.response(200, StatementCacheSchema(many=True))
+    def get(self):
+        """Admin route (JWT Required)
+
+        Compiled SQL cache usage of the process that serves the request.
+        """
+        return statement_cache_stats()
+
+
+@bp.route("/stats/memory")
+class Memory(MethodView):
+    @admin_required()
+    @bp.response(200, MemoryStatsSchema(many=True))
+    def get(self):
+        """Admin route (JWT Required)
+
+        Memory allocated per endpoint by the process that serves the request,
+        when TRACEMALLOC is on.
+        """
+        if "memory" not in current_app.extensions:
+            abort(404, message="Memory tracing is not enabled")
+
+        from flaskr.memory import memory_stats
+
+        return memory_stats()
@@ -1,18 +1,92 @@
+from flask import Response, current_app, request
 from flask.views import MethodView
-from flask_smorest import Blueprint
+from flask_jwt_extended import jwt_required
+from flaskr.instrumentation import Blueprint
 from flaskr.controllers.tag_controller import TagController
-from flaskr.schemas.schema import TagSchema
+from flaskr.utils import admin_required
+from flaskr.schemas.schema import (
+    TagDeleteQuerySchema,
+    TagMergeSchema,
+    TagQuerySchema,
+    TagSchema,
+    TopTagQuerySchema,
+    TopTagSchema,
+)
 
 bp = Blueprint("tags", __name__)
 
 
 @bp.route("/tags")
 class Tags(MethodView):
+    @bp.arguments(TagQuerySchema, location="query")
     @bp.response(200, TagSchema(many=True))
-    def get(self):
-        return TagController.get_all()
+    @bp.alt_response(304, description="Not Modified")
+    def get(self, args):
+        """Next page cursor, if any, is sent in the X-Next-Cursor header"""
+        if args:
+            tags = TagController.get_all(**args)
+            cursor = TagController.next_cursor(
+                [tag.name for tag in tags], args.get("limit")
+            )
+
+            headers = {"X-Next-Cursor": cursor} if cursor else {}
+
+            return tags, headers
+
+        # The unfiltered first page is served from memory
+        catalogue = TagController.get_catalogue()
+        cursor = TagController.next_cursor([tag["name"] for tag in catalogue.tags])
+
+        response = Response(catalogue.body, mimetype="application/json")
+        if cursor:
+            response.headers["X-Next-Cursor"] = cursor
+        response.set_etag(catalogue.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = current_app.config["TAGS_CACHE_MAX_AGE"]
+
+        return response.make_conditional(request)
 
     @bp.arguments(TagSchema)
     @bp.response(201)
     def post(self, data):
         return TagController.create(data)
+
+
+@bp.route("/tags/top")
+class TopTags(MethodView):
+    @jwt_required()
+    @bp.arguments(TopTagQuerySchema, location="query")
+    @bp.response(200, TopTagSchema(many=True))
+    def get(self, args):
+        """Protected route (JWT Required)"""
+        return TagController.get_top_on_user(**args)
+
+
+@bp.route("/tags/<int:tag_id>")
+class TagById(MethodView):
+    @admin_required()
+    @bp.arguments(TagSchema)
+    @bp.response(200)
+    def patch(self, data, tag_id):
+        """Admin route (JWT Required)"""
+        return TagController.rename(data, tag_id)
+
+    @admin_required()
+    @bp.arguments(TagDeleteQuerySchema, location="query")
+    @bp.response(204)
+    def delete(self, args, tag_id):
+        """Admin route (JWT Required)
+
+        Tasks still using the tag are moved to ``reassignTo`` when given.
+        """
+        return TagController.delete(tag_id, args.get("reassign_to"))
+
+
+@bp.route("/tags/<int:tag_id>/merge")
+class TagMerge(MethodView):
+    @admin_required()
+    @bp.arguments(TagMergeSchema)
+    @bp.response(204)
+    def post(self, data, tag_id):
+        """Admin route (JWT Required)"""
+        return TagController.merge(tag_id, data["target_id"])
@@ -1,8 +1,8 @@
 from flask_jwt_extended import jwt_required
-from flask_smorest import Blueprint
+from flaskr.instrumentation import Blueprint
 from flask.views import MethodView
 from flaskr.controllers.task_controller import TaskController
-from flaskr.schemas.schema import TaskSchema, UpdateTaskSchema
+from flaskr.schemas.schema import TaskQuerySchema, TaskSchema, UpdateTaskSchema
 
 bp = Blueprint("tasks", __name__)
 
@@ -20,10 +20,15 @@ class Tasks(MethodView):
 @bp.route("/tasks/user")
 class TasksOnUser(MethodView):
     @jwt_required()
+    @bp.arguments(TaskQuerySchema, location="query")
     @bp.response(200, TaskSchema(many=True))
-    def get(self):
-        """Protected route (JWT Required)"""
-        return TaskController.get_all_on_user()
+    def get(self, args):
+        """Protected route (JWT Required)
+
+        Archived tasks are only included with ``include_archived=true``;
+        ``active=true`` lists only tasks that are not completed.
+        """
+        return TaskController.get_all_on_user(**args)
 
 
 @bp.route("/tasks/<task_id>")
@@ -1,7 +1,7 @@
 from flask_jwt_extended import jwt_required
-from flask_smorest import Blueprint
+from flaskr.instrumentation import Blueprint
 from flask.views import MethodView
-from flaskr.schemas.schema import UserSchema
+from flaskr.schemas.schema import JobSchema, UserSchema
 from flaskr.controllers.user_controller import UserController
 
 bp = Blueprint("users", __name__)
@@ -30,6 +30,10 @@ class UserById(MethodView):
 class UserAccount(MethodView):
     @jwt_required()
     @bp.response(204)
+    @bp.alt_response(202, schema=JobSchema, description="Deletion queued")
     def delete(self):
         """Protected route (JWT Required)"""
-        return UserController.delete()
+        job = UserController.delete()
+
+        if job is not None:
+            return JobSchema().dump(job), 202
@@ -1,4 +1,5 @@
 from marshmallow import Schema, fields, validate
+from flaskr.models.job_model import JobStatus
 
 
 class PlainUserSchema(Schema):
@@ -18,6 +19,24 @@ class PlainTagSchema(Schema):
     name = fields.Str(required=True)
 
 
+class PlainTagQuerySchema(Schema):
+    prefix = fields.Str(validate=validate.Length(min=1, max=20))
+    limit = fields.Int(validate=validate.Range(min=1, max=100))
+    cursor = fields.Str()
+
+
+class PlainTagMergeSchema(Schema):
+    target_id = fields.Int(required=True, data_key="targetId")
+
+
+class PlainTagDeleteQuerySchema(Schema):
+    reassign_to = fields.Int(data_key="reassignTo")
+
+
+class PlainTopTagQuerySchema(Schema):
+    k = fields.Int(validate=validate.Range(min=1, max=20))
+
+
 class PlainTaskSchema(Schema):
     id = fields.Int(dump_only=True)
     title = fields.Str(required=True)
@@ -26,3 +45,46 @@ class PlainTaskSchema(Schema):
         validate=validate.OneOf(["PENDING", "IN_PROGRESS", "COMPLETED"]), required=True
     )
     created_at = fields.DateTime(dump_only=True, data_key="createdAt")
+    archived = fields.Bool(dump_only=True, dump_default=False)
+
+
+class PlainTaskQuerySchema(Schema):
+    include_archived = fields.Bool(load_default=False)
+    active = fields.Bool(load_default=False)
+
+
+class PlainStatementCacheSchema(Schema):
+    bind = fields.Str(dump_only=True)
+    size = fields.Int(dump_only=True)
+    capacity = fields.Int(dump_only=True)
+    hits = fields.Int(dump_only=True)
+    misses = fields.Int(dump_only=True)
+    uncached = fields.Int(dump_only=True)
+    hit_ratio = fields.Float(dump_only=True, data_key="hitRatio")
+
+
+class PlainAllocationLineSchema(Schema):
+    line = fields.Str(dump_only=True)
+    size_bytes = fields.Int(dump_only=True, data_key="sizeBytes")
+    count = fields.Int(dump_only=True)
+
+
+class PlainMemoryStatsSchema(Schema):
+    endpoint = fields.Str(dump_only=True)
+    requests = fields.Int(dump_only=True)
+    net_bytes_mean = fields.Int(dump_only=True, data_key="netBytesMean")
+    peak_bytes_mean = fields.Int(dump_only=True, data_key="peakBytesMean")
+    peak_bytes_max = fields.Int(dump_only=True, data_key="peakBytesMax")
+    top_lines = fields.List(
+        fields.Nested(PlainAllocationLineSchema), dump_only=True, data_key="topLines"
+    )
+
+
+class PlainJobSchema(Schema):
+    id = fields.Int(dump_only=True)
+    name = fields.Str(dump_only=True)
+    status = fields.Enum(JobStatus, dump_only=True)
+    attempts = fields.Int(dump_only=True)
+    last_error = fields.Str(dump_only=True, data_key="lastError")
+    created_at = fields.DateTime(dump_only=True, data_key="createdAt")
+    finished_at = fields.DateTime(dump_only=True, data_key="finishedAt")
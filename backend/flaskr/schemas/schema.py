@@ -1,12 +1,28 @@
-from marshmallow import fields
+from marshmallow import Schema, fields
+from flaskr.tag_catalogue import tag_catalogue
 from flaskr.schemas.plain_schema import (
+    PlainJobSchema,
+    PlainMemoryStatsSchema,
     PlainSignInSchema,
+    PlainStatementCacheSchema,
+    PlainTagDeleteQuerySchema,
+    PlainTagMergeSchema,
+    PlainTagQuerySchema,
     PlainTagSchema,
+    PlainTaskQuerySchema,
     PlainTaskSchema,
+    PlainTopTagQuerySchema,
     PlainUserSchema,
 )
 
 
+class TagNameField(fields.Field):
+    """Resolves ``tag_id`` through the in-memory tag map instead of a JOIN."""
+
+    def get_value(self, obj, attr, accessor=None, default=None):
+        return tag_catalogue.name_of(obj.tag_id)
+
+
 class UserSchema(PlainUserSchema):
     pass
 
@@ -19,10 +35,48 @@ class TagSchema(PlainTagSchema):
     pass
 
 
+class TagQuerySchema(PlainTagQuerySchema):
+    pass
+
+
+class TagMergeSchema(PlainTagMergeSchema):
+    pass
+
+
+class TagDeleteQuerySchema(PlainTagDeleteQuerySchema):
+    pass
+
+
+class TopTagQuerySchema(PlainTopTagQuerySchema):
+    pass
+
+
+class TopTagSchema(Schema):
+    id = fields.Int(attribute="tag_id", dump_only=True)
+    name = TagNameField(dump_only=True)
+    uses = fields.Int(dump_only=True)
+
+
 class TaskSchema(PlainTaskSchema):
-    tag_name = fields.Str(dump_only=True, data_key="tagName")
+    tag_name = TagNameField(dump_only=True, data_key="tagName")
     tag_id = fields.Int(required=True, load_only=True, data_key="tagId")
 
 
 class UpdateTaskSchema(PlainTaskSchema):
     pass
+
+
+class TaskQuerySchema(PlainTaskQuerySchema):
+    pass
+
+
+class JobSchema(PlainJobSchema):
+    pass
+
+
+class StatementCacheSchema(PlainStatementCacheSchema):
+    pass
+
+
+class MemoryStatsSchema(PlainMemoryStatsSchema):
+    pass
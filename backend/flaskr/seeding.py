@@ -0,0 +1,163 @@
+"""Synthetic users, tags and tasks for development and benchmarking.
+
+Rows are generated from a seeded ``random.Random`` and inserted with bulk
+executemany statements, one transaction per batch, so millions of tasks
+take seconds rather than hours.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta, timezone
+from flask import current_app
+from sqlalchemy import func, insert, select
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_model import TaskModel, TaskStatus
+from flaskr.models.user_model import UserModel
+from flaskr.sharding import home_shard, pin_home_shards, task_shard
+from flaskr.utils import generate_password
+
+TAG_NAMES = [
+    "Work",
+    "Study",
+    "Free Time",
+    "Exercise",
+    "Health",
+    "Travel",
+    "Hobbies",
+    "Shopping",
+    "Finances",
+    "Family",
+    "Chores",
+    "Friends",
+    "Meetings",
+    "Goals",
+    "Projects",
+    "Learning",
+    "Entertainment",
+    "Relaxation",
+    "Urgent",
+    "Miscellaneous",
+]
+STATUSES = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED]
+STATUS_WEIGHTS = [30, 15, 55]
+WORDS = (
+    "call email review plan buy fix write read book pay clean prepare send "
+    "update check finish organize schedule renew draft cancel"
+).split()
+
+
+def seed_tags(extra=0):
+    """Insert the default tags and ``extra`` numbered ones that are missing.
+
+    Returns the number of tags inserted; running it again inserts none.
+    """
+    names = TAG_NAMES + [f"Tag {number}" for number in range(1, extra + 1)]
+    existing = set(db.session.execute(select(TagModel.name)).scalars())
+    missing = [{"name": name} for name in names if name not in existing]
+
+    if missing:
+        db.session.execute(insert(TagModel), missing)
+    db.session.commit()
+
+    return len(missing)
+
+
+def seed_users(count, password, batch_size, progress=None):
+    """Insert ``count`` users sharing one pre-hashed password, return their ids."""
+    first = (db.session.execute(select(func.max(UserModel.id))).scalar() or 0) + 1
+    password_hash = generate_password(password)
+    shards = current_app.config["TASK_SHARDS"]
+    user_ids = []
+
+    for start in range(first, first + count, batch_size):
+        ids = db.session.execute(
+            insert(UserModel).returning(UserModel.id),
+            [
+                {
+                    "username": f"seed{number}",
+                    "email": f"seed{number}@example.com",
+                    "password": password_hash,
+                }
+                for number in range(start, min(start + batch_size, first + count))
+            ],
+        ).scalars().all()
+
+        if shards:
+            pin_home_shards(ids)
+        db.session.commit()
+        user_ids.extend(ids)
+
+        if progress:
+            progress(len(user_ids), count)
+
+    return user_ids
+
+
+def seed_tasks(count, user_ids, rng, until, days, batch_size, progress=None):
+    """Insert ``count`` tasks spread over ``user_ids``, return the number inserted.
+
+    A few users own most tasks and a few tags label most of them; statuses
+    are mostly COMPLETED and ``created_at`` thins out going back ``days``
+    days from ``until``.
+    """
+    tag_ids = db.session.execute(select(TagModel.id).order_by(TagModel.id)).scalars().all()
+    # Zipf-like: the n-th tag is used about 1/n as often as the first
+    tag_weights = [1 / rank for rank in range(1, len(tag_ids) + 1)]
+    rng.shuffle(tag_ids)
+    span = days * 86400
+    shards = current_app.config["TASK_SHARDS"]
+    usage = Counter()
+
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        owners = [user_ids[int(len(user_ids) * rng.random() ** 3)] for _ in range(size)]
+        tags = rng.choices(tag_ids, tag_weights, k=size)
+        statuses = rng.choices(STATUSES, STATUS_WEIGHTS, k=size)
+
+        rows = [
+            {
+                "title": f"{rng.choice(WORDS).capitalize()} {start + index + 1}",
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(3, 40))),
+                "status": statuses[index],
+                "created_at": until - timedelta(seconds=int(span * rng.random() ** 2)),
+                "user_id": owners[index],
+                "tag_id": tags[index],
+            }
+            for index in range(size)
+        ]
+        usage.update(zip(owners, tags))
+        insert_tasks(rows, shards)
+        db.session.commit()
+
+        if progress:
+            progress(start + size, count)
+
+    for start in range(0, len(usage), batch_size):
+        chunk = list(usage.items())[start:start + batch_size]
+        db.session.execute(
+            insert(TagUsageModel),
+            [{"user_id": user_id, "tag_id": tag_id, "uses": uses} for (user_id, tag_id), uses in chunk],
+        )
+    db.session.commit()
+
+    return count
+
+
+def insert_tasks(rows, shards):
+    if not shards:
+        db.session.execute(insert(TaskModel.__table__), rows)
+        return
+
+    by_shard = {}
+    for row in rows:
+        by_shard.setdefault(home_shard(row["user_id"]), []).append(row)
+
+    for index, shard_rows in by_shard.items():
+        with task_shard(index):
+            db.session.execute(insert(TaskModel.__table__), shard_rows)
+
+
+def seed_until():
+    """Midnight UTC today, so a seed gives the same rows all day."""
+    return datetime.combine(datetime.now(timezone.utc).date(), time(), tzinfo=timezone.utc)
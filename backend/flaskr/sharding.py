@@ -0,0 +1,479 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from flask import current_app, g, has_app_context
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import (
+    CompoundSelect,
+    Select,
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.sql.dml import UpdateBase
+from werkzeug.exceptions import ServiceUnavailable
+from flaskr.db import RoutingSession, bind_routers, db, read_primary
+from flaskr.jobs import enqueue
+from flaskr.models.job_model import JobModel
+from flaskr.models.task_archive_model import TaskArchiveModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+
+TASKS = TaskModel.__table__
+# Tables holding per-user task data, which live together on a shard
+SHARDED_TABLES = (TASKS, TaskArchiveModel.__table__)
+SHARD_OF_USER = select(UserModel.task_shard, UserModel.tasks_moving).where(
+    UserModel.id == bindparam("user_id")
+)
+# Shard i gives new tasks ids above i * SHARD_ID_RANGE, so a task keeps an id
+# no other shard hands out when it is moved
+SHARD_ID_RANGE = 1 << 40
+
+
+class TasksMovingError(ServiceUnavailable):
+    """A user's tasks are being moved between shards and are read-only."""
+
+    def __init__(self):
+        super().__init__()
+        self.data = {"message": "Tasks are being moved, try again shortly"}
+
+
+def init_sharding(app):
+    if not app.config["TASK_SHARDS"]:
+        return
+
+    def disable_foreign_keys(dbapi_connection, connection_record):
+        # users and tags live on the primary, so the tasks foreign keys
+        # cannot be checked on a shard
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=OFF")
+        cursor.close()
+
+    with app.app_context():
+        for index in range(app.config["TASK_SHARDS"]):
+            # Shards only hold SHARDED_TABLES, created by ``create_shards``
+            db.metadatas.pop(shard_bind(index), None)
+            event.listen(shard_engine(index), "connect", disable_foreign_keys)
+
+
+def shard_bind(index):
+    return f"tasks_{index}"
+
+
+def shard_engine(index):
+    return db.engines[shard_bind(index)]
+
+
+def home_shard(user_id):
+    """Shard a new user is placed on.
+
+    Jump consistent hashing: going from N to N + 1 shards only moves the
+    users that the new shard takes over, about 1 in N + 1 of them.
+    """
+    return jump_hash(int(user_id), current_app.config["TASK_SHARDS"])
+
+
+def jump_hash(key, buckets):
+    # Lamping and Veach, "A Fast, Minimal Memory, Consistent Hash Algorithm"
+    bucket, jump = -1, 0
+
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+
+    return bucket
+
+
+def user_shard(user_id):
+    """Shard holding ``user_id``'s tasks and whether they are being moved.
+
+    Looked up on the primary once per request: a replica could still point
+    at the shard the tasks were just moved away from.
+    """
+    directory = g.setdefault("task_shards", {})
+    user_id = int(user_id)
+
+    if user_id not in directory:
+        with read_primary():
+            row = db.session.execute(SHARD_OF_USER, {"user_id": user_id}).first()
+
+        if row is None or row.task_shard is None:
+            directory[user_id] = (home_shard(user_id), False)
+        else:
+            directory[user_id] = (row.task_shard, row.tasks_moving)
+
+    return directory[user_id]
+
+
+@contextmanager
+def task_shard(index):
+    """Send task statements to shard ``index`` instead of the current user's."""
+    previous = g.get("task_shard")
+    g.task_shard = index
+
+    try:
+        yield
+    finally:
+        g.task_shard = previous
+
+
+def each_task_shard():
+    """Run the loop body once per shard, or once on the primary when unsharded."""
+    if not current_app.config["TASK_SHARDS"]:
+        yield None
+        return
+
+    for index in range(current_app.config["TASK_SHARDS"]):
+        with task_shard(index):
+            yield index
+
+
+def touches_tasks(mapper, clause):
+    if mapper is not None:
+        return mapper.local_table in SHARDED_TABLES
+    if isinstance(clause, UpdateBase):
+        return clause.table in SHARDED_TABLES
+    if isinstance(clause, Select):
+        return any(table in SHARDED_TABLES for table in clause.get_final_froms())
+    if isinstance(clause, CompoundSelect):
+        return any(touches_tasks(None, part) for part in clause.selects)
+
+    return False
+
+
+def route_tasks(mapper, clause):
+    if not current_app.config["TASK_SHARDS"] or not touches_tasks(mapper, clause):
+        return None
+
+    index = g.get("task_shard")
+
+    if index is None:
+        try:
+            user_id = get_jwt_identity()
+        except RuntimeError:
+            user_id = None
+
+        if user_id is None:
+            raise RuntimeError("Task statement outside of a user or task_shard()")
+
+        index, moving = user_shard(user_id)
+
+        # A flush asks for a bind with only the mapper
+        if clause is None or isinstance(clause, UpdateBase):
+            if moving:
+                raise TasksMovingError()
+
+            g.setdefault("task_writes", {})[int(user_id)] = index
+
+    return shard_engine(index)
+
+
+bind_routers.append(route_tasks)
+
+
+def lock_user_tasks(connection, user_id):
+    """Take the lock that task writers and ``move_user_tasks`` both hold on
+    a shard until ``connection``'s transaction ends.
+
+    SQLite allows one writer per database, so any write statement takes it,
+    even one that changes nothing. PostgreSQL locks the user id instead.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(select(func.pg_advisory_xact_lock(user_id)))
+    else:
+        connection.execute(
+            update(TASKS).where(TASKS.c.id == -1).values(user_id=TASKS.c.user_id)
+        )
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def check_task_writes(session):
+    """Reject task writes to a shard the user's tasks were moved away from.
+
+    The directory is read once per request, so a move can start or finish
+    after a write was routed. With the shard locked, a move either copies
+    this write once it is committed, or has already flagged the user on
+    the primary, which is read again here.
+    """
+    if not has_app_context() or not g.get("task_writes"):
+        return
+
+    session.flush()
+    writes = g.pop("task_writes")
+
+    for user_id, index in writes.items():
+        lock_user_tasks(
+            session.connection(bind_arguments={"bind": shard_engine(index)}), user_id
+        )
+
+        # Not through the session: its transaction may not see the flag yet
+        with db.engines[None].connect() as connection:
+            row = connection.execute(SHARD_OF_USER, {"user_id": user_id}).first()
+
+        shard = home_shard(user_id) if row is None or row.task_shard is None else row.task_shard
+
+        if shard != index or (row is not None and row.tasks_moving):
+            raise TasksMovingError()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def forget_task_writes(session):
+    if has_app_context():
+        g.pop("task_writes", None)
+
+
+def write_intent(name, payload):
+    """Commit a ``name`` job that finishes the write about to span a task
+    shard and the primary. Returns its id, for ``commit_with_intent``.
+
+    A session commits each database on its own, so a failure can keep one
+    side of the write only. The job is due once ``JOBS_LEASE_SECONDS`` have
+    passed, and only stays behind if the write did not fully commit; the
+    worker then runs it to finish or compensate the primary side. Without
+    shards the write is a single commit and no job is written.
+    """
+    if not current_app.config["TASK_SHARDS"]:
+        return None
+
+    intent = enqueue(name, payload)
+    intent.run_at = datetime.now(timezone.utc) + timedelta(
+        seconds=current_app.config["JOBS_LEASE_SECONDS"]
+    )
+    intent_id = intent.id
+    db.session.commit()
+
+    return intent_id
+
+
+def commit_with_intent(intent_id):
+    db.session.commit()
+
+    if intent_id is not None:
+        db.session.execute(delete(JobModel).where(JobModel.id == intent_id))
+        db.session.commit()
+
+
+def pin_home_shard(user_id):
+    db.session.execute(
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        .values(task_shard=home_shard(user_id))
+    )
+
+
+def create_shards():
+    """Create the task tables on every shard and pin existing users.
+
+    Tasks still in the primary's tables, from before sharding was enabled,
+    are moved to their owner's shard. Safe to run again after adding a shard.
+    """
+    with db.engines[None].connect() as connection:
+        owners = set()
+        for table in SHARDED_TABLES:
+            owners.update(
+                connection.execute(select(table.c.user_id).distinct()).scalars()
+            )
+
+        last_id = max_task_id(connection)
+
+    for index in range(current_app.config["TASK_SHARDS"]):
+        for table in SHARDED_TABLES:
+            table.create(shard_engine(index), checkfirst=True)
+
+        # The primary's tasks keep their ids on the shards, so new ones
+        # start above them
+        reserve_id_range(index, max(index * SHARD_ID_RANGE, last_id))
+
+    unpinned = db.session.execute(
+        select(UserModel.id).where(UserModel.task_shard.is_(None))
+    ).scalars().all()
+    pin_home_shards(unpinned)
+    db.session.commit()
+
+    moved = 0
+    for user_id in owners:
+        index, _ = user_shard(user_id)
+        moved += copy_tasks(user_id, db.engines[None], shard_engine(index))
+        drop_tasks(user_id, db.engines[None])
+
+    return moved
+
+
+def pin_home_shards(user_ids):
+    if user_ids:
+        db.session.execute(
+            update(UserModel),
+            [{"id": user_id, "task_shard": home_shard(user_id)} for user_id in user_ids],
+        )
+
+
+def max_task_id(connection):
+    return max(
+        connection.execute(select(func.max(table.c.id))).scalar() or 0
+        for table in SHARDED_TABLES
+    )
+
+
+def reserve_id_range(index, start):
+    """Make shard ``index`` give new tasks ids above ``start``, or above the
+    largest id it already holds."""
+    with shard_engine(index).begin() as connection:
+        start = max(start, max_task_id(connection))
+
+        if connection.dialect.name == "sqlite":
+            # tasks uses AUTOINCREMENT, which never goes below sqlite_sequence
+            seq = connection.execute(
+                text("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'")
+            ).scalar()
+
+            if seq is None:
+                connection.execute(
+                    text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', :start)"),
+                    {"start": start},
+                )
+            elif seq < start:
+                connection.execute(
+                    text("UPDATE sqlite_sequence SET seq = :start WHERE name = 'tasks'"),
+                    {"start": start},
+                )
+        elif start:
+            connection.execute(
+                text(
+                    "SELECT setval(pg_get_serial_sequence('tasks', 'id'), "
+                    "GREATEST(:start, (SELECT last_value FROM "
+                    "pg_sequences WHERE sequencename = 'tasks_id_seq')))"
+                ),
+                {"start": start},
+            )
+
+
+def move_user_tasks(user_id, target, batch_size=1000, progress=None):
+    """Move ``user_id``'s tasks to shard ``target`` while the app keeps serving.
+
+    The user's tasks stay readable from the old shard during the copy;
+    writes to them answer 503 until the directory points at the new shard.
+    Writes routed before the user was flagged are either copied or
+    rejected, see ``check_task_writes``. Moved tasks keep their ids.
+    Returns the number of tasks moved.
+    """
+    user_id = int(user_id)
+    g.pop("task_shards", None)
+    source, _ = user_shard(user_id)
+
+    if not 0 <= target < current_app.config["TASK_SHARDS"]:
+        raise ValueError(f"No such shard: {target}")
+    if source == target:
+        return 0
+
+    set_moving(user_id, True)
+
+    try:
+        # Leftovers of an interrupted move are invisible and would duplicate
+        drop_tasks(user_id, shard_engine(target))
+        moved = copy_tasks(
+            user_id, shard_engine(source), shard_engine(target), batch_size, progress
+        )
+    except BaseException:
+        set_moving(user_id, False)
+        raise
+
+    db.session.execute(
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        .values(task_shard=target, tasks_moving=False)
+    )
+    db.session.commit()
+    g.pop("task_shards", None)
+
+    # Only once nothing reads them any more. A crash before this leaves
+    # unreachable rows behind, which the next move onto that shard drops.
+    drop_tasks(user_id, shard_engine(source))
+
+    return moved
+
+
+def set_moving(user_id, moving):
+    db.session.execute(
+        update(UserModel).where(UserModel.id == user_id).values(tasks_moving=moving)
+    )
+    db.session.commit()
+
+
+def copy_tasks(user_id, source, target, batch_size=1000, progress=None):
+    """Copy a user's tasks, archived ones included, from engine ``source`` to
+    ``target`` in a single transaction on ``target``.
+
+    Rows keep their ids: every shard gives out ids from its own range, see
+    ``reserve_id_range``, so no other task on ``target`` has them. Writers
+    to ``source`` wait for the copy, and commit before it when they were
+    first.
+    """
+    with source.begin() as reader, target.begin() as writer:
+        lock_user_tasks(reader, user_id)
+        total = sum(
+            reader.execute(
+                select(func.count()).where(table.c.user_id == user_id)
+            ).scalar_one()
+            for table in SHARDED_TABLES
+        )
+
+        done = 0
+        for table in SHARDED_TABLES:
+            columns = list(table.columns)
+            last_id = 0
+
+            while True:
+                rows = reader.execute(
+                    select(*columns)
+                    .where(table.c.user_id == user_id, table.c.id > last_id)
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                ).all()
+
+                if not rows:
+                    break
+
+                writer.execute(
+                    insert(table),
+                    [
+                        {column.name: row._mapping[column] for column in columns}
+                        for row in rows
+                    ],
+                )
+                done, last_id = done + len(rows), rows[-1].id
+
+                if progress is not None:
+                    progress(done, total)
+
+    return done
+
+
+def drop_tasks(user_id, engine):
+    with engine.begin() as connection:
+        for table in SHARDED_TABLES:
+            connection.execute(delete(table).where(table.c.user_id == user_id))
+
+
+def rebalance(batch_size=1000, progress=None):
+    """Move every user whose shard is not their home shard, e.g. after a
+    shard was added. Yields ``(user_id, source, target, moved)``.
+    """
+    misplaced = [
+        (user_id, source, home_shard(user_id))
+        for user_id, source in db.session.execute(
+            select(UserModel.id, UserModel.task_shard).where(
+                UserModel.task_shard.is_not(None)
+            )
+        )
+        if source != home_shard(user_id)
+    ]
+
+    for user_id, source, target in misplaced:
+        moved = move_user_tasks(user_id, target, batch_size, progress)
+
+        yield user_id, source, target, moved
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from flask import has_request_context, request
+
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)")
+
+
+def normalize(statement):
+    """SQL with literals and IN-list placeholders folded, one line."""
+    sql = LITERALS.sub("?", statement)
+    sql = PLACEHOLDER_LISTS.sub("(?)", sql)
+
+    return " ".join(sql.split())
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def parameters_shape(parameters, executemany):
+    """Types of the bound values, never the values themselves."""
+    if executemany:
+        return {"rows": len(parameters), "each": parameters_shape(parameters[0], False)}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def explain(dbapi_connection, dialect, statement, parameters, executemany):
+    prefix = EXPLAIN_PREFIXES.get(dialect.name)
+
+    if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+
+    # A cursor of its own on the same connection: the statement's rows may
+    # still be unread, and going through SQLAlchemy would fire these events
+    explain_cursor = dbapi_connection.cursor()
+    # On PostgreSQL a failed EXPLAIN would abort the caller's transaction,
+    # so it runs in a savepoint it can be rolled back to
+    savepoint = dialect.name == "postgresql"
+
+    try:
+        if savepoint:
+            explain_cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+
+        try:
+            explain_cursor.execute(
+                prefix + statement, parameters[0] if executemany else parameters
+            )
+            # The last column is the plan text on both backends
+            plan = [str(row[-1]) for row in explain_cursor.fetchall()]
+        except Exception:
+            if savepoint:
+                explain_cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            raise
+
+        if savepoint:
+            explain_cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+
+        return plan
+    except Exception as error:
+        return [f"EXPLAIN failed: {error}"]
+    finally:
+        explain_cursor.close()
+
+
+def init_slow_query_log(app):
+    """Logger writing one JSON object per slow statement to a rotating file."""
+    path = app.config["SLOW_QUERY_LOG"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=app.config["SLOW_QUERY_LOG_MAX_BYTES"],
+        backupCount=app.config["SLOW_QUERY_LOG_BACKUPS"],
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    # Not registered with logging.getLogger, so apps never share handlers
+    logger = app.extensions["slow_query_log"] = logging.Logger("flaskr.slow_queries")
+    logger.addHandler(handler)
+
+
+def log_slow_query(logger, conn, statement, parameters, executemany, elapsed):
+    normalized = normalize(statement)
+
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "fingerprint": fingerprint(normalized),
+        "sql": normalized,
+        "parameters": parameters_shape(parameters, executemany),
+        "duration_ms": round(elapsed * 1000, 3),
+        "endpoint": (
+            f"{request.method} {request.endpoint}" if has_request_context() else None
+        ),
+        "plan": explain(
+            conn.connection.dbapi_connection, conn.dialect, statement, parameters, executemany
+        ),
+    }
+    logger.warning(json.dumps(entry))
+
+
+def read_slow_queries(path):
+    """Entries of the log and its rotated backups, oldest file first."""
+    paths = [f"{path}.{index}" for index in range(99, 0, -1)] + [path]
+
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+
+        with open(log_path) as log:
+            for line in log:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize_slow_queries(entries):
+    """Per fingerprint: count, total, mean and max duration, latest plan."""
+    summary = {}
+
+    for entry in entries:
+        stats = summary.setdefault(
+            entry["fingerprint"],
+            {
+                "fingerprint": entry["fingerprint"],
+                "sql": entry["sql"],
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "endpoints": set(),
+            },
+        )
+        stats["count"] += 1
+        stats["total_ms"] += entry["duration_ms"]
+        stats["max_ms"] = max(stats["max_ms"], entry["duration_ms"])
+        stats["plan"] = entry["plan"]
+        if entry["endpoint"]:
+            stats["endpoints"].add(entry["endpoint"])
+
+    for stats in summary.values():
+        stats["mean_ms"] = stats["total_ms"] / stats["count"]
+        stats["endpoints"] = sorted(stats["endpoints"])
+
+    return list(summary.values())
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import threading
+import time
+from collections import namedtuple
+from flask import current_app, g
+from sqlalchemy import select
+from flaskr.db import db, read_primary
+from flaskr.models.tag_model import TagModel
+
+Snapshot = namedtuple("Snapshot", ["tags", "body", "etag"])
+Entry = namedtuple("Entry", ["version", "loaded_at", "value"])
+
+
+class CatalogueState:
+    def __init__(self):
+        self.version = 0
+        self.entries = {}
+        self.lock = threading.Lock()
+
+
+class TagCatalogue:
+    """In-process copies of the tag table.
+
+    The tag list only changes through ``TagController.create`` and the seed
+    command, so it is kept in memory and rebuilt when ``bump`` is called.
+    Other processes (workers, flask seed) cannot bump this copy, which is why
+    entries also expire after ``TAGS_CACHE_TTL`` seconds.
+    """
+
+    def init_app(self, app):
+        app.extensions["tag_catalogue"] = CatalogueState()
+
+    @property
+    def state(self):
+        return current_app.extensions["tag_catalogue"]
+
+    def bump(self):
+        with self.state.lock:
+            self.state.version += 1
+
+        g.pop("tag_names", None)
+        g.pop("tag_names_copied", None)
+
+    def snapshot(self, load):
+        """Pre-serialized ``GET /tags`` body built from ``load()``."""
+        return self.cached("snapshot", lambda: self.build_snapshot(load()))
+
+    def names(self):
+        """Tag id -> name map, pinned for the rest of the request."""
+        if "tag_names" not in g:
+            g.tag_names = self.cached("names", self.load_names)
+
+        return g.tag_names
+
+    def name_of(self, tag_id):
+        # Called once per serialized task, so the hit path is kept to a
+        # single context lookup.
+        try:
+            return g.tag_names[tag_id]
+        except (AttributeError, KeyError):
+            pass
+
+        names = self.names()
+
+        # Created by another process since the map was loaded. Reloaded once
+        # per request, as tasks on a shard can keep ids of deleted tags.
+        if tag_id not in names and "tag_names_reloaded" not in g:
+            self.bump()
+            g.tag_names_reloaded = True
+            names = self.names()
+
+        if tag_id not in names:
+            # Misses go into a copy, the loaded map is shared by requests
+            if "tag_names_copied" not in g:
+                g.tag_names = names = dict(names)
+                g.tag_names_copied = True
+            names[tag_id] = None
+
+        return names[tag_id]
+
+    def cached(self, key, build):
+        state = self.state
+        entry = state.entries.get(key)
+
+        if self.is_fresh(entry):
+            return entry.value
+
+        with state.lock:
+            entry = state.entries.get(key)
+
+            if self.is_fresh(entry):
+                return entry.value
+
+            # Read the version before loading so a bump racing with the
+            # query makes this entry stale instead of getting lost.
+            version = state.version
+
+            # Shared by every client, so never cache a lagging replica
+            with read_primary():
+                entry = Entry(version, time.monotonic(), build())
+            state.entries[key] = entry
+
+        return entry.value
+
+    def is_fresh(self, entry):
+        return (
+            entry is not None
+            and entry.version == self.state.version
+            and time.monotonic() - entry.loaded_at
+            < current_app.config["TAGS_CACHE_TTL"]
+        )
+
+    @staticmethod
+    def build_snapshot(tags):
+        body = json.dumps(tags, separators=(",", ":")).encode()
+
+        # Content based so every process hands out the same ETag
+        return Snapshot(tags=tags, body=body, etag=hashlib.sha1(body).hexdigest())
+
+    @staticmethod
+    def load_names():
+        return dict(db.session.execute(select(TagModel.id, TagModel.name)).all())
+
+
+tag_catalogue = TagCatalogue()
@@ -0,0 +1,122 @@
+"""Opt-in capture of anonymized request traces for replaying offline.
+
+Each request appends one JSON line with short keys to TRAFFIC_CAPTURE_FILE:
+
+``ts``  start, seconds since the epoch
+``ms``  duration in milliseconds
+``m``   HTTP method
+``r``   route template, e.g. ``/api/v1/tasks/<task_id>``
+``q``   query parameters; values other than numbers and booleans are null
+``in``  request body bytes
+``out`` response body bytes
+``s``   status code
+``u``   pseudonym of the signed in user, or null
+
+Paths, bodies, ids and tokens are never written. Pseudonyms are keyed
+hashes of the user id, stable for as long as TRAFFIC_CAPTURE_KEY is, so the
+requests of a user can be told apart without telling who they are.
+``benchmarks/replay.py`` plays the file back.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt_identity
+
+SAFE_QUERY_VALUE = re.compile(r"^(?:\d{1,10}|true|false)$", re.IGNORECASE)
+
+
+class TrafficLog:
+    """Append-only file of request traces shared by the processes of a server.
+
+    Every trace is a single ``write`` on an ``O_APPEND`` descriptor, so lines
+    of different workers never interleave.
+    """
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key.encode()
+        self.fd = None
+        self.lock = threading.Lock()
+
+    def pseudonym(self, user_id):
+        return hmac.new(self.key, str(user_id).encode(), hashlib.sha256).hexdigest()[:16]
+
+    def write(self, trace):
+        line = (json.dumps(trace, separators=(",", ":")) + "\n").encode()
+
+        if self.fd is None:
+            with self.lock:
+                if self.fd is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+
+        os.write(self.fd, line)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def init_traffic_capture(app):
+    if not app.config["TRAFFIC_CAPTURE"]:
+        return
+
+    key = app.config["TRAFFIC_CAPTURE_KEY"] or app.config["JWT_SECRET_KEY"]
+    app.extensions["traffic"] = TrafficLog(app.config["TRAFFIC_CAPTURE_FILE"], key)
+    app.before_request(start_trace)
+    app.after_request(write_trace)
+
+
+def start_trace():
+    g.traffic_started = (time.time(), time.perf_counter())
+
+
+def write_trace(response):
+    started = g.pop("traffic_started", None)
+
+    if started is None:
+        return response
+
+    started_at, started_counter = started
+    traffic = current_app.extensions["traffic"]
+
+    try:
+        # Only set when the view verified a JWT; decoding one here would
+        # cost every request
+        user_id = get_jwt_identity()
+    except RuntimeError:
+        user_id = None
+
+    traffic.write(
+        {
+            "ts": round(started_at, 3),
+            "ms": round((time.perf_counter() - started_counter) * 1000, 2),
+            "m": request.method,
+            "r": request.url_rule.rule if request.url_rule else None,
+            "q": {
+                name: value if SAFE_QUERY_VALUE.match(value) else None
+                for name, value in request.args.items()
+            },
+            "in": request.content_length or 0,
+            "out": response.calculate_content_length() or 0,
+            "s": response.status_code,
+            "u": traffic.pseudonym(user_id) if user_id is not None else None,
+        }
+    )
+
+    return response
+
+
+def read_traces(path):
+    """Traces of a capture file in start order."""
+    with open(path) as file:
+        traces = [json.loads(line) for line in file if line.strip()]
+
+    return sorted(traces, key=lambda trace: trace["ts"])
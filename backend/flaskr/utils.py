@@ -1,3 +1,7 @@
+from functools import wraps
+from flask import current_app
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_smorest import abort
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
@@ -7,3 +11,20 @@ def generate_password(password):
 
 def check_password(password_hash, password):
     return check_password_hash(password_hash, password)
+
+
+def admin_required():
+    """Like ``jwt_required`` but also requires the user to be in ADMIN_USER_IDS."""
+
+    def wrapper(fn):
+        @wraps(fn)
+        @jwt_required()
+        def decorator(*args, **kwargs):
+            if int(get_jwt_identity()) not in current_app.config["ADMIN_USER_IDS"]:
+                abort(403, message="Admin privileges required")
+
+            return fn(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
@@ -0,0 +1,55 @@
+"""archived_tasks_keep_their_id
+
+Revision ID: 408c8b347310
+Revises: c949054c6ae2
+Create Date: 2026-10-19 07:05:12.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '408c8b347310'
+down_revision = 'c949054c6ae2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # Archived rows got ids of their own, which may be ids of live tasks.
+    # Their old task ids are lost, so move them all above every id in use.
+    offset = bind.execute(sa.text(
+        "SELECT max(COALESCE((SELECT max(id) FROM tasks), 0),"
+        " COALESCE((SELECT max(id) FROM tasks_archive), 0))"
+        if bind.dialect.name == 'sqlite' else
+        "SELECT GREATEST(COALESCE((SELECT max(id) FROM tasks), 0),"
+        " COALESCE((SELECT max(id) FROM tasks_archive), 0))"
+    )).scalar_one()
+    op.execute(sa.text("UPDATE tasks_archive SET id = id + :offset").bindparams(offset=offset))
+    last_id = bind.execute(sa.text("SELECT COALESCE(max(id), 0) FROM tasks_archive")).scalar_one()
+
+    if bind.dialect.name == 'sqlite':
+        # Without AUTOINCREMENT SQLite reuses the id of the last row once it
+        # is deleted, which archiving does
+        with op.batch_alter_table('tasks', recreate='always', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+
+        op.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+        op.execute(sa.text(
+            "INSERT INTO sqlite_sequence (name, seq) "
+            "SELECT 'tasks', max(:last_id, COALESCE((SELECT max(id) FROM tasks), 0))"
+        ).bindparams(last_id=last_id))
+    elif last_id:
+        op.execute(sa.text(
+            "SELECT setval(pg_get_serial_sequence('tasks', 'id'), "
+            "GREATEST(:last_id, (SELECT COALESCE(max(id), 0) FROM tasks)))"
+        ).bindparams(last_id=last_id))
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('tasks', recreate='always', table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+            pass
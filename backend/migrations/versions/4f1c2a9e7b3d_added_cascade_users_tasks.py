@@ -0,0 +1,28 @@
+"""added_cascade_users_tasks
+
+Revision ID: 4f1c2a9e7b3d
+Revises: cac5cf55cffa
+Create Date: 2026-10-19 10:12:04.381226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9e7b3d'
+down_revision = 'cac5cf55cffa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_tasks_user_id_users'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_tasks_user_id_users'), 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_tasks_user_id_users'), type_='foreignkey')
+        batch_op.create_foreign_key(batch_op.f('fk_tasks_user_id_users'), 'users', ['user_id'], ['id'])
@@ -0,0 +1,26 @@
+"""added_tags_name_lower_index
+
+Revision ID: 7a3e5d1c9f20
+Revises: e937a0ab429b
+Create Date: 2026-10-19 11:02:47.915310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e5d1c9f20'
+down_revision = 'e937a0ab429b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.create_index('ix_tags_name_lower', [sa.text('lower(name)'), 'name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tags', schema=None) as batch_op:
+        batch_op.drop_index('ix_tags_name_lower')
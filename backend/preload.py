@@ -0,0 +1,16 @@
+"""Entry point for pre-fork servers that load the app before forking.
+
+gunicorn --preload -w 4 preload:app
+"""
+
+import gc
+
+# Objects freed while loading would leave holes in the pages the workers
+# share; flaskr.preload freezes everything and enables gc again
+gc.disable()
+
+from flaskr import create_app
+from flaskr.preload import preload
+
+app = create_app()
+preload(app)
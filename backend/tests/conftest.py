@@ -1,9 +1,12 @@
 import pytest
+from contextlib import contextmanager
 from flask import Flask
 from flask_jwt_extended import create_access_token
 from config import TestConfig
 from flaskr import create_app
 from flaskr.db import db
+from flaskr.instrumentation import capture_queries
+from flaskr.memory import measure_allocations
 from flaskr.models.user_model import UserModel
 from flaskr.models.tag_model import TagModel
 from flaskr.models.task_model import TaskModel, TaskStatus
@@ -23,12 +26,61 @@ def app():
     return app
 
 
+@pytest.fixture
+def file_app(tmp_path):
+    """Create a test Flask app backed by an SQLite file shared across threads."""
+
+    class FileTestConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "test.db")
+
+    app = create_app(FileTestConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+        db.engine.dispose()
+
+
 @pytest.fixture
 def client(app):
     """Create a test client."""
     return app.test_client()
 
 
+@pytest.fixture
+def max_queries(app):
+    """Fail when the block runs more than ``limit`` SQL statements."""
+
+    @contextmanager
+    def check(limit):
+        with capture_queries() as stats:
+            yield stats
+
+        statements = "\n".join(stats.statements)
+        assert stats.queries <= limit, (
+            f"{stats.queries} queries run, at most {limit} expected:\n{statements}"
+        )
+
+    return check
+
+
+@pytest.fixture
+def memory_budget():
+    """Fail when the block's peak allocation goes over ``limit`` bytes."""
+
+    @contextmanager
+    def check(limit):
+        with measure_allocations() as allocations:
+            yield allocations
+
+        assert allocations.peak_bytes <= limit, (
+            f"peak of {allocations.peak_bytes} bytes allocated, at most {limit} expected"
+        )
+
+    return check
+
+
 @pytest.fixture
 def auth_headers(app):
     """Create JWT token headers for authenticated requests."""
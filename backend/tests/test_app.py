@@ -1,6 +1,7 @@
 import pytest
 from flaskr import create_app
-from config import DevelopmentConfig, TestConfig
+from sqlalchemy import text
+from config import DevelopmentConfig, ProductionConfig, TestConfig, get_config
 from flaskr.db import db
 from flaskr.extensions import migrate, api, cors, jwt
 
@@ -65,3 +66,39 @@ class TestAppInitialization:
     def test_app_testing_mode(self, app):
         """Test that app is in testing mode when using TestConfig."""
         assert app.config["TESTING"] is True
+
+    def test_get_config_from_env(self, monkeypatch):
+        """Test that APP_CONFIG selects the config class."""
+        assert get_config() is DevelopmentConfig
+
+        monkeypatch.setenv("APP_CONFIG", "production")
+
+        assert get_config() is ProductionConfig
+
+    def test_get_config_unknown(self, monkeypatch):
+        """Test that an unknown APP_CONFIG names the valid choices."""
+        monkeypatch.setenv("APP_CONFIG", "prod")
+
+        with pytest.raises(RuntimeError, match="development, production"):
+            get_config()
+
+    def test_sqlite_pragmas_applied(self, tmp_path):
+        """Test that SQLITE_PRAGMAS are set on every new connection."""
+
+        class TunedConfig(ProductionConfig):
+            SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "tuned.db")
+
+        app = create_app(TunedConfig)
+
+        with app.app_context():
+            with db.engine.connect() as conn:
+                pragma = lambda name: conn.execute(text(f"PRAGMA {name}")).scalar()
+
+                assert pragma("journal_mode") == "wal"
+                assert pragma("synchronous") == 1  # NORMAL
+                assert pragma("foreign_keys") == 1
+                assert pragma("busy_timeout") == 5000
+                assert pragma("temp_store") == 2  # MEMORY
+                assert pragma("cache_size") == -64000
+
+            db.engine.dispose()
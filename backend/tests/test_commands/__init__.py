@@ -0,0 +1 @@
+# Command tests package
@@ -0,0 +1,68 @@
+from sqlalchemy import func, select
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+from flaskr.seeding import TAG_NAMES
+
+
+class TestSeedCommand:
+    """Test the flask seed CLI."""
+
+    def test_seed_tags_is_idempotent(self, app):
+        """Test flask seed only inserts the tags that are missing."""
+        runner = app.test_cli_runner()
+
+        first = runner.invoke(args=["seed", "--extra-tags", "5"])
+        second = runner.invoke(args=["seed", "--extra-tags", "5"])
+
+        assert first.exit_code == 0
+        assert f"Inserted {len(TAG_NAMES) + 5} tags" in first.output
+        assert "Inserted 0 tags" in second.output
+        assert db.session.query(TagModel).count() == len(TAG_NAMES) + 5
+
+    def test_seed_users_and_tasks(self, app):
+        """Test flask seed inserts the requested users, tasks and tag usage."""
+        result = app.test_cli_runner().invoke(
+            args=["seed", "--users", "10", "--tasks", "500", "--batch-size", "128"]
+        )
+
+        assert result.exit_code == 0
+        assert db.session.query(UserModel).count() == 10
+        assert db.session.query(TaskModel).count() == 500
+        tasks_per_user = db.session.execute(
+            select(TaskModel.user_id, func.count()).group_by(TaskModel.user_id)
+        ).all()
+        uses_per_user = db.session.execute(
+            select(TagUsageModel.user_id, func.sum(TagUsageModel.uses)).group_by(TagUsageModel.user_id)
+        ).all()
+        assert tasks_per_user == uses_per_user
+
+    def test_seed_is_deterministic(self, app):
+        """Test the same --seed generates the same tasks."""
+        runner = app.test_cli_runner()
+        args = ["seed", "--users", "5", "--tasks", "50"]
+
+        runner.invoke(args=args)
+        first = db.session.execute(
+            select(TaskModel.title, TaskModel.status, TaskModel.created_at).order_by(TaskModel.id)
+        ).all()
+        db.session.query(TaskModel).delete()
+        db.session.query(TagUsageModel).delete()
+        db.session.query(UserModel).delete()
+        db.session.commit()
+
+        runner.invoke(args=args)
+        second = db.session.execute(
+            select(TaskModel.title, TaskModel.status, TaskModel.created_at).order_by(TaskModel.id)
+        ).all()
+
+        assert first == second
+
+    def test_seed_tasks_needs_users(self, app):
+        """Test flask seed refuses tasks without users to own them."""
+        result = app.test_cli_runner().invoke(args=["seed", "--tasks", "10"])
+
+        assert result.exit_code != 0
+        assert db.session.query(TaskModel).count() == 0
@@ -0,0 +1,59 @@
+import pytest
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_model import TaskModel
+
+
+class TestTagsCommand:
+    """Test the flask tags CLI."""
+
+    def test_merge(self, app, sample_task):
+        """Test flask tags merge with progress output."""
+        with app.app_context():
+            target = TagModel(name="Target")
+            db.session.add(target)
+            db.session.commit()
+            target_id = target.id
+            source_name = db.session.get(TagModel, sample_task.tag_id).name
+
+        result = app.test_cli_runner().invoke(
+            args=["tags", "merge", source_name, "Target", "--batch-size", "10"]
+        )
+
+        assert result.exit_code == 0
+        assert "1/1 tasks" in result.output
+        with app.app_context():
+            assert db.session.get(TaskModel, sample_task.id).tag_id == target_id
+
+    def test_rename(self, app, sample_tag):
+        """Test flask tags rename."""
+        result = app.test_cli_runner().invoke(args=["tags", "rename", "Work", "Job"])
+
+        assert result.exit_code == 0
+        with app.app_context():
+            assert db.session.get(TagModel, sample_tag.id).name == "Job"
+
+    def test_delete_in_use(self, app, sample_task):
+        """Test flask tags delete refuses a tag that still has tasks."""
+        result = app.test_cli_runner().invoke(args=["tags", "delete", "Work"])
+
+        assert result.exit_code != 0
+        assert "Tag is still used by tasks" in result.output
+
+    def test_recount(self, app, sample_task):
+        """Test flask tags recount rebuilds the usage counts from the tasks."""
+        result = app.test_cli_runner().invoke(args=["tags", "recount"])
+
+        assert result.exit_code == 0
+        assert "Recounted 1 tag usage rows" in result.output
+        with app.app_context():
+            usage = db.session.get(TagUsageModel, (sample_task.user_id, sample_task.tag_id))
+            assert usage.uses == 1
+
+    def test_unknown_tag(self, app):
+        """Test flask tags with a tag name that doesn't exist."""
+        result = app.test_cli_runner().invoke(args=["tags", "rename", "Nope", "Job"])
+
+        assert result.exit_code != 0
+        assert "Tag not found: Nope" in result.output
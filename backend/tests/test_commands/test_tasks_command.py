@@ -0,0 +1,36 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from flaskr.db import db
+from flaskr.models.job_model import JobModel
+from flaskr.models.task_archive_model import TaskArchiveModel
+from flaskr.models.task_model import TaskModel, TaskStatus
+
+
+class TestTasksCommand:
+    """Test the flask tasks CLI."""
+
+    def test_archive(self, app, sample_task):
+        """Test flask tasks archive moves old completed tasks."""
+        with app.app_context():
+            task = db.session.get(TaskModel, sample_task.id)
+            task.status = TaskStatus.COMPLETED
+            task.created_at = datetime.now(timezone.utc) - timedelta(days=400)
+            db.session.commit()
+
+        result = app.test_cli_runner().invoke(
+            args=["tasks", "archive", "--older-than-days", "365"]
+        )
+
+        assert result.exit_code == 0
+        assert "Archived 1 tasks" in result.output
+        with app.app_context():
+            assert db.session.get(TaskModel, sample_task.id) is None
+            assert db.session.query(TaskArchiveModel).count() == 1
+
+    def test_archive_enqueue(self, app):
+        """Test flask tasks archive --enqueue queues a job for the worker."""
+        result = app.test_cli_runner().invoke(args=["tasks", "archive", "--enqueue"])
+
+        assert result.exit_code == 0
+        with app.app_context():
+            assert db.session.query(JobModel).one().name == "archive_tasks"
@@ -0,0 +1,45 @@
+import os
+import signal
+import threading
+from flaskr.db import db
+from flaskr.jobs import HANDLERS, enqueue
+from flaskr.models.job_model import JobModel, JobStatus
+
+
+class TestWorkerCommand:
+    """Test flask worker shuts down on signals."""
+
+    def test_stops_on_sigterm(self, file_app):
+        """Test SIGTERM lets the running job finish before the worker exits."""
+        started, finished = threading.Event(), []
+
+        def slow_job():
+            started.set()
+            # Still running when the signal arrives
+            threading.Event().wait(0.2)
+            finished.append(True)
+
+        HANDLERS["slow_job"] = slow_job
+        job_id = enqueue("slow_job", {}).id
+        db.session.commit()
+
+        def terminate():
+            started.wait(5)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        threading.Thread(target=terminate).start()
+        handler = signal.getsignal(signal.SIGTERM)
+
+        try:
+            result = file_app.test_cli_runner().invoke(
+                args=["worker", "--concurrency", "1", "--poll-interval", "0.05"]
+            )
+        finally:
+            HANDLERS.pop("slow_job")
+
+        assert result.exit_code == 0
+        assert "Stopping job worker" in result.output
+        assert finished == [True]
+        db.session.expire_all()
+        assert db.session.get(JobModel, job_id).status == JobStatus.SUCCEEDED
+        assert signal.getsignal(signal.SIGTERM) is handler
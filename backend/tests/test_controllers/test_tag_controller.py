@@ -2,8 +2,12 @@ import pytest
 from flask_smorest import abort
 from flaskr.controllers.tag_controller import TagController
 from flaskr.models.tag_model import TagModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_model import TaskModel
 from flaskr.db import db
 from unittest.mock import patch
+from sqlalchemy import func, select, text
+from werkzeug.exceptions import HTTPException
 
 
 class TestTagController:
@@ -27,17 +31,71 @@ class TestTagController:
             assert isinstance(result, list)
 
     def test_get_all_tags_limit(self, app):
-        """Test that get_all limits to 15 tags."""
+        """Test that get_all returns one page of tags."""
         with app.app_context():
-            # Create more than 15 tags
+            # Create more than one page of tags
             for i in range(20):
                 tag = TagModel(name=f"Tag{i}")
                 db.session.add(tag)
             db.session.commit()
-            
-            result = TagController.get_all()
-            
-            assert len(result) <= 15
+
+            assert len(TagController.get_all()) == 20
+            assert len(TagController.get_all(limit=15)) == 15
+
+    def test_get_all_tags_prefix_case_insensitive(self, app):
+        """Test typeahead matching ignores case."""
+        with app.app_context():
+            for name in ["Work", "workout", "Worship", "Study", "WORM"]:
+                db.session.add(TagModel(name=name))
+            db.session.commit()
+
+            result = TagController.get_all(prefix="wor")
+
+            assert [tag.name for tag in result] == ["Work", "workout", "WORM", "Worship"]
+
+    def test_get_all_tags_cursor(self, app):
+        """Test walking every tag page by page with the cursor."""
+        with app.app_context():
+            names = [f"Tag{i:03}" for i in range(25)] + ["tag007"]
+            for name in names:
+                db.session.add(TagModel(name=name))
+            db.session.commit()
+
+            seen, cursor = [], None
+            while True:
+                page = TagController.get_all(limit=10, cursor=cursor)
+                seen += [tag.name for tag in page]
+                cursor = TagController.next_cursor([tag.name for tag in page], 10)
+                if cursor is None:
+                    break
+
+            assert len(seen) == len(names)
+            assert set(seen) == set(names)
+
+    def test_get_all_tags_invalid_cursor(self, app):
+        """Test that a malformed cursor is rejected."""
+        with app.app_context():
+            with pytest.raises(HTTPException) as exc_info:
+                TagController.get_all(cursor="%%%")
+
+            assert exc_info.value.code == 400
+
+    def test_get_all_tags_uses_name_index(self, app):
+        """Test that typeahead pages are index range scans."""
+        with app.app_context():
+            query = (
+                select(TagModel)
+                .where(func.lower(TagModel.name) >= "wo", func.lower(TagModel.name) < "wp")
+                .order_by(func.lower(TagModel.name), TagModel.name)
+                .limit(10)
+            )
+            compiled = query.compile(db.engine, compile_kwargs={"literal_binds": True})
+            plan = " ".join(
+                row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+            )
+
+            assert "ix_tags_name_lower" in plan
+            assert "TEMP B-TREE" not in plan
 
     def test_create_tag_success(self, app):
         """Test creating a tag successfully."""
@@ -92,3 +150,118 @@ class TestTagController:
                 
                 assert exc_info.value.status_code == 500
                 assert "Internal server error" in str(exc_info.value)
+
+    def test_count_usage(self, app, sample_user, multiple_tags):
+        """Test usage counts with and without ON CONFLICT support."""
+        with app.app_context():
+            tag_id = multiple_tags[0].id
+
+            TagController.count_usage(sample_user.id, tag_id, 1)
+            with patch.dict('flaskr.db.ON_CONFLICT_INSERTS', clear=True):
+                TagController.count_usage(sample_user.id, tag_id, 1)
+                TagController.count_usage(sample_user.id, multiple_tags[1].id, 1)
+            TagController.count_usage(sample_user.id, tag_id, 1)
+            TagController.count_usage(sample_user.id, tag_id, -1)
+            db.session.commit()
+
+            uses = {
+                usage.tag_id: usage.uses
+                for usage in db.session.query(TagUsageModel).filter_by(user_id=sample_user.id)
+            }
+            assert uses == {tag_id: 2, multiple_tags[1].id: 1}
+
+    def test_get_top_on_user_uses_index_order(self, app):
+        """Test that the top-k read is ordered by the usage index."""
+        with app.app_context():
+            query = (
+                select(TagUsageModel.tag_id, TagUsageModel.uses)
+                .where(TagUsageModel.user_id == 1, TagUsageModel.uses > 0)
+                .order_by(TagUsageModel.uses.desc(), TagUsageModel.tag_id.desc())
+                .limit(5)
+            )
+            compiled = query.compile(db.engine, compile_kwargs={"literal_binds": True})
+            plan = " ".join(
+                row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+            )
+
+            assert "ix_tag_usage_user_id_uses" in plan
+            assert "TEMP B-TREE" not in plan
+
+    def add_tasks(self, user_id, tag_ids):
+        for tag_id in tag_ids:
+            db.session.add(TaskModel(title="Task", content="Content", user_id=user_id, tag_id=tag_id))
+            TagController.count_usage(user_id, tag_id, 1)
+        db.session.commit()
+
+    def test_merge_tags(self, app, multiple_users, multiple_tags):
+        """Test merging moves tasks and usage counts to the target tag."""
+        with app.app_context():
+            work, personal, shopping = (tag.id for tag in multiple_tags)
+            first, second, _ = (user.id for user in multiple_users)
+            self.add_tasks(first, [work, work, personal])
+            self.add_tasks(second, [work, shopping])
+
+            TagController.merge(work, personal)
+
+            assert db.session.get(TagModel, work) is None
+            assert db.session.query(TaskModel).filter_by(tag_id=work).count() == 0
+            assert db.session.query(TaskModel).filter_by(tag_id=personal).count() == 4
+            uses = {
+                (usage.user_id, usage.tag_id): usage.uses
+                for usage in db.session.query(TagUsageModel)
+            }
+            assert uses == {(first, personal): 3, (second, personal): 1, (second, shopping): 1}
+
+    def test_merge_tags_in_batches(self, app, sample_user, multiple_tags):
+        """Test batched merges report progress."""
+        with app.app_context():
+            work, personal, _ = (tag.id for tag in multiple_tags)
+            self.add_tasks(sample_user.id, [work] * 7 + [personal])
+            reports = []
+
+            TagController.merge(work, personal, batch_size=3, progress=lambda *r: reports.append(r))
+
+            assert reports[-1] == (7, 7)
+            assert len(reports) >= 3
+            assert db.session.query(TaskModel).filter_by(tag_id=personal).count() == 8
+
+    def test_merge_tag_into_itself(self, app, sample_tag):
+        """Test that merging a tag into itself is rejected."""
+        with app.app_context():
+            with pytest.raises(HTTPException) as exc_info:
+                TagController.merge(sample_tag.id, sample_tag.id)
+
+            assert exc_info.value.code == 400
+
+    def test_merge_missing_tag(self, app, sample_tag):
+        """Test merging into a tag that doesn't exist."""
+        with app.app_context():
+            with pytest.raises(HTTPException) as exc_info:
+                TagController.merge(sample_tag.id, 99999)
+
+            assert exc_info.value.code == 404
+            assert db.session.get(TagModel, sample_tag.id) is not None
+
+    def test_delete_tag_in_use(self, app, sample_task):
+        """Test that a tag with tasks is only deleted with reassignment."""
+        with app.app_context():
+            with pytest.raises(HTTPException) as exc_info:
+                TagController.delete(sample_task.tag_id)
+
+            assert exc_info.value.code == 409
+
+            other = TagModel(name="Other")
+            db.session.add(other)
+            db.session.commit()
+
+            TagController.delete(sample_task.tag_id, reassign_to=other.id)
+
+            assert db.session.get(TaskModel, sample_task.id).tag_id == other.id
+
+    def test_rename_tag_duplicate(self, app, multiple_tags):
+        """Test renaming a tag to a name that is taken."""
+        with app.app_context():
+            with pytest.raises(HTTPException) as exc_info:
+                TagController.rename({"name": "Personal"}, multiple_tags[0].id)
+
+            assert exc_info.value.code == 409
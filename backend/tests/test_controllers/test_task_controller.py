@@ -1,6 +1,8 @@
 import pytest
 from flask_smorest import abort
-from flaskr.controllers.task_controller import TaskController
+from datetime import datetime, timedelta, timezone
+from flaskr.controllers.task_controller import ACTIVE_TASKS_OF_USER, TaskController
+from flaskr.models.task_archive_model import TaskArchiveModel
 from flaskr.models.task_model import TaskModel, TaskStatus
 from flaskr.models.user_model import UserModel
 from flaskr.models.tag_model import TagModel
@@ -38,7 +40,42 @@ class TestTaskController:
             assert len(result) == 2
             assert all(hasattr(task, 'id') for task in result)
             assert all(hasattr(task, 'title') for task in result)
-            assert all(hasattr(task, 'tag_name') for task in result)
+            assert all(hasattr(task, 'tag_id') for task in result)
+
+    def test_get_active_tasks_on_user(self, app, sample_user, sample_tag):
+        """Test active=True leaves out completed tasks, oldest first."""
+        with app.app_context():
+            for title, status, created_at in [
+                ("Newer", TaskStatus.IN_PROGRESS, datetime(2024, 2, 1)),
+                ("Done", TaskStatus.COMPLETED, datetime(2024, 1, 1)),
+                ("Older", TaskStatus.PENDING, datetime(2024, 1, 15)),
+            ]:
+                db.session.add(TaskModel(
+                    title=title,
+                    content="Content",
+                    status=status,
+                    created_at=created_at,
+                    user_id=sample_user.id,
+                    tag_id=sample_tag.id
+                ))
+            db.session.commit()
+
+            with patch('flaskr.controllers.task_controller.get_jwt_identity', return_value=str(sample_user.id)):
+                result = TaskController.get_all_on_user(active=True)
+
+            assert [task.title for task in result] == ["Older", "Newer"]
+
+    def test_active_tasks_use_partial_index(self, app):
+        """Test the active task query is answered from the partial index."""
+        with app.app_context():
+            sql = str(ACTIVE_TASKS_OF_USER.compile(db.engine))
+            plan = db.session.connection().exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + sql, (1,)
+            ).all()
+
+            details = " ".join(row[-1] for row in plan)
+            assert "USING INDEX ix_tasks_active_user_id (user_id=?)" in details
+            assert "TEMP B-TREE" not in details
 
     def test_get_all_tasks_on_user_empty(self, app, sample_user):
         """Test getting all tasks when user has no tasks."""
@@ -182,3 +219,41 @@ class TestTaskController:
                     
                     assert exc_info.value.status_code == 500
                     assert "Internal server error" in str(exc_info.value)
+
+    def test_archive_completed_tasks(self, app, sample_user, sample_tag):
+        """Test archive moves only old COMPLETED tasks, in batches."""
+        with app.app_context():
+            old = datetime.now(timezone.utc) - timedelta(days=60)
+            for i, (status, created_at) in enumerate([
+                (TaskStatus.COMPLETED, old),
+                (TaskStatus.COMPLETED, old),
+                (TaskStatus.COMPLETED, old),
+                (TaskStatus.PENDING, old),
+                (TaskStatus.COMPLETED, datetime.now(timezone.utc)),
+            ]):
+                db.session.add(TaskModel(
+                    title=f"Task {i}",
+                    content="Content",
+                    status=status,
+                    created_at=created_at,
+                    user_id=sample_user.id,
+                    tag_id=sample_tag.id
+                ))
+            db.session.commit()
+            batches = []
+
+            archived = TaskController.archive(30, batch_size=2, progress=batches.append)
+
+            assert archived == 3
+            assert batches == [2, 3]
+            assert db.session.query(TaskModel).count() == 2
+            archive = db.session.query(TaskArchiveModel).all()
+            assert sorted(task.title for task in archive) == ["Task 0", "Task 1", "Task 2"]
+            assert all(task.archived_at is not None for task in archive)
+
+            with patch('flaskr.controllers.task_controller.get_jwt_identity', return_value=str(sample_user.id)):
+                assert len(TaskController.get_all_on_user()) == 2
+                everything = TaskController.get_all_on_user(include_archived=True)
+
+            assert len(everything) == 5
+            assert sum(task.archived for task in everything) == 3
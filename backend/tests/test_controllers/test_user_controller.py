@@ -5,6 +5,7 @@ from flaskr.models.user_model import UserModel
 from flaskr.utils import generate_password
 from flaskr.db import db
 from unittest.mock import patch
+from werkzeug.exceptions import HTTPException
 
 
 class TestUserController:
@@ -95,6 +96,22 @@ class TestUserController:
             assert exc_info.value.status_code == 409
             assert "Email already registered" in str(exc_info.value)
 
+    def test_create_user_duplicate_without_on_conflict(self, app, sample_user):
+        """Test that a plain INSERT maps the unique index violation to 409."""
+        with app.app_context():
+            data = {
+                "username": sample_user.username,
+                "email": "other@example.com",
+                "password": "password123"
+            }
+
+            with patch.dict('flaskr.db.ON_CONFLICT_INSERTS', clear=True):
+                with pytest.raises(HTTPException) as exc_info:
+                    UserController.create(data)
+
+            assert exc_info.value.code == 409
+            assert exc_info.value.data["message"] == "Username already registered"
+
     def test_create_user_database_error(self, app):
         """Test creating user with database error."""
         with app.app_context():
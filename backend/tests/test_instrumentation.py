@@ -0,0 +1,77 @@
+import logging
+from flask import Response
+from flask_jwt_extended import create_access_token
+from flaskr.db import db
+from flaskr.instrumentation import report_request_stats, start_request_stats
+from flaskr.models.task_model import TaskModel, TaskStatus
+from flaskr.models.user_model import UserModel
+
+
+def add_tasks(user_id, tag_id, count):
+    db.session.add_all(
+        TaskModel(
+            title=f"Task {i}",
+            content="Content",
+            status=TaskStatus.PENDING,
+            user_id=user_id,
+            tag_id=tag_id
+        )
+        for i in range(count)
+    )
+    db.session.commit()
+
+
+class TestInstrumentation:
+    """Test per-request SQL timings and query counting."""
+
+    def test_server_timing_header(self, client, app, sample_task):
+        """Test responses report database and serialization time."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_task.user_id))
+            response = client.get(
+                "/api/v1/tasks/user", headers={"Authorization": f"Bearer {token}"}
+            )
+
+        timing = response.headers["Server-Timing"]
+        assert response.status_code == 200
+        assert 'db;dur=' in timing
+        assert 'desc="2 queries"' in timing
+        assert "serialize;dur=" in timing
+
+    def test_server_timing_disabled(self, client, app):
+        """Test SERVER_TIMING = False leaves the header out."""
+        app.config["SERVER_TIMING"] = False
+
+        response = client.get("/api/v1/tags")
+
+        assert "Server-Timing" not in response.headers
+
+    def test_task_list_query_count(self, client, app, sample_user, sample_tag, max_queries):
+        """Test listing tasks does not run a query per task."""
+        with app.app_context():
+            add_tasks(sample_user.id, sample_tag.id, 20)
+            token = create_access_token(identity=str(sample_user.id))
+
+            # The task list plus loading the tag catalogue once
+            with max_queries(2):
+                response = client.get(
+                    "/api/v1/tasks/user", headers={"Authorization": f"Bearer {token}"}
+                )
+
+        assert len(response.json) == 20
+
+    def test_repeated_statement_warning(self, app, sample_user, caplog):
+        """Test a request running one statement too often logs a warning."""
+        app.config["SQL_REPEATED_STATEMENT_THRESHOLD"] = 2
+
+        with app.test_request_context("/api/v1/users", method="GET"):
+            start_request_stats()
+            for _ in range(3):
+                db.session.get(UserModel, sample_user.id)
+                db.session.expunge_all()
+
+            with caplog.at_level(logging.WARNING):
+                response = report_request_stats(Response())
+
+        assert "GET /api/v1/users ran the same statement 3 times, possible N+1" in caplog.text
+        assert 'desc="3 queries"' in response.headers["Server-Timing"]
@@ -0,0 +1,162 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from flaskr.db import db
+from flaskr.jobs import HANDLERS, Worker, backoff, claim_next, enqueue, job, run_next
+from flaskr.models.job_model import JobModel, JobStatus
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+
+
+@pytest.fixture
+def recorded():
+    """Register a test job handler that records its calls."""
+    calls = []
+
+    @job("record")
+    def record(value, fail=0):
+        calls.append(value)
+        if len(calls) <= fail:
+            raise RuntimeError("boom")
+
+    yield calls
+    HANDLERS.pop("record")
+
+
+class TestJobs:
+    """Test the background job queue."""
+
+    def test_enqueue_unknown_job(self, app):
+        """Test that enqueueing an unregistered job fails fast."""
+        with app.app_context():
+            with pytest.raises(KeyError):
+                enqueue("missing", {})
+
+    def test_run_next_idle(self, app):
+        """Test that run_next reports when there is nothing to run."""
+        with app.app_context():
+            assert run_next() is False
+
+    def test_run_next_success(self, app, recorded):
+        """Test running a job to completion."""
+        with app.app_context():
+            queued = enqueue("record", {"value": 1}, user_id=7)
+            db.session.commit()
+
+            assert run_next() is True
+
+            finished = db.session.get(JobModel, queued.id)
+            assert recorded == [1]
+            assert finished.status == JobStatus.SUCCEEDED
+            assert finished.attempts == 1
+            assert finished.finished_at is not None
+
+    def test_run_next_retries_with_backoff(self, app, recorded):
+        """Test that a failing job is rescheduled with backoff."""
+        with app.app_context():
+            queued = enqueue("record", {"value": 1, "fail": 1})
+            db.session.commit()
+            before = datetime.now(timezone.utc).replace(tzinfo=None)
+
+            run_next()
+
+            retried = db.session.get(JobModel, queued.id)
+            assert retried.status == JobStatus.PENDING
+            assert "boom" in retried.last_error
+            assert retried.run_at >= before + backoff(1)
+
+            # Not due yet
+            assert run_next() is False
+
+            retried.run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            db.session.commit()
+            run_next()
+
+            assert db.session.get(JobModel, queued.id).status == JobStatus.SUCCEEDED
+            assert recorded == [1, 1]
+
+    def test_run_next_gives_up(self, app, recorded):
+        """Test that a job fails for good after max attempts."""
+        app.config["JOBS_MAX_ATTEMPTS"] = 1
+
+        with app.app_context():
+            queued = enqueue("record", {"value": 1, "fail": 5})
+            db.session.commit()
+
+            run_next()
+
+            failed = db.session.get(JobModel, queued.id)
+            assert failed.status == JobStatus.FAILED
+            assert failed.finished_at is not None
+
+    def test_backoff_is_capped(self, app):
+        """Test exponential backoff growth and cap."""
+        with app.app_context():
+            assert backoff(1) == timedelta(seconds=2)
+            assert backoff(3) == timedelta(seconds=8)
+            assert backoff(30) == timedelta(seconds=300)
+
+    def test_claim_expired_lease(self, app, recorded):
+        """Test that a job abandoned by a dead worker is claimed again."""
+        with app.app_context():
+            queued = enqueue("record", {"value": 1})
+            db.session.commit()
+
+            assert claim_next().id == queued.id
+            assert claim_next() is None
+
+            abandoned = db.session.get(JobModel, queued.id)
+            abandoned.run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            db.session.commit()
+
+            reclaimed = claim_next()
+            assert reclaimed.id == queued.id
+            assert reclaimed.attempts == 2
+
+    def test_expired_lease_gives_up(self, app, recorded):
+        """Test that a job whose worker died on its last attempt fails for good."""
+        app.config["JOBS_MAX_ATTEMPTS"] = 2
+
+        with app.app_context():
+            queued = enqueue("record", {"value": 1})
+            db.session.commit()
+
+            for _ in range(2):
+                assert claim_next().id == queued.id
+
+                abandoned = db.session.get(JobModel, queued.id)
+                abandoned.run_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+                db.session.commit()
+
+            assert claim_next() is None
+
+            failed = db.session.get(JobModel, queued.id)
+            assert failed.status == JobStatus.FAILED
+            assert failed.attempts == 2
+            assert "Lease expired" in failed.last_error
+            assert failed.finished_at is not None
+
+    def test_worker_runs_delete_user(self, file_app):
+        """Test that the worker pool deletes a user in the background."""
+        with file_app.app_context():
+            user = UserModel(username="worker", email="worker@example.com", password="x")
+            tag = TagModel(name="Work")
+            db.session.add(TaskModel(title="Task", content="Content", user=user, tag=tag))
+            db.session.commit()
+
+            enqueue("delete_user", {"user_id": user.id})
+            db.session.commit()
+
+            worker = Worker(file_app, concurrency=2, poll_interval=0.05)
+            worker.start()
+            try:
+                for _ in range(100):
+                    db.session.expire_all()
+                    if db.session.query(JobModel).one().status == JobStatus.SUCCEEDED:
+                        break
+                    worker.stopping.wait(0.05)
+            finally:
+                worker.stop()
+
+            assert db.session.query(UserModel).count() == 0
+            assert db.session.query(TaskModel).count() == 0
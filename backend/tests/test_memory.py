@@ -0,0 +1,83 @@
+import tracemalloc
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.models.task_model import TaskModel
+
+
+@pytest.fixture
+def tracing_app():
+    """Create an app with per-endpoint memory tracing."""
+
+    class TracingConfig(TestConfig):
+        TRACEMALLOC = True
+        TRACEMALLOC_SNAPSHOT_EVERY = 2
+        ADMIN_USER_IDS = [1]
+
+    app = create_app(TracingConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+        tracemalloc.stop()
+
+
+def add_tasks(user_id, tag_id, count):
+    db.session.execute(
+        insert(TaskModel),
+        [
+            {"title": f"Task {i}", "content": "x" * 100, "user_id": user_id, "tag_id": tag_id}
+            for i in range(count)
+        ],
+    )
+    db.session.commit()
+
+
+class TestMemory:
+    """Test allocation tracing per endpoint and memory budgets."""
+
+    def test_memory_stats(self, tracing_app):
+        """Test GET /api/v1/stats/memory groups allocations by endpoint."""
+        client = tracing_app.test_client()
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+        for _ in range(3):
+            client.get("/api/v1/tasks/user", headers=headers)
+        response = client.get("/api/v1/stats/memory", headers=headers)
+
+        assert response.status_code == 200
+        tasks = next(stats for stats in response.json if stats["endpoint"] == "tasks.TasksOnUser")
+        assert tasks["requests"] == 3
+        assert tasks["peakBytesMax"] >= tasks["peakBytesMean"] > 0
+        assert tasks["topLines"]
+        assert all(":" in line["line"] for line in tasks["topLines"])
+
+    def test_memory_stats_disabled(self, client, app, sample_user):
+        """Test GET /api/v1/stats/memory answers 404 unless TRACEMALLOC is on."""
+        app.config["ADMIN_USER_IDS"] = [sample_user.id]
+
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            response = client.get(
+                "/api/v1/stats/memory", headers={"Authorization": f"Bearer {token}"}
+            )
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("count", [100, 1000])
+    def test_task_list_memory_budget(self, client, app, sample_user, sample_tag, memory_budget, count):
+        """Test listing tasks allocates at most about 4 KiB per task."""
+        with app.app_context():
+            add_tasks(sample_user.id, sample_tag.id, count)
+            headers = {"Authorization": f"Bearer {create_access_token(identity=str(sample_user.id))}"}
+            # Warm up the statement cache and the tag catalogue
+            client.get("/api/v1/tasks/user", headers=headers)
+
+            with memory_budget(64 * 1024 + count * 4 * 1024):
+                response = client.get("/api/v1/tasks/user", headers=headers)
+
+        assert len(response.json) == count
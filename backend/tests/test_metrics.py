@@ -0,0 +1,186 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.metrics import LIVE_FILES, is_alive, process_start
+
+
+def sample(text, line_start):
+    """Value of the first exposition line starting with ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+
+    raise AssertionError(f"{line_start} not found in:\n{text}")
+
+
+@pytest.fixture
+def multiprocess_app(tmp_path):
+    """Create an app sharing its metrics through files in a directory."""
+
+    class MultiprocessConfig(TestConfig):
+        METRICS_DIR = str(tmp_path / "metrics")
+
+    app = create_app(MultiprocessConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        app.extensions["metrics"].files.close()
+
+
+def snapshot_file(app, pid, requests, in_flight, started=None):
+    """Write a snapshot as another worker process would."""
+    snapshot = {
+        "pid": pid,
+        "started": started,
+        "metrics": {
+            "http_request_duration_seconds": [
+                [["tags.Tags", "GET", "200"], [requests] + [0] * 11 + [0.5 * requests]]
+            ],
+            "http_requests_in_flight": [[[], [in_flight]]],
+            "db_pool_checkout_seconds": [],
+        },
+        "process": {"gc": [{"collections": 1, "collected": 2}], "gc_pending": [0], "rss_bytes": 1024},
+    }
+    with open(os.path.join(app.config["METRICS_DIR"], f"{pid}-{started}.json"), "w") as file:
+        json.dump(snapshot, file)
+
+
+class TestMetrics:
+    """Test the Prometheus /metrics endpoint."""
+
+    def test_request_histogram(self, client):
+        """Test requests are counted per endpoint, method and status."""
+        client.get("/api/v1/tags")
+        client.get("/api/v1/tags")
+        client.get("/does-not-exist")
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        labels = 'endpoint="tags.Tags",method="GET",status="200"'
+        assert sample(text, f"http_request_duration_seconds_count{{{labels}}}") == 2
+        assert sample(text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+        assert sample(text, 'http_request_duration_seconds_count{endpoint="unmatched"') == 1
+        # The scrape itself is the only request in flight
+        assert sample(text, "http_requests_in_flight") == 1
+        assert sample(text, 'db_pool_checkout_seconds_count{bind="primary"}') >= 1
+        assert sample(text, "process_resident_memory_bytes") > 0
+        assert 'python_gc_collections_total{pid="' in text
+
+    def test_disabled(self):
+        """Test METRICS = False registers no endpoint."""
+
+        class NoMetricsConfig(TestConfig):
+            METRICS = False
+
+        assert create_app(NoMetricsConfig).test_client().get("/metrics").status_code == 404
+
+    def test_multiprocess_aggregation(self, multiprocess_app):
+        """Test a scrape adds up the snapshots of the other workers."""
+        client = multiprocess_app.test_client()
+        client.get("/api/v1/tags")
+
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        snapshot_file(
+            multiprocess_app, os.getppid(), requests=3, in_flight=2,
+            started=process_start(os.getppid()),
+        )
+        snapshot_file(multiprocess_app, exited.pid, requests=4, in_flight=5)
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        labels = 'endpoint="tags.Tags",method="GET",status="200"'
+        assert sample(text, f"http_request_duration_seconds_count{{{labels}}}") == 8
+        assert sample(text, f"http_request_duration_seconds_sum{{{labels}}}") >= 3.5
+        # Gauges of the exited worker are left out
+        assert sample(text, "http_requests_in_flight") == 3
+        assert f'process_resident_memory_bytes{{pid="{os.getppid()}"}} 1024' in text
+        assert f'pid="{exited.pid}"' not in text
+
+    def test_reused_pid(self, multiprocess_app):
+        """Test a snapshot whose pid now belongs to another process counts as exited."""
+        client = multiprocess_app.test_client()
+        started = process_start(os.getppid())
+        snapshot_file(multiprocess_app, os.getppid(), requests=3, in_flight=2, started=started - 1)
+        snapshot_file(multiprocess_app, os.getppid(), requests=4, in_flight=5, started=started)
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        labels = 'endpoint="tags.Tags",method="GET",status="200"'
+        # The counters of both owners of the pid add up
+        assert sample(text, f"http_request_duration_seconds_count{{{labels}}}") == 7
+        assert sample(text, "http_requests_in_flight") == 6
+
+    def test_is_alive_other_user(self, monkeypatch):
+        """Test a pid of another user's process is not taken for a worker."""
+
+        def kill(pid, signal):
+            raise PermissionError
+
+        monkeypatch.setattr(os, "kill", kill)
+
+        assert not is_alive(1)
+
+    def test_flush_writes_snapshot(self, multiprocess_app):
+        """Test each process snapshots its own totals into the directory."""
+        multiprocess_app.test_client().get("/api/v1/tags")
+        files = multiprocess_app.extensions["metrics"].files
+
+        files.flush()
+
+        name = f"{os.getpid()}-{process_start()}.json"
+        with open(os.path.join(multiprocess_app.config["METRICS_DIR"], name)) as file:
+            snapshot = json.load(file)
+        assert snapshot["pid"] == os.getpid()
+        assert snapshot["started"] == process_start()
+        assert snapshot["metrics"]["http_request_duration_seconds"][0][0] == ["tags.Tags", "GET", "200"]
+
+    def test_access_without_token(self, client):
+        """Test /metrics only answers localhost while METRICS_TOKEN is unset."""
+        remote = client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.9"})
+
+        assert remote.status_code == 403
+        assert client.get("/metrics").status_code == 200
+
+    def test_access_with_token(self):
+        """Test /metrics requires the bearer token once METRICS_TOKEN is set."""
+
+        class TokenConfig(TestConfig):
+            METRICS_TOKEN = "scrape-secret"
+
+        client = create_app(TokenConfig).test_client()
+
+        assert client.get("/metrics").status_code == 403
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+        response = client.get(
+            "/metrics",
+            headers={"Authorization": "Bearer scrape-secret"},
+            environ_base={"REMOTE_ADDR": "203.0.113.9"},
+        )
+        assert response.status_code == 200
+
+    def test_pool_timed_after_dispose(self, app, client):
+        """Test checkouts of the pool that dispose() recreates are still timed."""
+        db.engine.dispose()
+        client.get("/api/v1/tags")
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        assert type(db.engine.pool).__name__.startswith("Timed")
+        assert sample(text, 'db_pool_checkout_seconds_count{bind="primary"}') >= 1
+
+    def test_files_share_one_fork_hook(self, multiprocess_app):
+        """Test closed metrics files are dropped from the process-wide fork hook."""
+        files = multiprocess_app.extensions["metrics"].files
+        assert files in LIVE_FILES
+
+        files.close()
+
+        assert files not in LIVE_FILES
+        files.start()
@@ -0,0 +1,92 @@
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from config import TestConfig
+from flaskr import create_app
+
+
+class TestOpenApi:
+    """Test the OpenAPI spec is built by flask-smorest or served from a file."""
+
+    def test_spec_documents_every_api_route(self, app, client):
+        """Test the spec has a path for every API rule."""
+        response = client.get("/openapi.json")
+        paths = response.get_json()["paths"]
+        rules = {
+            re.sub(r"<(?:\w+:)?(\w+)>", r"{\1}", rule.rule)
+            for rule in app.url_map.iter_rules()
+            if rule.rule.startswith("/api/")
+        }
+
+        assert response.status_code == 200
+        assert rules == set(paths)
+        assert {tag["name"] for tag in response.get_json()["tags"]} >= {"auth", "tasks", "tags"}
+
+    def test_spec_served_from_file(self, tmp_path):
+        """Test OPENAPI_SPEC_FILE is served as is."""
+        spec_file = tmp_path / "openapi.json"
+        spec_file.write_text(json.dumps({"openapi": "3.0.2", "paths": {}}))
+
+        class SpecFileConfig(TestConfig):
+            OPENAPI_SPEC_FILE = str(spec_file)
+
+        app = create_app(SpecFileConfig)
+        response = app.test_client().get("/openapi.json")
+
+        assert response.status_code == 200
+        assert response.get_json() == {"openapi": "3.0.2", "paths": {}}
+
+    def test_written_spec_matches_built_spec(self, app, client, tmp_path):
+        """Test the file written by flask openapi write is the spec flask-smorest serves."""
+        output = tmp_path / "openapi.json"
+
+        result = app.test_cli_runner().invoke(args=["openapi", "write", str(output)])
+
+        class SpecFileConfig(TestConfig):
+            OPENAPI_SPEC_FILE = str(output)
+
+        served = create_app(SpecFileConfig).test_client().get("/openapi.json")
+
+        assert result.exit_code == 0
+        assert served.get_json() == client.get("/openapi.json").get_json()
+
+
+class TestLazyCommands:
+    """Test tooling is only imported when a command or extension needs it."""
+
+    def test_migrate_registered(self, app):
+        """Test every app has the migrate extension and the db group."""
+        assert "migrate" in app.extensions
+        assert "db" in app.cli.list_commands(None)
+
+    def test_db_command(self, app):
+        """Test flask db loads Flask-Migrate with its slowlog subcommand."""
+        result = app.test_cli_runner().invoke(args=["db", "--help"])
+
+        assert result.exit_code == 0
+        assert "upgrade" in result.output
+        assert "slowlog" in result.output
+        assert type(app.extensions["migrate"]).__module__ == "flask_migrate"
+
+    def test_commands_listed(self, app):
+        """Test lazy commands are listed by flask --help."""
+        assert {"worker", "tags", "tasks", "seed"} <= set(app.cli.list_commands(None))
+
+    def test_create_app_skips_tooling(self):
+        """Test create_app does not import Alembic, the commands or disabled extensions."""
+        code = (
+            "import sys\n"
+            "from config import TestConfig\n"
+            "from flaskr import create_app\n"
+            "create_app(TestConfig)\n"
+            "print(sorted(m for m in ('alembic', 'flaskr.commands.tags_command', 'flaskr.profiling') if m in sys.modules))\n"
+        )
+
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parents[1],
+        ).stdout
+
+        assert output.strip() == "[]"
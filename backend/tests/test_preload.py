@@ -0,0 +1,41 @@
+import gc
+from flaskr.db import db
+from flaskr.preload import prepare_fork, route_schemas, warm_up
+from flaskr.schemas.schema import MemoryStatsSchema
+
+
+class TestPreload:
+    """Test the app is warmed up and made safe to fork."""
+
+    def test_route_schemas(self, app):
+        """Test the schema instances of the views are found."""
+        schemas = list(route_schemas(app))
+
+        assert any(isinstance(schema, MemoryStatsSchema) for schema in schemas)
+
+    def test_warm_up(self, app):
+        """Test warming builds the nested schemas of the views."""
+        warm_up(app)
+
+        memory_schema = next(
+            schema for schema in route_schemas(app) if isinstance(schema, MemoryStatsSchema)
+        )
+        assert memory_schema.fields["top_lines"].inner._schema is not None
+
+    def test_prepare_fork(self, file_app, monkeypatch):
+        """Test engines are disposed, objects frozen, gc enabled and workers reset after fork."""
+        hooks = []
+        monkeypatch.setattr("os.register_at_fork", lambda after_in_child: hooks.append(after_in_child))
+        monkeypatch.setattr(gc, "freeze", lambda: hooks.append("frozen"))
+        monkeypatch.setattr(gc, "enable", lambda: hooks.append("enabled"))
+
+        parent_pool = db.engine.pool
+
+        prepare_fork(file_app)
+        after_fork_in_child, frozen, enabled = hooks
+        child_pool = db.engine.pool
+        after_fork_in_child()
+
+        assert frozen == "frozen"
+        assert enabled == "enabled"
+        assert parent_pool is not child_pool is not db.engine.pool
@@ -0,0 +1,129 @@
+import os
+import pstats
+import sys
+import pytest
+from flask_jwt_extended import create_access_token
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.models.user_model import UserModel
+from flaskr.utils import generate_password
+
+
+@pytest.fixture
+def profiling_app(tmp_path):
+    """Create an app with on-demand profiling enabled."""
+
+    class ProfilingConfig(TestConfig):
+        PROFILING = True
+        PROFILING_TOKEN = "profile-secret"
+        PROFILE_DIR = str(tmp_path / "profiles")
+        ADMIN_USER_IDS = [1]
+
+    app = create_app(ProfilingConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+def bearer(user_id):
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+class TestProfiling:
+    """Test requests are profiled only when an admin asks for it."""
+
+    def test_admin_request_profiled(self, profiling_app):
+        """Test ?profile=1 from an admin saves a profile named after the endpoint."""
+        client = profiling_app.test_client()
+
+        response = client.get("/api/v1/tasks/user?profile=1", headers=bearer(1))
+
+        name = response.headers["X-Profile-File"]
+        assert response.status_code == 200
+        assert "-GET-tasks.TasksOnUser-" in name
+        assert os.listdir(profiling_app.config["PROFILE_DIR"]) == [name]
+
+    def test_not_profiled_without_admin(self, profiling_app):
+        """Test the flag alone, or from another user, profiles nothing."""
+        client = profiling_app.test_client()
+
+        client.get("/api/v1/tasks/user", headers={"X-Profile": "1", **bearer(2)})
+        client.get("/api/v1/tags?profile=1")
+        client.get("/api/v1/tags?profile=1", headers={"X-Profile-Token": "wrong"})
+        client.get("/api/v1/tasks/user", headers=bearer(1))
+
+        assert os.listdir(profiling_app.config["PROFILE_DIR"]) == []
+
+    def test_profile_token(self, profiling_app):
+        """Test routes without a JWT can be profiled with the profiling token."""
+        client = profiling_app.test_client()
+
+        response = client.post(
+            "/api/v1/auth/sign-in",
+            json={"email": "nobody@example.com", "password": "secret123"},
+            headers={"X-Profile": "1", "X-Profile-Token": "profile-secret"},
+        )
+
+        assert "-POST-auth.SignIn-" in response.headers["X-Profile-File"]
+
+    def test_sign_in_profile_captures_hashing(self, profiling_app):
+        """Test a profiled sign-in records the password check it spends its time in."""
+        db.session.add(
+            UserModel(
+                username="profiled",
+                email="profiled@example.com",
+                password=generate_password("secret123"),
+            )
+        )
+        db.session.commit()
+        client = profiling_app.test_client()
+
+        response = client.post(
+            "/api/v1/auth/sign-in",
+            json={"email": "profiled@example.com", "password": "secret123"},
+            headers={"X-Profile": "1", "X-Profile-Token": "profile-secret"},
+        )
+
+        stats = pstats.Stats(
+            os.path.join(profiling_app.config["PROFILE_DIR"], response.headers["X-Profile-File"])
+        )
+        assert response.status_code == 200
+        assert any(function == "check_password_hash" for _, _, function in stats.stats)
+
+    def test_profiler_stopped_when_view_raises(self, profiling_app):
+        """Test a request that fails with an unhandled error stops its profiler."""
+
+        def fail():
+            raise RuntimeError("boom")
+
+        profiling_app.add_url_rule("/fail", "fail", fail)
+        client = profiling_app.test_client()
+
+        with pytest.raises(RuntimeError):
+            client.get("/fail", headers={"X-Profile": "1", "X-Profile-Token": "profile-secret"})
+
+        assert sys.getprofile() is None
+
+    def test_disabled_by_default(self, client, app):
+        """Test nothing is profiled unless PROFILING is on."""
+        response = client.get("/api/v1/tags?profile=1", headers={"X-Profile-Token": "x"})
+
+        assert "X-Profile-File" not in response.headers
+
+    def test_profiles_command(self, profiling_app):
+        """Test flask profiles list and show."""
+        client = profiling_app.test_client()
+        name = client.get("/api/v1/tasks/user?profile=1", headers=bearer(1)).headers["X-Profile-File"]
+        runner = profiling_app.test_cli_runner()
+
+        listed = runner.invoke(args=["profiles", "list", "--endpoint", "tasks.TasksOnUser"])
+        shown = runner.invoke(args=["profiles", "show", name, "--limit", "5"])
+
+        assert listed.exit_code == 0
+        assert name in listed.output
+        assert shown.exit_code == 0
+        assert "Ordered by: cumulative time" in shown.output
+        assert runner.invoke(args=["profiles", "show", "missing.prof"]).exit_code == 1
@@ -0,0 +1,107 @@
+import pytest
+import json
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db, sync_replica
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """Create an app with a primary and a replica SQLite file."""
+
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "primary.db")
+        SQLALCHEMY_BINDS = {"replica": "sqlite:///" + str(tmp_path / "replica.db")}
+
+    app = create_app(ReplicaConfig)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(UserModel(id=1, username="reader", email="reader@example.com", password="x"))
+        db.session.add(TagModel(id=1, name="Work"))
+        db.session.commit()
+        sync_replica()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+class TestReplica:
+    """Test read/write routing between primary and replica."""
+
+    def add_task_on_primary(self, title):
+        db.session.execute(
+            insert(TaskModel).values(title=title, content="Content", user_id=1, tag_id=1)
+        )
+        db.session.commit()
+
+    def titles(self, client, headers):
+        response = client.get("/api/v1/tasks/user", headers=headers)
+        assert response.status_code == 200
+        return {task["title"] for task in json.loads(response.data)}
+
+    def test_reads_go_to_replica(self, replica_app):
+        """Test GET requests read the replica until it is synced."""
+        client = replica_app.test_client()
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+        self.add_task_on_primary("Unsynced")
+
+        assert self.titles(client, headers) == set()
+
+        sync_replica()
+
+        assert self.titles(client, headers) == {"Unsynced"}
+
+    def test_read_your_writes(self, replica_app):
+        """Test a user is pinned to the primary right after writing."""
+        client = replica_app.test_client()
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+        response = client.post(
+            "/api/v1/tasks",
+            json={"title": "Mine", "content": "Content", "status": "PENDING", "tagId": 1},
+            headers=headers
+        )
+        assert response.status_code == 201
+
+        assert self.titles(client, headers) == {"Mine"}
+
+        # Other users still read the (stale) replica
+        other = {"Authorization": f"Bearer {create_access_token(identity='2')}"}
+        assert client.get("/api/v1/tasks/user", headers=other).status_code == 200
+
+        replica_app.config["REPLICA_PIN_SECONDS"] = 0
+        client.post(
+            "/api/v1/tasks",
+            json={"title": "Later", "content": "Content", "status": "PENDING", "tagId": 1},
+            headers=headers
+        )
+
+        assert self.titles(client, headers) == set()
+
+    def test_sync_command(self, replica_app):
+        """Test flask replica sync."""
+        self.add_task_on_primary("Synced by CLI")
+
+        result = replica_app.test_cli_runner().invoke(args=["replica", "sync"])
+
+        assert result.exit_code == 0
+        assert "Replica synced" in result.output
+
+    def test_tag_catalogue_reads_primary(self, replica_app):
+        """Test the shared tag catalogue is never built from the replica."""
+        client = replica_app.test_client()
+
+        db.session.add(TagModel(name="Fresh"))
+        db.session.commit()
+
+        names = {tag["name"] for tag in json.loads(client.get("/api/v1/tags").data)}
+
+        assert names == {"Work", "Fresh"}
@@ -0,0 +1,54 @@
+import pytest
+import json
+from flaskr.db import db
+from flaskr.models.job_model import JobModel
+
+
+class TestJobRoute:
+    """Test job routes."""
+
+    def test_get_jobs_on_user(self, client, app, auth_headers):
+        """Test GET /api/v1/jobs lists only the current user's jobs."""
+        with app.app_context():
+            db.session.add(JobModel(name="delete_user", payload={}, user_id=1, max_attempts=5))
+            db.session.add(JobModel(name="delete_user", payload={}, user_id=2, max_attempts=5))
+            db.session.commit()
+
+            response = client.get("/api/v1/jobs", headers=auth_headers)
+
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert len(data) == 1
+            assert data[0]["status"] == "PENDING"
+
+    def test_get_job_by_id(self, client, app, auth_headers):
+        """Test GET /api/v1/jobs/<id> endpoint."""
+        with app.app_context():
+            job = JobModel(name="delete_user", payload={}, user_id=1, max_attempts=5)
+            db.session.add(job)
+            db.session.commit()
+
+            response = client.get(f"/api/v1/jobs/{job.id}", headers=auth_headers)
+
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data["id"] == job.id
+            assert data["name"] == "delete_user"
+            assert data["attempts"] == 0
+
+    def test_get_job_of_other_user(self, client, app, auth_headers):
+        """Test GET /api/v1/jobs/<id> hides other users' jobs."""
+        with app.app_context():
+            job = JobModel(name="delete_user", payload={}, user_id=2, max_attempts=5)
+            db.session.add(job)
+            db.session.commit()
+
+            response = client.get(f"/api/v1/jobs/{job.id}", headers=auth_headers)
+
+            assert response.status_code == 404
+
+    def test_get_jobs_no_jwt(self, client):
+        """Test GET /api/v1/jobs without JWT token."""
+        response = client.get("/api/v1/jobs")
+
+        assert response.status_code == 401
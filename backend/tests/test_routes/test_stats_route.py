@@ -0,0 +1,36 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+class TestStatsRoute:
+    """Test stats routes."""
+
+    def test_statement_cache_stats(self, client, app, sample_user, auth_headers):
+        """Test GET /api/v1/stats/statement-cache reports cache hits for admins."""
+        app.config["ADMIN_USER_IDS"] = [sample_user.id]
+
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            # The same prebuilt statement, compiled once
+            client.get("/api/v1/tasks/user", headers=auth_headers)
+            client.get("/api/v1/tasks/user", headers=auth_headers)
+
+            response = client.get("/api/v1/stats/statement-cache", headers=headers)
+
+            assert response.status_code == 200
+            primary = response.json[0]
+            assert primary["bind"] == "primary"
+            assert primary["hits"] >= 1
+            assert 0 < primary["size"] <= primary["capacity"]
+
+    def test_statement_cache_stats_requires_admin(self, client, app, sample_user):
+        """Test GET /api/v1/stats/statement-cache is forbidden for regular users."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.get("/api/v1/stats/statement-cache", headers=headers)
+
+            assert response.status_code == 403
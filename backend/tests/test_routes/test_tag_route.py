@@ -2,6 +2,8 @@ import pytest
 import json
 from flaskr.models.tag_model import TagModel
 from flaskr.db import db
+from flask_jwt_extended import create_access_token
+from unittest.mock import patch
 
 
 class TestTagRoute:
@@ -75,3 +77,182 @@ class TestTagRoute:
         )
 
         assert response.status_code in [400, 422]
+
+    def test_get_all_tags_caching_headers(self, client, app, multiple_tags):
+        """Test GET /api/v1/tags sets ETag and Cache-Control."""
+        response = client.get("/api/v1/tags")
+
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        assert response.cache_control.public
+        assert response.cache_control.max_age == app.config["TAGS_CACHE_MAX_AGE"]
+
+    def test_get_all_tags_not_modified(self, client, app, multiple_tags):
+        """Test GET /api/v1/tags answers 304 on revalidation."""
+        etag = client.get("/api/v1/tags").headers["ETag"]
+
+        response = client.get("/api/v1/tags", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_get_all_tags_served_from_memory(self, client, app, multiple_tags):
+        """Test repeated GET /api/v1/tags does not query the database."""
+        first = client.get("/api/v1/tags")
+
+        with patch("flaskr.controllers.tag_controller.db.session.execute") as mock_execute:
+            second = client.get("/api/v1/tags")
+
+        mock_execute.assert_not_called()
+        assert second.data == first.data
+
+    def test_create_tag_refreshes_catalogue(self, client, app, multiple_tags):
+        """Test POST /api/v1/tags invalidates the cached tag list."""
+        etag = client.get("/api/v1/tags").headers["ETag"]
+
+        client.post("/api/v1/tags", json={"name": "Urgent"})
+        response = client.get("/api/v1/tags", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert "Urgent" in {tag["name"] for tag in json.loads(response.data)}
+
+    def test_get_tags_typeahead(self, client, app, multiple_tags):
+        """Test GET /api/v1/tags?prefix= matches names case-insensitively."""
+        response = client.get("/api/v1/tags?prefix=sHo")
+
+        assert response.status_code == 200
+        assert [tag["name"] for tag in json.loads(response.data)] == ["Shopping"]
+
+    def test_get_tags_next_cursor(self, client, app, multiple_tags):
+        """Test GET /api/v1/tags pages through tags with X-Next-Cursor."""
+        first = client.get("/api/v1/tags?limit=2")
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get(f"/api/v1/tags?limit=2&cursor={cursor}")
+
+        names = [tag["name"] for tag in json.loads(first.data) + json.loads(second.data)]
+        assert names == ["Personal", "Shopping", "Work"]
+        assert "X-Next-Cursor" not in second.headers
+
+    def test_get_tags_non_ascii(self, client, app):
+        """Test GET /api/v1/tags pages through non-ASCII names without skipping any."""
+        with app.app_context():
+            for name in ["Zed", "Éa", "éx", "Éb", "Éc", "ÉTÉ"]:
+                db.session.add(TagModel(name=name))
+            db.session.commit()
+
+        names = []
+        url = "/api/v1/tags?limit=2"
+        while url:
+            response = client.get(url)
+            names += [tag["name"] for tag in json.loads(response.data)]
+            cursor = response.headers.get("X-Next-Cursor")
+            url = f"/api/v1/tags?limit=2&cursor={cursor}" if cursor else None
+
+        # SQLite's lower() leaves non-ASCII letters as they are
+        assert names == ["Zed", "Éa", "Éb", "Éc", "ÉTÉ", "éx"]
+
+        prefixed = client.get("/api/v1/tags?prefix=É")
+        assert [tag["name"] for tag in json.loads(prefixed.data)] == ["Éa", "Éb", "Éc", "ÉTÉ"]
+
+    def test_get_tags_invalid_limit(self, client):
+        """Test GET /api/v1/tags rejects an out of range limit."""
+        response = client.get("/api/v1/tags?limit=1000")
+
+        assert response.status_code == 422
+
+    def test_get_top_tags(self, client, app, sample_user, multiple_tags):
+        """Test GET /api/v1/tags/top orders tags by the user's task count."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+            work, personal, shopping = multiple_tags
+
+            for tag in [personal, shopping, shopping, shopping, personal]:
+                client.post(
+                    "/api/v1/tasks",
+                    json={"title": "Task", "content": "Content", "status": "PENDING", "tagId": tag.id},
+                    headers=headers
+                )
+            task_ids = [task["id"] for task in client.get("/api/v1/tasks/user", headers=headers).json]
+            client.delete(f"/api/v1/tasks/{task_ids[1]}", headers=headers)
+
+            response = client.get("/api/v1/tags/top?k=2", headers=headers)
+
+            assert response.status_code == 200
+            # Ties go to the most recently created tag
+            assert json.loads(response.data) == [
+                {"id": shopping.id, "name": "Shopping", "uses": 2},
+                {"id": personal.id, "name": "Personal", "uses": 2},
+            ]
+
+    def test_get_top_tags_no_jwt(self, client):
+        """Test GET /api/v1/tags/top without JWT token."""
+        response = client.get("/api/v1/tags/top")
+
+        assert response.status_code == 401
+
+    def test_rename_tag_as_admin(self, client, app, sample_user, sample_tag):
+        """Test PATCH /api/v1/tags/<id> renames the tag for admins."""
+        app.config["ADMIN_USER_IDS"] = [sample_user.id]
+
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.patch(
+                f"/api/v1/tags/{sample_tag.id}", json={"name": "Job"}, headers=headers
+            )
+
+            assert response.status_code == 200
+            assert db.session.get(TagModel, sample_tag.id).name == "Job"
+            assert "Job" in {tag["name"] for tag in client.get("/api/v1/tags").json}
+
+    def test_merge_tag_requires_admin(self, client, app, sample_user, multiple_tags):
+        """Test POST /api/v1/tags/<id>/merge is forbidden for regular users."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.post(
+                f"/api/v1/tags/{multiple_tags[0].id}/merge",
+                json={"targetId": multiple_tags[1].id},
+                headers=headers
+            )
+
+            assert response.status_code == 403
+
+    def test_merge_tag_invalid_id(self, client, app, sample_user, multiple_tags):
+        """Test POST /api/v1/tags/<id>/merge with a non-numeric id."""
+        app.config["ADMIN_USER_IDS"] = [sample_user.id]
+
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.post(
+                "/api/v1/tags/abc/merge",
+                json={"targetId": multiple_tags[1].id},
+                headers=headers
+            )
+
+            assert response.status_code == 404
+
+    def test_delete_tag_with_reassignment(self, client, app, sample_task):
+        """Test DELETE /api/v1/tags/<id>?reassignTo= for admins."""
+        app.config["ADMIN_USER_IDS"] = [sample_task.user_id]
+
+        with app.app_context():
+            token = create_access_token(identity=str(sample_task.user_id))
+            headers = {"Authorization": f"Bearer {token}"}
+            other = TagModel(name="Other")
+            db.session.add(other)
+            db.session.commit()
+
+            response = client.delete(
+                f"/api/v1/tags/{sample_task.tag_id}?reassignTo={other.id}", headers=headers
+            )
+
+            assert response.status_code == 204
+            assert db.session.get(TagModel, sample_task.tag_id) is None
@@ -1,11 +1,15 @@
 import pytest
 import json
+from datetime import datetime
+from flaskr.controllers.task_controller import TaskController
+from flaskr.models.task_archive_model import TaskArchiveModel
 from flaskr.models.task_model import TaskModel, TaskStatus
 from flaskr.models.user_model import UserModel
 from flaskr.models.tag_model import TagModel
 from flaskr.utils import generate_password
 from flaskr.db import db
 from flask_jwt_extended import create_access_token
+from sqlalchemy import text, update
 
 
 class TestTaskRoute:
@@ -37,6 +41,79 @@ class TestTaskRoute:
             assert len(data) == 1
             assert data[0]["title"] == "Test Task"
 
+    def test_get_tasks_on_user_tag_name(self, client, app, sample_user, multiple_tags):
+        """Test GET /api/v1/tasks/user fills tagName without joining tags."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            for tag in multiple_tags:
+                db.session.add(
+                    TaskModel(
+                        title=f"{tag.name} task",
+                        content="Content",
+                        user_id=sample_user.id,
+                        tag_id=tag.id
+                    )
+                )
+            db.session.commit()
+
+            # Warm the tag map, then add a tag it does not know about yet
+            client.get("/api/v1/tasks/user", headers=headers)
+            late_tag = TagModel(name="Late")
+            db.session.add(late_tag)
+            db.session.commit()
+            db.session.add(
+                TaskModel(
+                    title="Late task",
+                    content="Content",
+                    user_id=sample_user.id,
+                    tag_id=late_tag.id
+                )
+            )
+            db.session.commit()
+
+            response = client.get("/api/v1/tasks/user", headers=headers)
+
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert {task["title"]: task["tagName"] for task in data} == {
+                "Work task": "Work",
+                "Personal task": "Personal",
+                "Shopping task": "Shopping",
+                "Late task": "Late",
+            }
+
+    def test_get_tasks_on_user_dangling_tag(self, client, app, sample_user, sample_tag, max_queries):
+        """Test GET /api/v1/tasks/user reloads the tag map once for unknown tag ids."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            for i in range(5):
+                db.session.add(
+                    TaskModel(
+                        title=f"Task {i}",
+                        content="Content",
+                        user_id=sample_user.id,
+                        tag_id=sample_tag.id
+                    )
+                )
+            db.session.commit()
+
+            # As a shard without foreign keys can leave behind
+            db.session.execute(text("PRAGMA foreign_keys=OFF"))
+            db.session.execute(update(TaskModel).values(tag_id=TaskModel.id + 1000))
+            db.session.commit()
+            db.session.execute(text("PRAGMA foreign_keys=ON"))
+
+            # The task list, the tag map and one reload of it
+            with max_queries(3):
+                response = client.get("/api/v1/tasks/user", headers=headers)
+
+            assert response.status_code == 200
+            assert [task["tagName"] for task in response.json] == [None] * 5
+
     def test_get_tasks_on_user_no_jwt(self, client):
         """Test GET /api/v1/tasks/user without JWT token."""
         response = client.get("/api/v1/tasks/user")
@@ -193,3 +270,105 @@ class TestTaskRoute:
         response = client.delete("/api/v1/tasks/1")
 
         assert response.status_code == 401  # Unauthorized
+
+    def test_get_tasks_include_archived(self, client, app, sample_task):
+        """Test GET /api/v1/tasks/user?include_archived=true adds archived tasks."""
+        with app.app_context():
+            db.session.add(TaskArchiveModel(
+                title="Old Task",
+                content="Done long ago",
+                status=TaskStatus.COMPLETED,
+                created_at=datetime(2020, 1, 1),
+                user_id=sample_task.user_id,
+                tag_id=sample_task.tag_id
+            ))
+            db.session.commit()
+
+            token = create_access_token(identity=str(sample_task.user_id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            hot = client.get("/api/v1/tasks/user", headers=headers).json
+            assert [(task["title"], task["archived"]) for task in hot] == [("Test Task", False)]
+
+            response = client.get("/api/v1/tasks/user?include_archived=true", headers=headers)
+
+            assert response.status_code == 200
+            assert sorted((task["title"], task["archived"]) for task in response.json) == [
+                ("Old Task", True),
+                ("Test Task", False),
+            ]
+            assert {task["tagName"] for task in response.json} == {"Work"}
+
+    def test_archived_task_ids_stay_unique(self, client, app, sample_user, sample_tag):
+        """Test archived tasks keep their id and no live task gets it again."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            tasks = [
+                TaskModel(
+                    title=f"Task {i}",
+                    content="Content",
+                    status=status,
+                    created_at=datetime(2020, 1, 1),
+                    user_id=sample_user.id,
+                    tag_id=sample_tag.id
+                )
+                for i, status in enumerate(
+                    [TaskStatus.PENDING, TaskStatus.COMPLETED, TaskStatus.COMPLETED]
+                )
+            ]
+            db.session.add_all(tasks)
+            db.session.commit()
+            ids = {task.title: task.id for task in tasks}
+
+            TaskController.archive(30)
+            # SQLite would hand out the id of the last task again without AUTOINCREMENT
+            created = client.post(
+                "/api/v1/tasks",
+                json={"title": "New", "content": "Content", "status": "PENDING", "tagId": sample_tag.id},
+                headers=headers
+            )
+            assert created.status_code == 201
+
+            listed = client.get("/api/v1/tasks/user?include_archived=true", headers=headers).json
+            listed_ids = [task["id"] for task in listed]
+            assert len(listed_ids) == len(set(listed_ids)) == 4
+            assert {task["title"]: task["id"] for task in listed if task["archived"]} == {
+                "Task 1": ids["Task 1"],
+                "Task 2": ids["Task 2"],
+            }
+
+            # The archived id does not reach a live task
+            response = client.delete(f"/api/v1/tasks/{ids['Task 1']}", headers=headers)
+            assert response.status_code == 409
+            assert db.session.get(TaskModel, ids["Task 0"]) is not None
+
+    def test_archived_task_read_only(self, client, app, sample_user, sample_tag):
+        """Test updating or deleting an archived task answers 409 to its owner."""
+        with app.app_context():
+            db.session.add(
+                TaskArchiveModel(
+                    id=50,
+                    title="Old",
+                    content="Content",
+                    status=TaskStatus.COMPLETED,
+                    created_at=datetime(2020, 1, 1),
+                    user_id=sample_user.id,
+                    tag_id=sample_tag.id,
+                )
+            )
+            db.session.commit()
+            headers = {"Authorization": f"Bearer {create_access_token(identity=str(sample_user.id))}"}
+            other = {"Authorization": f"Bearer {create_access_token(identity=str(sample_user.id + 1))}"}
+            update = {"title": "New", "content": "Content", "status": "PENDING"}
+
+            updated = client.put("/api/v1/tasks/50", json=update, headers=headers)
+            deleted = client.delete("/api/v1/tasks/50", headers=headers)
+
+            assert updated.status_code == 409
+            assert "archived" in updated.json["message"]
+            assert deleted.status_code == 409
+            assert client.delete("/api/v1/tasks/50", headers=other).status_code == 403
+            assert client.delete("/api/v1/tasks/51", headers=headers).status_code == 404
+            assert db.session.get(TaskArchiveModel, 50) is not None
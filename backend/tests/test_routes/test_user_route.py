@@ -1,6 +1,10 @@
 import pytest
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event
 from flaskr.models.user_model import UserModel
+from flaskr.models.task_model import TaskModel
 from flaskr.utils import generate_password
 from flaskr.db import db
 from flask_jwt_extended import create_access_token
@@ -113,6 +117,59 @@ class TestUserRoute:
             user = db.session.query(UserModel).filter_by(id=sample_user.id).first()
             assert user is None
 
+    def test_delete_user_account_cascades_tasks(self, client, app, sample_task):
+        """Test DELETE /api/v1/users/account removes tasks in the database."""
+        with app.app_context():
+            token = create_access_token(identity=str(sample_task.user_id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            for i in range(50):
+                db.session.add(
+                    TaskModel(
+                        title=f"Task {i}",
+                        content="Content",
+                        user_id=sample_task.user_id,
+                        tag_id=sample_task.tag_id
+                    )
+                )
+            db.session.commit()
+            db.session.expunge_all()
+
+            statements = []
+
+            def count(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count)
+            try:
+                response = client.delete("/api/v1/users/account", headers=headers)
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count)
+
+            assert response.status_code == 204
+            assert not any(s.lstrip().upper().startswith("SELECT") for s in statements)
+            assert len(statements) == 1
+            assert db.session.query(TaskModel).count() == 0
+
+    def test_delete_user_account_in_background(self, client, app, sample_user):
+        """Test DELETE /api/v1/users/account queues a job when configured."""
+        app.config["ACCOUNT_DELETION_IN_BACKGROUND"] = True
+
+        with app.app_context():
+            token = create_access_token(identity=str(sample_user.id))
+            headers = {"Authorization": f"Bearer {token}"}
+
+            response = client.delete("/api/v1/users/account", headers=headers)
+
+            assert response.status_code == 202
+            data = json.loads(response.data)
+            assert data["status"] == "PENDING"
+            assert data["name"] == "delete_user"
+
+            # Deleted later by the worker
+            user = db.session.query(UserModel).filter_by(id=sample_user.id).first()
+            assert user is not None
+
     def test_delete_user_account_no_jwt(self, client):
         """Test DELETE /api/v1/users/account without JWT token."""
         response = client.delete("/api/v1/users/account")
@@ -129,3 +186,29 @@ class TestUserRoute:
         )
 
         assert response.status_code == 422  # Invalid token
+
+    def test_create_user_parallel_same_username(self, file_app):
+        """Test parallel POST /api/v1/users racing for the same username."""
+        workers = 8
+        barrier = threading.Barrier(workers)
+
+        def sign_up(i):
+            client = file_app.test_client()
+            barrier.wait()
+            response = client.post(
+                "/api/v1/users",
+                json={
+                    "username": "racer",
+                    "email": f"racer{i}@example.com",
+                    "password": "password123"
+                },
+                content_type="application/json"
+            )
+            return response.status_code
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            statuses = list(pool.map(sign_up, range(workers)))
+
+        assert statuses.count(201) == 1
+        assert statuses.count(409) == workers - 1
+        assert db.session.query(UserModel).filter_by(username="racer").count() == 1
@@ -0,0 +1,397 @@
+import pytest
+import json
+import threading
+from datetime import datetime, timezone
+from unittest.mock import patch
+from flask import g
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.exc import OperationalError
+from config import TestConfig
+from flaskr import create_app
+from flaskr.controllers.tag_controller import TagController
+from flaskr.controllers.user_controller import UserController
+from flaskr.db import db
+from flaskr.jobs import run_next
+from flaskr.models.job_model import JobModel, JobStatus
+from flaskr.models.tag_model import TagModel
+from flaskr.models.tag_usage_model import TagUsageModel
+from flaskr.models.task_archive_model import TaskArchiveModel
+from flaskr.models.user_model import UserModel
+from flaskr.sharding import (
+    SHARD_ID_RANGE,
+    SHARDED_TABLES,
+    TASKS,
+    create_shards,
+    home_shard,
+    move_user_tasks,
+    shard_engine,
+)
+
+
+@pytest.fixture
+def sharded_app(tmp_path):
+    """Create an app whose tasks live in two SQLite shard files."""
+
+    class ShardedConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + str(tmp_path / "primary.db")
+        SQLALCHEMY_BINDS = {
+            "tasks_0": "sqlite:///" + str(tmp_path / "tasks_0.db"),
+            "tasks_1": "sqlite:///" + str(tmp_path / "tasks_1.db"),
+        }
+        TASK_SHARDS = 2
+
+    app = create_app(ShardedConfig)
+
+    with app.app_context():
+        db.create_all()
+        create_shards()
+        db.session.add(TagModel(id=1, name="Work"))
+        db.session.add(TagModel(id=2, name="Home"))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def sign_up(client, username):
+    response = client.post(
+        "/api/v1/users",
+        json={"username": username, "email": f"{username}@example.com", "password": "secret123"}
+    )
+    assert response.status_code == 201
+
+    with client.application.app_context():
+        user_id = db.session.execute(
+            select(UserModel.id).where(UserModel.username == username)
+        ).scalar_one()
+
+    return user_id, {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+def add_task(client, headers, title, tag_id=1):
+    return client.post(
+        "/api/v1/tasks",
+        json={"title": title, "content": "Content", "status": "PENDING", "tagId": tag_id},
+        headers=headers
+    )
+
+
+def shard_counts():
+    counts = []
+    for index in range(2):
+        with shard_engine(index).connect() as connection:
+            counts.append(
+                connection.execute(select(func.count()).select_from(TASKS)).scalar_one()
+            )
+    return counts
+
+
+def rows_of_user(user_id):
+    """Count ``user_id``'s active and archived tasks over every shard."""
+    rows = 0
+    for index in range(2):
+        with shard_engine(index).connect() as connection:
+            for table in SHARDED_TABLES:
+                rows += connection.execute(
+                    select(func.count()).where(table.c.user_id == user_id)
+                ).scalar_one()
+    return rows
+
+
+def archive_task(user_id, shard):
+    with shard_engine(shard).begin() as connection:
+        connection.execute(
+            insert(TaskArchiveModel.__table__).values(
+                id=7,
+                title="Archived",
+                content="Content",
+                status="COMPLETED",
+                created_at=datetime.now(timezone.utc),
+                user_id=user_id,
+                tag_id=1,
+            )
+        )
+
+
+def fail_next_primary_commit():
+    """Make the primary's next commit fail, as a crash between databases would."""
+
+    def fail(connection):
+        raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+
+    event.listen(db.engines[None], "commit", fail, once=True)
+
+
+def run_intents():
+    """Run the jobs left by writes that did not commit everywhere, now."""
+    db.session.execute(update(JobModel).values(run_at=datetime.now(timezone.utc)))
+    db.session.commit()
+    g.pop("task_shards", None)
+
+    while run_next():
+        pass
+
+
+class TestSharding:
+    """Test tasks are routed to and moved between shards."""
+
+    def test_tasks_go_to_home_shard(self, sharded_app):
+        """Test each user's tasks land on the shard picked from their id."""
+        client = sharded_app.test_client()
+        first_id, first = sign_up(client, "first")
+        second_id, second = sign_up(client, "second")
+
+        assert add_task(client, first, "First task").status_code == 201
+        assert add_task(client, second, "Second task").status_code == 201
+        assert add_task(client, second, "Another").status_code == 201
+
+        expected = [0, 0]
+        expected[home_shard(first_id)] += 1
+        expected[home_shard(second_id)] += 2
+        assert shard_counts() == expected
+
+        tasks = json.loads(client.get("/api/v1/tasks/user", headers=first).data)
+        assert [task["title"] for task in tasks] == ["First task"]
+        assert tasks[0]["tagName"] == "Work"
+
+        # Nothing is written to the primary's tasks table
+        with db.engines[None].connect() as connection:
+            assert connection.execute(select(func.count()).select_from(TASKS)).scalar_one() == 0
+
+    def test_move_user_tasks(self, sharded_app):
+        """Test moving a user's tasks keeps them readable and writable."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "mover")
+        add_task(client, headers, "One")
+        add_task(client, headers, "Two")
+        source, target = home_shard(user_id), 1 - home_shard(user_id)
+        ids = {task["id"] for task in client.get("/api/v1/tasks/user", headers=headers).json}
+
+        assert move_user_tasks(user_id, target, batch_size=1) == 2
+
+        counts = shard_counts()
+        assert counts[source] == 0
+        assert counts[target] == 2
+        assert db.session.get(UserModel, user_id).task_shard == target
+
+        tasks = json.loads(client.get("/api/v1/tasks/user", headers=headers).data)
+        assert {task["title"] for task in tasks} == {"One", "Two"}
+        assert {task["id"] for task in tasks} == ids
+        assert client.delete(f"/api/v1/tasks/{tasks[0]['id']}", headers=headers).status_code == 204
+        assert shard_counts()[target] == 1
+
+    def test_writes_rejected_while_moving(self, sharded_app):
+        """Test task writes answer 503 while the user's tasks are moved."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "busy")
+        add_task(client, headers, "Before")
+
+        db.session.get(UserModel, user_id).tasks_moving = True
+        db.session.commit()
+        # Requests share the fixture's app context, and with it the directory
+        # and the session that a real request would tear down
+        g.pop("task_shards", None)
+
+        response = add_task(client, headers, "During")
+
+        assert response.status_code == 503
+        assert "being moved" in json.loads(response.data)["message"]
+        db.session.rollback()
+        assert client.get("/api/v1/tasks/user", headers=headers).status_code == 200
+
+    def test_tags_span_shards(self, sharded_app):
+        """Test tag delete and merge see tasks on every shard."""
+        client = sharded_app.test_client()
+        _, first = sign_up(client, "first")
+        _, second = sign_up(client, "second")
+        add_task(client, first, "First", tag_id=2)
+        add_task(client, second, "Second", tag_id=2)
+
+        admin = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+        sharded_app.config["ADMIN_USER_IDS"] = [1]
+
+        assert client.delete("/api/v1/tags/2", headers=admin).status_code == 409
+
+        response = client.post("/api/v1/tags/2/merge", json={"targetId": 1}, headers=admin)
+        assert response.status_code == 204
+
+        for headers in (first, second):
+            tasks = json.loads(client.get("/api/v1/tasks/user", headers=headers).data)
+            assert [task["tagName"] for task in tasks] == ["Work"]
+
+    def test_delete_account_removes_shard_tasks(self, sharded_app):
+        """Test deleting an account also deletes its tasks on the shard."""
+        client = sharded_app.test_client()
+        _, headers = sign_up(client, "leaving")
+        add_task(client, headers, "Gone")
+
+        assert client.delete("/api/v1/users/account", headers=headers).status_code == 204
+        assert shard_counts() == [0, 0]
+
+    def test_rebalance_command(self, sharded_app):
+        """Test flask shards rebalance moves users back to their home shard."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "stray")
+        add_task(client, headers, "Stray")
+        move_user_tasks(user_id, 1 - home_shard(user_id))
+
+        result = sharded_app.test_cli_runner().invoke(args=["shards", "rebalance"])
+
+        assert result.exit_code == 0
+        assert "Rebalanced 1 users" in result.output
+        assert shard_counts()[home_shard(user_id)] == 1
+
+    def test_task_ids_unique_across_shards(self, sharded_app):
+        """Test shards give out distinct task ids, which survive a move."""
+        client = sharded_app.test_client()
+        first_id, first = sign_up(client, "first")
+        second_id, second = sign_up(client, "second")
+        move_user_tasks(second_id, 1 - home_shard(first_id))
+        add_task(client, first, "First")
+        add_task(client, second, "Second")
+
+        ids = [
+            client.get("/api/v1/tasks/user", headers=headers).json[0]["id"]
+            for headers in (first, second)
+        ]
+        assert ids[0] != ids[1]
+        assert max(ids) > SHARD_ID_RANGE
+
+        # The second task joins the first on its shard with its id
+        move_user_tasks(second_id, home_shard(first_id))
+        add_task(client, second, "Third")
+
+        tasks = client.get("/api/v1/tasks/user", headers=second).json
+        assert tasks[0]["id"] == ids[1]
+        assert len({ids[0], *(task["id"] for task in tasks)}) == 3
+
+    def test_home_shard_adding_a_shard(self, sharded_app):
+        """Test going from 2 to 3 shards only moves users to the new shard."""
+        before = [home_shard(user_id) for user_id in range(1, 3001)]
+        sharded_app.config["TASK_SHARDS"] = 3
+        after = [home_shard(user_id) for user_id in range(1, 3001)]
+        sharded_app.config["TASK_SHARDS"] = 2
+
+        moved = [new for old, new in zip(before, after) if old != new]
+        assert set(moved) == {2}
+        assert 800 < len(moved) < 1200
+
+    def test_write_racing_a_move_rejected(self, sharded_app):
+        """Test a write routed before a move finished does not land on the old shard."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "racer")
+        add_task(client, headers, "Before")
+        source, target = home_shard(user_id), 1 - home_shard(user_id)
+
+        # The request looks up the shard, then the move runs to completion
+        # before it writes
+        g.pop("task_shards", None)
+        assert client.get("/api/v1/tasks/user", headers=headers).status_code == 200
+
+        def move():
+            with sharded_app.app_context():
+                move_user_tasks(user_id, target)
+
+        mover = threading.Thread(target=move)
+        mover.start()
+        mover.join()
+
+        response = add_task(client, headers, "During")
+        db.session.rollback()
+
+        assert response.status_code == 503
+        assert shard_counts()[source] == 0
+        assert shard_counts()[target] == 1
+
+        g.pop("task_shards", None)
+        assert add_task(client, headers, "After").status_code == 201
+        assert shard_counts()[target] == 2
+
+    def test_task_write_failed_on_primary_recounted(self, sharded_app):
+        """Test a task whose tag count failed on the primary is recounted by its job."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "counted")
+        add_task(client, headers, "Counted")
+        count_usage = TagController.count_usage
+
+        def count_then_crash(*args):
+            count_usage(*args)
+            fail_next_primary_commit()
+
+        with patch(
+            "flaskr.controllers.task_controller.TagController.count_usage",
+            side_effect=count_then_crash,
+        ):
+            assert add_task(client, headers, "Uncounted").status_code == 500
+
+        db.session.rollback()
+        assert db.session.execute(select(JobModel.name)).scalars().all() == ["recount_tag_usage"]
+
+        run_intents()
+
+        tasks = client.get("/api/v1/tasks/user", headers=headers).json
+        assert db.session.get(TagUsageModel, (user_id, 1)).uses == len(tasks)
+        assert db.session.execute(select(JobModel.status)).scalars().all() == [JobStatus.SUCCEEDED]
+
+    def test_committed_write_leaves_no_job(self, sharded_app):
+        """Test the job guarding a write is deleted once the write committed."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "clean")
+
+        assert add_task(client, headers, "Task").status_code == 201
+        assert db.session.execute(select(JobModel)).first() is None
+        assert db.session.get(TagUsageModel, (user_id, 1)).uses == 1
+
+    def test_account_delete_failed_on_primary_finished(self, sharded_app):
+        """Test an account deletion that failed on the primary is finished by its job."""
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "retry")
+        add_task(client, headers, "Gone")
+        remove = UserController.remove
+
+        def remove_then_crash(user_id):
+            rowcount = remove(user_id)
+            fail_next_primary_commit()
+            return rowcount
+
+        with patch(
+            "flaskr.controllers.user_controller.UserController.remove",
+            side_effect=remove_then_crash,
+        ):
+            assert client.delete("/api/v1/users/account", headers=headers).status_code == 500
+
+        db.session.rollback()
+        assert db.session.get(UserModel, user_id) is not None
+
+        run_intents()
+
+        db.session.expire_all()
+        assert db.session.get(UserModel, user_id) is None
+        assert rows_of_user(user_id) == 0
+
+    @pytest.mark.parametrize("in_background", [False, True])
+    def test_delete_account_leaves_no_orphans(self, sharded_app, in_background):
+        """Test deleting an account removes its active and archived shard rows.
+
+        Shards do not enforce the ON DELETE CASCADE foreign key.
+        """
+        sharded_app.config["ACCOUNT_DELETION_IN_BACKGROUND"] = in_background
+        client = sharded_app.test_client()
+        user_id, headers = sign_up(client, "orphan")
+        add_task(client, headers, "Active")
+        move_user_tasks(user_id, 1 - home_shard(user_id))
+        archive_task(user_id, 1 - home_shard(user_id))
+        assert rows_of_user(user_id) == 2
+
+        response = client.delete("/api/v1/users/account", headers=headers)
+        assert response.status_code == (202 if in_background else 204)
+
+        if in_background:
+            g.pop("task_shards", None)
+            assert run_next() is True
+
+        db.session.expire_all()
+        assert db.session.get(UserModel, user_id) is None
+        assert rows_of_user(user_id) == 0
@@ -0,0 +1,108 @@
+import pytest
+from types import SimpleNamespace
+from flask_jwt_extended import create_access_token
+from config import Config, ProductionConfig, TestConfig
+from flaskr import create_app
+from flaskr.commands.slowlog_command import slowlog_command
+from flaskr.db import db
+from flaskr.models.tag_model import TagModel
+from flaskr.models.task_model import TaskModel
+from flaskr.models.user_model import UserModel
+from flaskr.slow_queries import explain, normalize, read_slow_queries
+
+
+@pytest.fixture
+def slow_app(tmp_path):
+    """Create an app logging every statement as slow."""
+
+    class SlowQueryConfig(TestConfig):
+        SLOW_QUERY_SECONDS = 0
+        SLOW_QUERY_LOG = str(tmp_path / "logs" / "slow_queries.log")
+
+    app = create_app(SlowQueryConfig)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(TagModel(id=1, name="Work"))
+        db.session.add(UserModel(id=1, username="slow", email="slow@example.com", password="x"))
+        db.session.add(TaskModel(title="Task", content="Content", user_id=1, tag_id=1))
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+class RecordingCursor:
+    """DB-API cursor that records statements and fails on EXPLAIN."""
+
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("relation does not exist")
+
+    def close(self):
+        pass
+
+
+class TestSlowQueries:
+    """Test the slow query log and its summary."""
+
+    def test_normalize(self):
+        """Test literals and IN lists fold into one fingerprint."""
+        assert normalize("SELECT *\n FROM tasks WHERE id IN (?, ?, ?) AND title = 'a''b'") == (
+            "SELECT * FROM tasks WHERE id IN (?) AND title = ?"
+        )
+        assert normalize("SELECT * FROM tasks_0 LIMIT 10") == "SELECT * FROM tasks_0 LIMIT ?"
+
+    def test_slow_statement_logged_with_plan(self, slow_app):
+        """Test a slow statement is written as JSON with its plan and endpoint."""
+        client = slow_app.test_client()
+        token = create_access_token(identity="1")
+
+        client.get("/api/v1/tasks/user", headers={"Authorization": f"Bearer {token}"})
+
+        entries = [
+            entry for entry in read_slow_queries(slow_app.config["SLOW_QUERY_LOG"])
+            if entry["endpoint"] == "GET tasks.TasksOnUser"
+        ]
+        task_list = next(entry for entry in entries if "FROM tasks" in entry["sql"])
+        assert task_list["parameters"] == ["str"]
+        assert task_list["duration_ms"] >= 0
+        # No index covers every task of a user, only the active ones
+        assert task_list["plan"] == ["SCAN tasks"]
+
+    def test_slowlog_command(self, slow_app):
+        """Test flask db slowlog groups entries by fingerprint."""
+        for task_id in (1, 2, 3):
+            db.session.get(TaskModel, task_id)
+            db.session.expunge_all()
+
+        result = slow_app.test_cli_runner().invoke(slowlog_command, ["--sort", "count", "--limit", "1"])
+
+        assert result.exit_code == 0
+        assert "count=3" in result.output
+        assert "FROM tasks WHERE tasks.id = ?" in result.output
+        assert "plan: SEARCH tasks USING INTEGER PRIMARY KEY" in result.output
+
+    def test_failed_explain_rolled_back_on_postgresql(self):
+        """Test a failing EXPLAIN on PostgreSQL is undone to its savepoint."""
+        executed = []
+        connection = SimpleNamespace(cursor=lambda: RecordingCursor(executed))
+
+        plan = explain(
+            connection, SimpleNamespace(name="postgresql"), "SELECT * FROM gone", {}, False
+        )
+
+        assert plan == ["EXPLAIN failed: relation does not exist"]
+        assert executed == [
+            "SAVEPOINT slow_query_explain",
+            "EXPLAIN SELECT * FROM gone",
+            "ROLLBACK TO SAVEPOINT slow_query_explain",
+        ]
+
+    def test_off_by_default(self):
+        """Test only ProductionConfig logs slow statements."""
+        assert Config.SLOW_QUERY_SECONDS is None
+        assert ProductionConfig.SLOW_QUERY_SECONDS == 0.1
@@ -0,0 +1,82 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from config import TestConfig
+from flaskr import create_app
+from flaskr.db import db
+from flaskr.traffic import read_traces
+
+
+@pytest.fixture
+def capture_app(tmp_path):
+    """Create an app that captures its traffic."""
+
+    class CaptureConfig(TestConfig):
+        TRAFFIC_CAPTURE = True
+        TRAFFIC_CAPTURE_FILE = str(tmp_path / "traffic.jsonl")
+
+    app = create_app(CaptureConfig)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+        app.extensions["traffic"].close()
+
+
+def bearer(user_id):
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+class TestTrafficCapture:
+    """Test requests are traced without identifying data."""
+
+    def test_request_traced(self, capture_app):
+        """Test a request is written with its route template and sizes."""
+        client = capture_app.test_client()
+
+        response = client.put(
+            "/api/v1/tasks/123",
+            json={"title": "Secret title", "content": "Secret", "status": "PENDING"},
+            headers=bearer(7),
+        )
+
+        [trace] = read_traces(capture_app.config["TRAFFIC_CAPTURE_FILE"])
+        assert trace["m"] == "PUT"
+        assert trace["r"] == "/api/v1/tasks/<task_id>"
+        assert trace["s"] == response.status_code
+        assert trace["in"] > 0
+        assert trace["ms"] >= 0
+        with open(capture_app.config["TRAFFIC_CAPTURE_FILE"]) as file:
+            captured = file.read()
+        assert "Secret" not in captured
+
+    def test_users_pseudonymized(self, capture_app):
+        """Test a user gets the same pseudonym on every request, not their id."""
+        client = capture_app.test_client()
+
+        client.get("/api/v1/tags")
+        client.get("/api/v1/tasks/user", headers=bearer(7))
+        client.get("/api/v1/tasks/user", headers=bearer(7))
+        client.get("/api/v1/tasks/user", headers=bearer(8))
+
+        anonymous, first, second, other = read_traces(capture_app.config["TRAFFIC_CAPTURE_FILE"])
+        assert first["u"] == second["u"] != other["u"]
+        assert first["u"] not in ("7", 7)
+        assert anonymous["u"] is None
+
+    def test_query_values_anonymized(self, capture_app):
+        """Test only numeric and boolean query values are kept."""
+        client = capture_app.test_client()
+
+        client.get("/api/v1/tags?prefix=wor&limit=10")
+        client.get("/api/v1/tasks/user?active=true", headers=bearer(7))
+
+        tags, tasks = read_traces(capture_app.config["TRAFFIC_CAPTURE_FILE"])
+        assert tags["q"] == {"prefix": None, "limit": "10"}
+        assert tasks["q"] == {"active": "true"}
+
+    def test_disabled_by_default(self, app, client):
+        """Test nothing is captured unless TRAFFIC_CAPTURE is on."""
+        client.get("/api/v1/tags")
+
+        assert "traffic" not in app.extensions